@@ -0,0 +1,355 @@
+"""
+Benchmark runner for the generation pipeline.
+
+    PYTHONPATH=src python benchmarks/run.py --out bench.json
+    PYTHONPATH=src python benchmarks/run.py --quick --compare bench.json
+
+Suites:
+  - pipeline: run_pipeline / run_workflow against LatencyMockLLMProvider, so
+    orchestration overhead and overlap are measured with HF-like waits
+  - catalog: ProductStore build and load_product_by_name on synthetic JSONL
+    catalogs (10k / 100k / 1M products by default)
+  - prompts: prompt construction for questions, answers, FAQ and Template
+  - json: JSON extraction from raw model output
+  - render: deterministic page rendering in-process vs. across a process pool
+
+Results are JSON ({"meta": ..., "results": {name: stats}}); --compare prints
+new/old ratios of the mean and exits 1 when any exceeds --threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+os.environ.setdefault("KASPARRO_LLM_MODE", "mock")
+os.environ.setdefault("KASPARRO_LLM_CACHE", "0")
+
+from kasparro_agentic.agents.parser_agent import parse_product
+from kasparro_agentic.agents.question_agent import _answer_prompt, _questions_prompt
+from kasparro_agentic.data.product_data import RAW_PRODUCT_DATA
+from kasparro_agentic.data.product_store import ProductStore, load_product_by_name
+from kasparro_agentic.llm.json_extract import extract_json_object, parse_json_model
+from kasparro_agentic.llm.provider import LatencyMockLLMProvider
+from kasparro_agentic.logic_blocks.faq import _faq_prompt
+from kasparro_agentic.models import FAQPage, Product, ProductPage
+from kasparro_agentic.orchestration.dag import run_workflow
+from kasparro_agentic.pipeline import run_pipeline
+from kasparro_agentic.templates.base import Template
+from kasparro_agentic.templates.pages import QuestionTemplate
+from kasparro_agentic.templates.parallel import render_catalog
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+SUITES = ("pipeline", "catalog", "prompts", "json", "render")
+
+
+# ----------------------------
+# Measurement
+# ----------------------------
+def _percentile(sorted_ms: list[float], q: float) -> float:
+    # nearest-rank, stable for the small sample counts used here
+    idx = max(0, math.ceil(q * len(sorted_ms)) - 1)
+    return sorted_ms[idx]
+
+
+def summarize(samples_s: list[float], inner: int = 1) -> dict[str, Any]:
+    ms = sorted(s * 1000.0 / inner for s in samples_s)
+    return {
+        "n": len(ms),
+        "inner": inner,
+        "mean_ms": round(statistics.fmean(ms), 6),
+        "p50_ms": round(_percentile(ms, 0.5), 6),
+        "p90_ms": round(_percentile(ms, 0.9), 6),
+        "min_ms": round(ms[0], 6),
+        "max_ms": round(ms[-1], 6),
+    }
+
+
+def measure(fn: Callable[[], Any], repeat: int, inner: int = 1, warmup: int = 1) -> dict[str, Any]:
+    """`repeat` samples of `inner` back-to-back calls each; stats are per call."""
+    for _ in range(warmup):
+        fn()
+    samples: list[float] = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(inner):
+                fn()
+            samples.append(time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return summarize(samples, inner)
+
+
+# ----------------------------
+# Suites
+# ----------------------------
+def bench_pipeline(args: argparse.Namespace, out: dict[str, Any]) -> None:
+    def provider() -> LatencyMockLLMProvider:
+        return LatencyMockLLMProvider(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for concurrency in (1, 4):
+            llm = provider()
+            # A fresh directory per run: reusing one would replay its _node_cache.json
+            # and time the incremental no-op instead of the pipeline.
+            out[f"pipeline.run_pipeline.c{concurrency}"] = measure(
+                lambda llm=llm, c=concurrency: run_pipeline(
+                    Path(tempfile.mkdtemp(dir=tmp)), max_concurrency=c, llm=llm
+                ),
+                repeat=args.repeat_slow,
+            )
+
+    llm = provider()
+    out["pipeline.run_workflow"] = measure(lambda: run_workflow("GlowBoost Vitamin C Serum", llm=llm), args.repeat_slow)
+
+
+def _synthetic_record(i: int, rng: random.Random) -> dict[str, Any]:
+    actives = ["Vitamin C", "Niacinamide", "Hyaluronic Acid", "Retinol", "Salicylic Acid", "Ceramides"]
+    return {
+        "product_name": f"Bench Product {i:07d}",
+        "brand": f"Brand {i % 997}",
+        "category": rng.choice(["Serum", "Cleanser", "Moisturizer", "Sunscreen"]),
+        "price_inr": 199 + i % 2000,
+        "key_ingredients": rng.sample(actives, 2),
+        "benefits": ["Brightening", "Hydration"],
+        "skin_type": ["Oily", "Combination"],
+        "concentration": f"{i % 20 + 1}%",
+        "how_to_use": "Apply 2-3 drops in the morning before sunscreen",
+        "side_effects": "Mild tingling for sensitive skin",
+    }
+
+
+def write_catalog(path: Path, size: int, seed: int) -> Path:
+    rng = random.Random(seed)
+    with path.open("w", encoding="utf-8") as f:
+        for i in range(size):
+            f.write(json.dumps(_synthetic_record(i, rng)))
+            f.write("\n")
+    return path
+
+
+def bench_catalog(args: argparse.Namespace, out: dict[str, Any]) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = write_catalog(Path(tmp) / f"catalog_{size}.jsonl", size, args.seed)
+            label = f"catalog.{size}"
+
+            start = time.perf_counter()
+            store = ProductStore([path])
+            len(store)
+            out[f"{label}.store_build"] = summarize([time.perf_counter() - start])
+
+            names = [f"Bench Product {i:07d}" for i in random.Random(args.seed).sample(range(size), 100)]
+            out[f"{label}.store_get"] = measure(lambda s=store, ns=names: [s.get(n) for n in ns], args.repeat)
+            out[f"{label}.store_search"] = measure(
+                lambda s=store, ns=names: [s.search(n[-9:]) for n in ns], args.repeat
+            )
+
+            # the request-path entry point, through the process-wide store
+            previous = os.environ.get("KASPARRO_DATA_PATH")
+            os.environ["KASPARRO_DATA_PATH"] = str(path)
+            try:
+                load_product_by_name(names[0])  # builds the shared index outside the samples
+                out[f"{label}.load_product_by_name"] = measure(
+                    lambda ns=names: [load_product_by_name(n) for n in ns], args.repeat
+                )
+            finally:
+                if previous is None:
+                    os.environ.pop("KASPARRO_DATA_PATH", None)
+                else:
+                    os.environ["KASPARRO_DATA_PATH"] = previous
+
+
+class _BenchTemplate(Template[ProductPage]):
+    name = "bench_product_page"
+    schema = ProductPage
+    dependencies = ("product",)
+
+    def build_context(self, **kwargs: object) -> dict[str, object]:
+        product = kwargs["product"]
+        return {"product": product.model_dump()}  # type: ignore[attr-defined]
+
+
+def bench_prompts(args: argparse.Namespace, out: dict[str, Any]) -> None:
+    product = parse_product(RAW_PRODUCT_DATA)
+    questions = QuestionTemplate().render(product)
+    template = _BenchTemplate()
+    context = template.build_context(product=product)
+    inner = args.inner
+
+    out["prompts.questions"] = measure(lambda: _questions_prompt(product), args.repeat, inner)
+    out["prompts.answer"] = measure(lambda: _answer_prompt(product, questions[0].question), args.repeat, inner)
+    out["prompts.faq"] = measure(lambda: _faq_prompt(product, questions), args.repeat, inner)
+    out["prompts.template"] = measure(lambda: template.build_prompt(context), args.repeat, inner)
+
+
+def _json_samples() -> dict[str, str]:
+    items = [{"category": "Usage", "question": f"Question {i}?", "answer": "x" * 200} for i in range(50)]
+    page = {"product_name": "GlowBoost", "disclaimer": "Informational only.", "items": items}
+    body = json.dumps(page)
+    return {
+        "plain": body,
+        "prose": f"Sure! Here is the JSON you asked for:\n{body}\nLet me know if you need anything else {{}}.",
+        "fenced": f"```json\n{body}\n```",
+        "truncated": body[: len(body) * 2 // 3],
+        "large": json.dumps({"rows": [page] * 40}),
+    }
+
+
+def bench_json(args: argparse.Namespace, out: dict[str, Any]) -> None:
+    for label, text in _json_samples().items():
+        out[f"json.extract.{label}"] = measure(lambda t=text: extract_json_object(t), args.repeat, args.inner)
+        if label != "large":
+            out[f"json.validate.{label}"] = measure(
+                lambda t=text: parse_json_model(t, FAQPage), args.repeat, args.inner
+            )
+
+
+def bench_render(args: argparse.Namespace, out: dict[str, Any]) -> None:
+    rng = random.Random(args.seed)
+    count = 2_000 if args.quick else 20_000
+    products = [Product.model_validate(_synthetic_record(i, rng)) for i in range(count)]
+    repeat = args.repeat_slow
+    out[f"render.{count}.serial"] = measure(lambda: render_catalog(products, workers=1), repeat)
+    workers = os.cpu_count() or 1
+    if workers > 1:
+        out[f"render.{count}.pool{workers}"] = measure(lambda: render_catalog(products, workers=workers), repeat)
+        out[f"render.{count}.pool{workers}_json"] = measure(
+            lambda: render_catalog(products, workers=workers, as_json=True), repeat
+        )
+
+
+_SUITE_FNS: dict[str, Callable[[argparse.Namespace, dict[str, Any]], None]] = {
+    "pipeline": bench_pipeline,
+    "catalog": bench_catalog,
+    "prompts": bench_prompts,
+    "json": bench_json,
+    "render": bench_render,
+}
+
+
+# ----------------------------
+# Results
+# ----------------------------
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def collect_meta(args: argparse.Namespace) -> dict[str, Any]:
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "suites": list(args.suites),
+        "sizes": list(args.sizes),
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "quick": args.quick,
+    }
+
+
+def compare(new: dict[str, Any], old: dict[str, Any], threshold: float) -> list[str]:
+    """Prints a ratio table and returns the benchmarks slower than `threshold`."""
+    regressions: list[str] = []
+    print(f"\n{'benchmark':<44} {'old ms':>12} {'new ms':>12} {'ratio':>7}")
+    for name, stats in sorted(new["results"].items()):
+        prev = old.get("results", {}).get(name)
+        if prev is None:
+            print(f"{name:<44} {'-':>12} {stats['mean_ms']:>12.4f} {'new':>7}")
+            continue
+        ratio = stats["mean_ms"] / prev["mean_ms"] if prev["mean_ms"] else math.inf
+        flag = ""
+        if ratio > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<44} {prev['mean_ms']:>12.4f} {stats['mean_ms']:>12.4f} {ratio:>7.2f}{flag}")
+    print(f"\nbaseline commit {old.get('meta', {}).get('commit', '?')} -> {new['meta']['commit']}")
+    return regressions
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the content generation pipeline.")
+    parser.add_argument("--suites", default=",".join(SUITES), help=f"Comma-separated subset of {SUITES}")
+    parser.add_argument("--sizes", default=None, help="Catalog sizes, e.g. 10000,100000,1000000")
+    parser.add_argument("--quick", action="store_true", help="Small sizes, few repeats, short latency")
+    parser.add_argument("--latency-ms", type=float, default=None, help="Mock LLM latency (default 1500, quick 20)")
+    parser.add_argument("--jitter-ms", type=float, default=None, help="Mock LLM jitter (default 500, quick 5)")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--out", type=Path, default=None, help="Write results JSON here")
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.10, help="Max allowed new/old mean ratio")
+    args = parser.parse_args(argv)
+
+    args.suites = [s.strip() for s in args.suites.split(",") if s.strip()]
+    unknown = set(args.suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites: {sorted(unknown)}")
+    if args.sizes:
+        args.sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    else:
+        args.sizes = [10_000] if args.quick else list(DEFAULT_SIZES)
+    if args.latency_ms is None:
+        args.latency_ms = 20.0 if args.quick else 1500.0
+    if args.jitter_ms is None:
+        args.jitter_ms = 5.0 if args.quick else 500.0
+    args.repeat = 5 if args.quick else 20
+    args.repeat_slow = 2 if args.quick else 5
+    args.inner = 200 if args.quick else 2000
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    results: dict[str, Any] = {}
+    for suite in args.suites:
+        start = time.perf_counter()
+        _SUITE_FNS[suite](args, results)
+        print(f"[{suite}] done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    report = {"meta": collect_meta(args), "results": results}
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        old = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(report, old, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over x{args.threshold}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,9 +3,12 @@ from __future__ import annotations
 import os
 from pathlib import Path
 
-from flask import Flask, jsonify, render_template, request
+from flask import Flask, Response, jsonify, render_template, request
 
-from kasparro_agentic.orchestration.dag import run_workflow
+from kasparro_agentic.orchestration.dag import run_workflow, stream_workflow
+from kasparro_agentic.orchestration.graph_registry import warm_graphs
+from kasparro_agentic.routes.metrics import instrument_app
+from kasparro_agentic.routes.sse import sse_response
 
 # --- PATHS (repo structure) ---
 # src/app.py
@@ -20,6 +23,11 @@ app = Flask(
     static_url_path="/static",
 )
 
+instrument_app(app)
+
+# Pay graph compilation once at startup instead of on the first requests.
+GRAPH_COMPILE_STATS = warm_graphs()
+
 
 @app.get("/")
 def home():
@@ -56,6 +64,20 @@ def api_generate():
         return jsonify({"error": str(e)}), 500
 
 
+@app.post("/api/generate/stream")
+def api_generate_stream() -> Response | tuple[Response, int]:
+    """
+    Server-Sent Events variant of /api/generate:
+    `questions` first, then `token` events with answer chunks, then `done` (or `error`).
+    """
+    data = request.get_json(silent=True) or {}
+    product_name = (data.get("productName") or "").strip()
+    if not product_name:
+        return jsonify({"error": "productName is required"}), 400
+
+    return sse_response(stream_workflow(product_name))
+
+
 if __name__ == "__main__":
     # load_dotenv=False prevents rare startup hangs on some Windows setups
     app.run(host="127.0.0.1", port=5000, debug=True, load_dotenv=False)
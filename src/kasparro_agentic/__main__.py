@@ -2,9 +2,12 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from flask import Flask, jsonify, render_template, request
+from flask import Flask, Response, jsonify, render_template, request
 
-from kasparro_agentic.orchestration import run_agent_workflow
+from kasparro_agentic.orchestration import run_agent_workflow, stream_workflow
+from kasparro_agentic.orchestration.graph_registry import warm_graphs
+from kasparro_agentic.routes.metrics import instrument_app
+from kasparro_agentic.routes.sse import sse_response
 
 # Resolve project root: .../project/src/kasparro_agentic/__main__.py -> parents[2] is project root
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
@@ -18,6 +21,11 @@ app = Flask(
     static_url_path="/static",
 )
 
+instrument_app(app)
+
+# Pay graph compilation once at startup instead of on the first requests.
+GRAPH_COMPILE_STATS = warm_graphs()
+
 
 @app.get("/")
 def home():
@@ -35,5 +43,15 @@ def api_generate():
     return jsonify(result)
 
 
+@app.post("/api/generate/stream")
+def api_generate_stream() -> Response | tuple[Response, int]:
+    data = request.get_json(silent=True) or {}
+    product_name = str(data.get("productName", "")).strip()
+    if not product_name:
+        return jsonify({"error": "productName is required"}), 400
+
+    return sse_response(stream_workflow(product_name))
+
+
 if __name__ == "__main__":
     app.run(host="127.0.0.1", port=5000, debug=False)
@@ -1,37 +1,189 @@
 # src/kasparro_agentic/agents/output_agent.py
 from __future__ import annotations
 
+import itertools
 import json
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
 from ..core.validation import require
+from ..orchestration.incremental import NODE_CACHE_FILE, node_cache_payload
 
+_DIR_CACHE_MAX = 65536
 
-def _write_json(path: Path, payload: Any) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+# Temp names are unique per process, thread and write; O_EXCL still guards
+# against a stale file left by a crashed process that had the same pid.
+_TMP_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+_tmp_seq = itertools.count()
 
 
-def write_outputs(output_dir: Path, state: dict[str, Any]) -> dict[str, Path]:
+@dataclass
+class WriterStats:
+    written: int = 0
+    unchanged: int = 0
+
+
+class OutputWriter:
+    """
+    Writes output files atomically: each goes to a temp file in the target
+    directory and is renamed over the old one, so readers and a crashed run
+    only ever see a complete previous or complete new file.
+
+    - directories are created once per writer, not once per file
+    - with workers > 0, writes run on a background thread pool; `submit`
+      returns a Future and the caller decides when to wait
+    - skip_unchanged leaves files whose content is already identical alone
+      (same size, then same bytes), so re-runs keep mtimes and do not wake
+      downstream sync jobs
+    - fsync=True also makes each file durable before it is renamed in
+    """
+
+    def __init__(self, workers: int = 0, skip_unchanged: bool = True, fsync: bool = False) -> None:
+        self.skip_unchanged = skip_unchanged
+        self.fsync = fsync
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kasparro-io") if workers > 0 else None
+        self._dirs: set[str] = set()
+        self._lock = threading.Lock()
+        self._stats = WriterStats()
+
+    def ensure_dir(self, directory: Path) -> None:
+        key = str(directory)
+        if key in self._dirs:
+            return
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            if len(self._dirs) >= _DIR_CACHE_MAX:
+                self._dirs.clear()
+            self._dirs.add(key)
+
+    def _unchanged(self, path: Path, data: bytes) -> bool:
+        try:
+            if path.stat().st_size != len(data):
+                return False
+            return path.read_bytes() == data
+        except OSError:
+            return False
+
+    def write(self, path: Path, data: bytes) -> bool:
+        """Writes `data` to `path` now. False when the file already held exactly that content."""
+        if self.skip_unchanged and self._unchanged(path, data):
+            with self._lock:
+                self._stats.unchanged += 1
+            return False
+
+        self.ensure_dir(path.parent)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.{next(_tmp_seq)}.tmp")
+        try:
+            fd = os.open(tmp, _TMP_FLAGS, 0o666)
+        except FileExistsError:
+            tmp.unlink()
+            fd = os.open(tmp, _TMP_FLAGS, 0o666)
+        except FileNotFoundError:
+            # removed behind the cache's back (e.g. a cleaned output tree)
+            with self._lock:
+                self._dirs.discard(str(path.parent))
+            self.ensure_dir(path.parent)
+            fd = os.open(tmp, _TMP_FLAGS, 0o666)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        with self._lock:
+            self._stats.written += 1
+        return True
+
+    def submit(self, path: Path, data: bytes) -> Future[bool]:
+        """`write` on the pool (inline, returning a finished Future, without one)."""
+        if self._pool is not None:
+            return self._pool.submit(self.write, path, data)
+        fut: Future[bool] = Future()
+        try:
+            fut.set_result(self.write(path, data))
+        except Exception as e:  # noqa: BLE001
+            fut.set_exception(e)
+        return fut
+
+    def write_all(self, files: dict[Path, bytes]) -> dict[Path, bool]:
+        """Writes every file (concurrently on the pool) and waits; re-raises the first failure."""
+        futures = {path: self.submit(path, data) for path, data in files.items()}
+        wait(futures.values())
+        return {path: fut.result() for path, fut in futures.items()}
+
+    def stats(self) -> WriterStats:
+        with self._lock:
+            return WriterStats(self._stats.written, self._stats.unchanged)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+
+def _json_bytes(payload: Any) -> bytes:
+    return json.dumps(payload, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+_shared: dict[str, OutputWriter] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_output_writer() -> OutputWriter:
+    """
+    Env config:
+      - KASPARRO_OUTPUT_WORKERS: background write threads (default 0 = inline; worth
+        raising on slow or network filesystems)
+      - KASPARRO_OUTPUT_SKIP_UNCHANGED: leave identical files untouched (default 1)
+      - KASPARRO_OUTPUT_FSYNC: fsync each file before the rename (default 0)
+    """
+    with _shared_lock:
+        writer = _shared.get("default")
+        if writer is None:
+            writer = _shared["default"] = OutputWriter(
+                workers=int(os.getenv("KASPARRO_OUTPUT_WORKERS", "0").strip()),
+                skip_unchanged=os.getenv("KASPARRO_OUTPUT_SKIP_UNCHANGED", "1").strip() != "0",
+                fsync=os.getenv("KASPARRO_OUTPUT_FSYNC", "0").strip() == "1",
+            )
+        return writer
+
+
+def reset_output_writers() -> None:
+    with _shared_lock:
+        for writer in _shared.values():
+            writer.close()
+        _shared.clear()
+
+
+def output_payloads(state: dict[str, Any]) -> dict[str, Any]:
+    """The JSON documents a finished graph state produces, by output name."""
     require("faq" in state, "missing faq in graph state")
     require("product_page" in state, "missing product_page in graph state")
     require("comparison_page" in state, "missing comparison_page in graph state")
     require("dag_metadata" in state, "missing dag_metadata in graph state")
 
-    faq_path = output_dir / "faq.json"
-    product_path = output_dir / "product_page.json"
-    comparison_path = output_dir / "comparison_page.json"
-    dag_path = output_dir / "dag_metadata.json"
-
-    _write_json(faq_path, state["faq"])
-    _write_json(product_path, state["product_page"])
-    _write_json(comparison_path, state["comparison_page"])
-    _write_json(dag_path, state["dag_metadata"])
-
-    return {
-        "faq": faq_path,
-        "product_page": product_path,
-        "comparison_page": comparison_path,
-        "dag_metadata": dag_path,
-    }
+    payloads = {name: state[name] for name in ("faq", "product_page", "comparison_page", "dag_metadata")}
+    if state.get("node_cache"):
+        # fingerprints + outputs the next run compares against (see orchestration/incremental.py)
+        payloads["node_cache"] = node_cache_payload(state["node_cache"])
+    return payloads
+
+
+_FILE_NAMES = {"node_cache": NODE_CACHE_FILE}
+
+
+def write_outputs(output_dir: Path, state: dict[str, Any], writer: OutputWriter | None = None) -> dict[str, Path]:
+    payloads = output_payloads(state)
+    writer = writer or shared_output_writer()
+    paths = {name: output_dir / _FILE_NAMES.get(name, f"{name}.json") for name in payloads}
+
+    writer.ensure_dir(output_dir)
+    writer.write_all({paths[name]: _json_bytes(payload) for name, payload in payloads.items()})
+    return paths
@@ -2,23 +2,27 @@ from __future__ import annotations
 
 from typing import Any
 
-from kasparro_agentic.llm.provider import build_llm_provider
+from kasparro_agentic.llm.provider import LLMProvider
+from kasparro_agentic.llm.registry import get_llm_provider
 from kasparro_agentic.logic_blocks.comparison import build_fictional_product_b
-from kasparro_agentic.logic_blocks.comparison_page import build_comparison_page
-from kasparro_agentic.logic_blocks.faq import build_faq_page
-from kasparro_agentic.logic_blocks.product_page import build_product_page
+from kasparro_agentic.logic_blocks.comparison_page import (
+    abuild_comparison_page,
+    build_comparison_page,
+)
+from kasparro_agentic.logic_blocks.faq import abuild_faq_page, build_faq_page
+from kasparro_agentic.logic_blocks.product_page import abuild_product_page, build_product_page
 from kasparro_agentic.models import FictionalProduct, Product, Question
 
 
-def build_faq_page_agent(product: Product, questions: list[Question]) -> dict[str, Any]:
-    llm = build_llm_provider()
-    page = build_faq_page(product=product, questions=questions, llm=llm)
+def build_faq_page_agent(
+    product: Product, questions: list[Question], llm: LLMProvider | None = None
+) -> dict[str, Any]:
+    page = build_faq_page(product=product, questions=questions, llm=llm or get_llm_provider())
     return page.model_dump()
 
 
-def build_product_page_agent(product: Product) -> dict[str, Any]:
-    llm = build_llm_provider()
-    page = build_product_page(product=product, llm=llm)
+def build_product_page_agent(product: Product, llm: LLMProvider | None = None) -> dict[str, Any]:
+    page = build_product_page(product=product, llm=llm or get_llm_provider())
     return page.model_dump()
 
 
@@ -27,7 +31,27 @@ def build_fictional_product_b_agent(product_a: Product) -> FictionalProduct:
     return build_fictional_product_b(product_a)
 
 
-def build_comparison_page_agent(product_a: Product, product_b: FictionalProduct) -> dict[str, Any]:
-    llm = build_llm_provider()
-    page = build_comparison_page(product_a=product_a, product_b=product_b, llm=llm)
+def build_comparison_page_agent(
+    product_a: Product, product_b: FictionalProduct, llm: LLMProvider | None = None
+) -> dict[str, Any]:
+    page = build_comparison_page(product_a=product_a, product_b=product_b, llm=llm or get_llm_provider())
+    return page.model_dump()
+
+
+async def abuild_faq_page_agent(
+    product: Product, questions: list[Question], llm: LLMProvider | None = None
+) -> dict[str, Any]:
+    page = await abuild_faq_page(product=product, questions=questions, llm=llm or get_llm_provider())
+    return page.model_dump()
+
+
+async def abuild_product_page_agent(product: Product, llm: LLMProvider | None = None) -> dict[str, Any]:
+    page = await abuild_product_page(product=product, llm=llm or get_llm_provider())
+    return page.model_dump()
+
+
+async def abuild_comparison_page_agent(
+    product_a: Product, product_b: FictionalProduct, llm: LLMProvider | None = None
+) -> dict[str, Any]:
+    page = await abuild_comparison_page(product_a=product_a, product_b=product_b, llm=llm or get_llm_provider())
     return page.model_dump()
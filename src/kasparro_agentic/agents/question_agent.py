@@ -1,56 +1,44 @@
 from __future__ import annotations
 
-from kasparro_agentic.llm.provider import build_llm_provider
+from collections.abc import Iterator
+
+from kasparro_agentic.llm.provider import LLMProvider
+from kasparro_agentic.llm.registry import get_llm_provider
 from kasparro_agentic.models import Product, Question, QuestionList
+from kasparro_agentic.templates.prompts import ANSWER_PROMPT, QUESTIONS_PROMPT, product_block
 
 
-def generate_questions(product: Product) -> list[Question]:
-    llm = build_llm_provider()
+def _questions_prompt(product: Product) -> str:
+    return QUESTIONS_PROMPT.render(product_block("questions", product))
 
-    prompt = f"""
-Generate at least 15 product FAQ questions with categories.
-Return JSON matching this schema:
 
-{{
-  "questions": [
-    {{"category": "Benefits", "question": "..."}},
-    ...
-  ]
-}}
+def _answer_prompt(product: Product, question: str) -> str:
+    return ANSWER_PROMPT.render(question, product_block("answer", product))
 
-Product context:
-- product_name: {product.product_name}
-- brand: {product.brand}
-- category: {product.category}
-- benefits: {product.benefits}
-- how_to_use: {product.how_to_use}
-""".strip()
 
-    out = llm.invoke_structured(prompt, QuestionList)
+def generate_questions(product: Product, llm: LLMProvider | None = None) -> list[Question]:
+    llm = llm or get_llm_provider()
+    out = llm.invoke_structured(_questions_prompt(product), QuestionList)
     return out.questions
 
 
-def generate_answer(product: Product, question: str) -> str:
-    llm = build_llm_provider()
+def generate_answer(product: Product, question: str, llm: LLMProvider | None = None) -> str:
+    llm = llm or get_llm_provider()
+    return llm.invoke_text(_answer_prompt(product, question)).strip()
+
 
-    prompt = f"""
-You are an expert product assistant.
-Write a clear, helpful, safe, non-medical answer to the question below,
-based on the provided product context.
+def stream_answer(product: Product, question: str, llm: LLMProvider | None = None) -> Iterator[str]:
+    """Answer chunks as the provider produces them (joined, they equal generate_answer before strip)."""
+    llm = llm or get_llm_provider()
+    yield from llm.stream_text(_answer_prompt(product, question))
 
-Question: {question}
 
-Product Context:
-- Name: {product.product_name}
-- Brand: {product.brand}
-- Key Ingredients: {product.key_ingredients}
-- How to use: {product.how_to_use}
-- Side effects: {product.side_effects}
+async def agenerate_questions(product: Product, llm: LLMProvider | None = None) -> list[Question]:
+    llm = llm or get_llm_provider()
+    out = await llm.ainvoke_structured(_questions_prompt(product), QuestionList)
+    return out.questions
 
-Constraints:
-- Be practical and consumer-friendly.
-- Mention patch test and irritation guidance.
-- Avoid medical claims.
-""".strip()
 
-    return llm.invoke_text(prompt).strip()
+async def agenerate_answer(product: Product, question: str, llm: LLMProvider | None = None) -> str:
+    llm = llm or get_llm_provider()
+    return (await llm.ainvoke_text(_answer_prompt(product, question))).strip()
@@ -0,0 +1,196 @@
+# src/kasparro_agentic/agents/shard_sink.py
+from __future__ import annotations
+
+import gzip
+import json
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import IO, Any
+
+from .output_agent import output_payloads
+
+INDEX_FILE = "index.jsonl"
+COMPRESSIONS = ("none", "gzip", "zstd")
+DEFAULT_SHARD_BYTES = 256 * 1024 * 1024
+
+_SUFFIX = {"none": ".jsonl", "gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+_SHARD_NAME = re.compile(r"^pages-(\d{5})\.jsonl(?:\.gz|\.zst)?$")
+
+
+def _zstd() -> ModuleType:
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError("zstd compression needs the 'zstandard' package (pip install zstandard)") from e
+    return zstandard
+
+
+# ----------------------------
+# Per-record frames
+# ----------------------------
+# Every record is compressed on its own. Concatenated gzip members and zstd
+# frames are still one valid stream (zcat / zstdcat read a whole shard), and
+# any record can be decompressed alone from its (offset, length).
+_local = threading.local()
+
+
+def _encode(line: bytes, compression: str) -> bytes:
+    if compression == "gzip":
+        return gzip.compress(line, compresslevel=6, mtime=0)
+    if compression == "zstd":
+        compressor = getattr(_local, "zstd", None)
+        if compressor is None:  # compressor objects are not thread-safe
+            compressor = _local.zstd = _zstd().ZstdCompressor(level=3)
+        return bytes(compressor.compress(line))
+    return line
+
+
+def _decode(frame: bytes, compression: str) -> bytes:
+    if compression == "gzip":
+        return gzip.decompress(frame)
+    if compression == "zstd":
+        return bytes(_zstd().ZstdDecompressor().decompress(frame))
+    return frame
+
+
+def _compression_of(shard: str) -> str:
+    if shard.endswith(".gz"):
+        return "gzip"
+    if shard.endswith(".zst"):
+        return "zstd"
+    return "none"
+
+
+def _drop_torn_tail(path: Path, chunk: int = 64 * 1024) -> None:
+    """Truncates `path` after its last newline, so the next append starts a fresh line."""
+    try:
+        f = path.open("r+b")
+    except FileNotFoundError:
+        return
+    with f:
+        end = f.seek(0, 2)
+        pos = end
+        while pos > 0:
+            start = max(0, pos - chunk)
+            f.seek(start)
+            cut = f.read(pos - start).rfind(b"\n")
+            if cut >= 0:
+                pos = start + cut + 1
+                break
+            pos = start
+        if pos != end:
+            f.truncate(pos)
+
+
+@dataclass(frozen=True)
+class ShardLocation:
+    shard: str
+    offset: int
+    length: int
+
+
+class ShardSink:
+    """
+    Appends one compact JSON record per product to sharded JSON Lines files
+    (pages-00000.jsonl[.gz|.zst], ...) and a byte-offset entry per record to
+    index.jsonl, instead of one pretty-printed file per page.
+
+    - every run starts a new shard, so a torn tail from a crashed run is never
+      appended to; shards roll over after `shard_bytes`
+    - a record reaches its shard before its index entry, so an indexed
+      record is always complete; a torn index entry is dropped on open
+    - a key written twice resolves to its latest record
+    - safe to share across threads; compression runs outside the lock
+    """
+
+    def __init__(
+        self, directory: Path, compression: str = "none", shard_bytes: int = DEFAULT_SHARD_BYTES
+    ) -> None:
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression {compression!r}; expected one of {COMPRESSIONS}")
+        if compression == "zstd":
+            _zstd()  # fail at startup, not on the first record
+        self.directory = directory
+        self.compression = compression
+        self.shard_bytes = shard_bytes
+        self._lock = threading.Lock()
+        directory.mkdir(parents=True, exist_ok=True)
+        existing = [int(m.group(1)) for p in directory.iterdir() if (m := _SHARD_NAME.match(p.name))]
+        self._next_shard = max(existing, default=-1) + 1
+        self._shard: IO[bytes] | None = None
+        self._shard_name = ""
+        # a crash mid-entry leaves a line without its newline; appending after
+        # it would merge the torn entry with the next one and lose both
+        _drop_torn_tail(directory / INDEX_FILE)
+        self._index = (directory / INDEX_FILE).open("ab")
+
+    def _roll(self) -> IO[bytes]:
+        if self._shard is not None:
+            self._shard.close()
+        self._shard_name = f"pages-{self._next_shard:05d}{_SUFFIX[self.compression]}"
+        self._next_shard += 1
+        self._shard = (self.directory / self._shard_name).open("ab")
+        return self._shard
+
+    def append(self, key: str, record: dict[str, Any]) -> ShardLocation:
+        line = json.dumps({"key": key, **record}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        frame = _encode(line + b"\n", self.compression)
+        with self._lock:
+            shard = self._shard
+            if shard is None or shard.tell() >= self.shard_bytes:
+                shard = self._roll()
+            location = ShardLocation(self._shard_name, shard.tell(), len(frame))
+            shard.write(frame)
+            shard.flush()
+            entry = {"key": key, "shard": location.shard, "offset": location.offset, "length": location.length}
+            self._index.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+            self._index.flush()
+        return location
+
+    def write_outputs(self, key: str, state: dict[str, Any]) -> ShardLocation:
+        """The shard counterpart of output_agent.write_outputs: one record holding every page."""
+        return self.append(key, output_payloads(state))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._shard is not None:
+                self._shard.close()
+                self._shard = None
+            self._index.close()
+
+
+class ShardReader:
+    """Random access to the records a ShardSink wrote: one seek and one read per lookup."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.locations: dict[str, ShardLocation] = {}
+        try:
+            raw = (directory / INDEX_FILE).read_bytes()
+        except FileNotFoundError:
+            return
+        for line in raw.splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn last line from a crashed run
+            self.locations[entry["key"]] = ShardLocation(entry["shard"], entry["offset"], entry["length"])
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.locations
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        location = self.locations.get(key)
+        if location is None:
+            return None
+        with (self.directory / location.shard).open("rb") as f:
+            f.seek(location.offset)
+            frame = f.read(location.length)
+        record: dict[str, Any] = json.loads(_decode(frame, _compression_of(location.shard)))
+        return record
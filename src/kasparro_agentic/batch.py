@@ -0,0 +1,354 @@
+# src/kasparro_agentic/batch.py
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .agents.output_agent import write_outputs
+from .agents.shard_sink import COMPRESSIONS, ShardReader, ShardSink
+from .core.logging import get_logger
+from .core.tracing import chrome_trace_events, trace_path_from_env, write_chrome_trace
+from .data.product_store import iter_products
+from .models import Product
+from .orchestration.checkpoint import (
+    NodeCheckpointer,
+    build_checkpointer,
+    shared_checkpointer,
+    with_checkpoint,
+)
+from .orchestration.incremental import load_node_cache
+from .orchestration.langgraph_pipeline import execution_config, get_graph
+
+logger = get_logger(__name__)
+
+CHECKPOINT_FILE = "_completed.txt"
+REPORT_FILE = "batch_report.json"
+
+
+def product_key(product_name: str) -> str:
+    """Filesystem-safe, stable key used for the output directory and the checkpoint."""
+    slug = re.sub(r"[^a-z0-9]+", "-", product_name.lower()).strip("-")
+    return slug or "product"
+
+
+def _keyed(products: Iterable[Product]) -> Iterator[tuple[str, Product]]:
+    # Disambiguate duplicate names deterministically so resumes line up.
+    seen: dict[str, int] = {}
+    for product in products:
+        base = product_key(product.product_name)
+        seen[base] = seen.get(base, 0) + 1
+        yield (base if seen[base] == 1 else f"{base}-{seen[base]}"), product
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(values)
+
+    def rank(p: float) -> float:
+        # nearest-rank percentile
+        idx = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+        return round(ordered[idx], 3)
+
+    return {"p50": rank(50), "p90": rank(90), "p99": rank(99), "max": round(ordered[-1], 3)}
+
+
+class CompletionCheckpoint:
+    """Append-only list of completed product keys; safe to share across workers."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self.completed: set[str] = set()
+        if path.exists():
+            self.completed = {line.strip() for line in path.read_text(encoding="utf-8").splitlines() if line.strip()}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.completed
+
+    def mark(self, key: str) -> None:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(key + "\n")
+                f.flush()
+            self.completed.add(key)
+
+
+@dataclass
+class BatchReport:
+    total: int = 0
+    completed: int = 0
+    skipped: int = 0
+    failed: int = 0
+    elapsed_s: float = 0.0
+    failures: dict[str, str] = field(default_factory=dict)
+    stage_latencies_ms: dict[str, list[float]] = field(default_factory=dict)
+    # per node: how many products rebuilt it vs. reused the previous output
+    regenerated: dict[str, int] = field(default_factory=dict)
+    reused: dict[str, int] = field(default_factory=dict)
+    # products that had a previous run but changed: key -> regenerated nodes
+    changed: dict[str, list[str]] = field(default_factory=dict)
+
+    def record_incremental(self, key: str, incremental: dict[str, list[str]], had_previous: bool) -> None:
+        for name in incremental.get("regenerated", []):
+            self.regenerated[name] = self.regenerated.get(name, 0) + 1
+        for name in incremental.get("reused", []):
+            self.reused[name] = self.reused.get(name, 0) + 1
+        if had_previous and incremental.get("regenerated"):
+            self.changed[key] = list(incremental["regenerated"])
+
+    @property
+    def products_per_min(self) -> float:
+        return round(self.completed / self.elapsed_s * 60, 2) if self.elapsed_s else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "total": self.total,
+            "completed": self.completed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "elapsed_s": round(self.elapsed_s, 3),
+            "products_per_min": self.products_per_min,
+            "stage_latency_ms": {name: percentiles(v) for name, v in sorted(self.stage_latencies_ms.items())},
+            "incremental": {
+                "regenerated": dict(sorted(self.regenerated.items())),
+                "reused": dict(sorted(self.reused.items())),
+                "changed_products": dict(sorted(self.changed.items())),
+            },
+            "failures": self.failures,
+        }
+
+
+# (stage latencies in ms, raw node spans, regenerated/reused nodes, had a previous run)
+ProductResult = tuple[dict[str, float], list[dict[str, Any]], dict[str, list[str]], bool]
+
+
+OUTPUT_FORMATS = ("files", "jsonl")
+
+
+class _ProductOutputs:
+    """Where finished products go, and where their previous node cache comes from."""
+
+    def previous(self, key: str) -> dict[str, Any]:
+        raise NotImplementedError
+
+    def write(self, key: str, state: dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        return None
+
+
+class _DirectoryOutputs(_ProductOutputs):
+    def __init__(self, output_dir: Path) -> None:
+        self.output_dir = output_dir
+
+    def previous(self, key: str) -> dict[str, Any]:
+        return load_node_cache(self.output_dir / key)
+
+    def write(self, key: str, state: dict[str, Any]) -> None:
+        write_outputs(self.output_dir / key, state)
+
+
+class _ShardOutputs(_ProductOutputs):
+    def __init__(self, output_dir: Path, compression: str) -> None:
+        # records from earlier runs; this run appends to fresh shards
+        self.reader = ShardReader(output_dir)
+        self.sink = ShardSink(output_dir, compression)
+
+    def previous(self, key: str) -> dict[str, Any]:
+        record = self.reader.get(key) if key in self.reader else None
+        node_cache: dict[str, Any] = (record or {}).get("node_cache", {})
+        return node_cache
+
+    def write(self, key: str, state: dict[str, Any]) -> None:
+        self.sink.write_outputs(key, state)
+
+    def close(self) -> None:
+        self.sink.close()
+
+
+def _process_one(
+    graph: Any,
+    config: Any,
+    key: str,
+    product: Product,
+    outputs: _ProductOutputs,
+    node_checkpointer: NodeCheckpointer | None = None,
+) -> ProductResult:
+    start = time.perf_counter()
+    previous = outputs.previous(key)
+    config = with_checkpoint(config, node_checkpointer, key)
+    state = graph.invoke({"raw_product": product.model_dump(), "previous_outputs": previous}, config=config)
+    outputs.write(key, state)
+    if node_checkpointer is not None:
+        node_checkpointer.clear(key)
+
+    spans = state.get("node_timings", [])
+    stages = {t["name"]: (t["end_s"] - t["start_s"]) * 1000 for t in spans}
+    stages["product_total"] = (time.perf_counter() - start) * 1000
+    return stages, spans, state["dag_metadata"]["incremental"], bool(previous)
+
+
+def run_batch(
+    dataset_path: Path,
+    output_dir: Path,
+    workers: int = 4,
+    max_concurrency: int | None = None,
+    resume: bool = True,
+    trace_path: Path | None = None,
+    node_checkpointer: NodeCheckpointer | None = None,
+    output_format: str = "files",
+    compression: str = "none",
+) -> BatchReport:
+    """
+    Streams products from a JSON/JSONL/CSV dataset through the compiled page graph.
+
+    - output_format="files": one output directory per product,
+      <output_dir>/<product_key>/; "jsonl": one compact record per product in
+      sharded JSON Lines files plus a byte-offset index (agents/shard_sink.py),
+      each record optionally gzip/zstd compressed
+    - completed keys are appended to <output_dir>/_completed.txt, so a rerun
+      with resume=True skips them
+    - with resume=False every product runs again, but only nodes whose inputs
+      changed since the last run are regenerated (the report lists them)
+    - with node_checkpointer (or KASPARRO_CHECKPOINT_PATH), each LLM node's
+      output is saved as it completes, so a product that failed or was
+      interrupted mid-graph resumes after its last finished node
+    - at most 2 * workers products are in flight, so memory stays bounded
+    - trace_path (or KASPARRO_TRACE_PATH) writes one Chrome/Perfetto trace
+      with a process track per product
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format {output_format!r}; expected one of {OUTPUT_FORMATS}")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    outputs = (
+        _ShardOutputs(output_dir, compression) if output_format == "jsonl" else _DirectoryOutputs(output_dir)
+    )
+    checkpoint_path = output_dir / CHECKPOINT_FILE
+    if not resume and checkpoint_path.exists():
+        checkpoint_path.unlink()
+    checkpoint = CompletionCheckpoint(checkpoint_path)
+
+    graph = get_graph()
+    config = execution_config(max_concurrency)
+    node_checkpointer = node_checkpointer or shared_checkpointer()
+    report = BatchReport()
+    window = max(1, workers) * 2
+    start = time.perf_counter()
+    trace_path = trace_path or trace_path_from_env()
+    trace_events: list[dict[str, Any]] = []
+
+    def collect(done: set[Future[ProductResult]], pending: dict[Future[ProductResult], str]) -> None:
+        for fut in done:
+            key = pending.pop(fut)
+            try:
+                stages, spans, incremental, had_previous = fut.result()
+            except Exception as e:  # noqa: BLE001
+                report.failed += 1
+                report.failures[key] = str(e)
+                logger.warning("Product %s failed: %s", key, e)
+                continue
+            checkpoint.mark(key)
+            report.completed += 1
+            for name, ms in stages.items():
+                report.stage_latencies_ms.setdefault(name, []).append(ms)
+            report.record_incremental(key, incremental, had_previous)
+            if trace_path is not None:
+                trace_events.extend(chrome_trace_events(spans, start, pid=report.completed, process_name=key))
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="kasparro-batch") as pool:
+            pending: dict[Future[ProductResult], str] = {}
+            for key, product in _keyed(iter_products(dataset_path)):
+                report.total += 1
+                if key in checkpoint:
+                    report.skipped += 1
+                    continue
+                if len(pending) >= window:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done, pending)
+                fut = pool.submit(_process_one, graph, config, key, product, outputs, node_checkpointer)
+                pending[fut] = key
+
+            if pending:
+                done, _ = wait(pending)
+                collect(done, pending)
+    finally:
+        outputs.close()
+
+    report.elapsed_s = time.perf_counter() - start
+    if trace_path is not None:
+        write_chrome_trace(trace_path, trace_events)
+    (output_dir / REPORT_FILE).write_text(json.dumps(report.as_dict(), indent=2), encoding="utf-8")
+    logger.info(
+        "Batch done: %d completed, %d skipped, %d failed, %.2f products/min",
+        report.completed,
+        report.skipped,
+        report.failed,
+        report.products_per_min,
+    )
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate pages for every product in a dataset.")
+    parser.add_argument("--dataset", default=os.getenv("KASPARRO_DATA_PATH", ""), help="JSON, JSONL or CSV product file")
+    parser.add_argument("--out-dir", default="outputs/batch")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-concurrency", type=int, default=None, help="per-product graph concurrency")
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="ignore the completion checkpoint; unchanged pages are still reused",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="save node outputs here (*.db = SQLite, else a directory) so interrupted products resume",
+    )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="files",
+        help="files: a directory of JSON pages per product; jsonl: sharded records plus an offset index",
+    )
+    parser.add_argument(
+        "--compression", choices=COMPRESSIONS, default="none", help="per-record compression for --format jsonl"
+    )
+    parser.add_argument("--trace", default=None, help="write a Chrome/Perfetto trace JSON here")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args(argv)
+
+    if not args.dataset:
+        parser.error("--dataset is required (or set KASPARRO_DATA_PATH)")
+
+    logger.setLevel(args.log_level.upper())
+    report = run_batch(
+        Path(args.dataset),
+        Path(args.out_dir),
+        workers=args.workers,
+        max_concurrency=args.max_concurrency,
+        resume=not args.no_resume,
+        trace_path=Path(args.trace) if args.trace else None,
+        node_checkpointer=build_checkpointer(Path(args.checkpoint)) if args.checkpoint else None,
+        output_format=args.format,
+        compression=args.compression,
+    )
+    print(json.dumps(report.as_dict(), indent=2))
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import contextvars
+import json
+import os
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from kasparro_agentic.core.metrics import NODE_LATENCY
+
+# Span of the node currently running in this context. Worker threads and
+# asyncio.to_thread copy the context, so LLM calls made on their behalf land
+# on the same span object.
+_current_span: contextvars.ContextVar[NodeSpan | None] = contextvars.ContextVar("kasparro_node_span", default=None)
+
+
+@dataclass
+class NodeSpan:
+    """
+    One node execution. start_s/end_s are perf_counter() timestamps; cpu_s is
+    thread CPU time, so for async nodes it only covers the node's own steps on
+    the event loop thread.
+    """
+
+    name: str
+    start_s: float = 0.0
+    end_s: float = 0.0
+    cpu_s: float = 0.0
+    thread: str = ""
+    llm_calls: int = 0
+    cache_hits: int = 0
+    prompt_chars: int = 0
+    response_chars: int = 0
+    # structured calls answered by a mock stand-in (see llm.provider.is_fallback)
+    fallbacks: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add_llm_call(self, prompt_chars: int, response_chars: int) -> None:
+        with self._lock:
+            self.llm_calls += 1
+            self.prompt_chars += prompt_chars
+            self.response_chars += response_chars
+
+    def add_cache_hit(self) -> None:
+        with self._lock:
+            self.cache_hits += 1
+
+    def add_fallback(self) -> None:
+        with self._lock:
+            self.fallbacks += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "start_s": self.start_s,
+            "end_s": self.end_s,
+            "cpu_s": self.cpu_s,
+            "thread": self.thread,
+            "llm_calls": self.llm_calls,
+            "cache_hits": self.cache_hits,
+            "prompt_chars": self.prompt_chars,
+            "response_chars": self.response_chars,
+            "fallbacks": self.fallbacks,
+        }
+
+
+@contextmanager
+def node_span(name: str) -> Iterator[NodeSpan]:
+    span = NodeSpan(name=name, thread=threading.current_thread().name)
+    token = _current_span.set(span)
+    cpu_start = time.thread_time()
+    span.start_s = time.perf_counter()
+    try:
+        yield span
+    finally:
+        span.end_s = time.perf_counter()
+        span.cpu_s = time.thread_time() - cpu_start
+        _current_span.reset(token)
+        NODE_LATENCY.labels(name).observe(span.end_s - span.start_s)
+
+
+def current_span() -> NodeSpan | None:
+    return _current_span.get()
+
+
+def record_llm_call(prompt: str, response_chars: int) -> None:
+    span = _current_span.get()
+    if span is not None:
+        span.add_llm_call(len(prompt), response_chars)
+
+
+def record_cache_hit() -> None:
+    span = _current_span.get()
+    if span is not None:
+        span.add_cache_hit()
+
+
+def record_llm_fallback() -> None:
+    span = _current_span.get()
+    if span is not None:
+        span.add_fallback()
+
+
+# ----------------------------
+# Chrome trace / Perfetto export
+# ----------------------------
+def chrome_trace_events(
+    spans: Iterable[dict[str, Any]],
+    t0: float,
+    pid: int = 1,
+    process_name: str | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Complete ("X") events for span dicts, timestamps in microseconds since t0.
+    One track per thread; `pid` separates products when several runs share a file.
+    """
+    events: list[dict[str, Any]] = []
+    if process_name:
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": process_name}})
+
+    tids: dict[str, int] = {}
+    for span in spans:
+        thread = str(span.get("thread") or "main")
+        tid = tids.setdefault(thread, len(tids) + 1)
+        args = {k: span[k] for k in ("cpu_s", "llm_calls", "cache_hits", "prompt_chars", "response_chars") if k in span}
+        events.append(
+            {
+                "name": span["name"],
+                "cat": "node",
+                "ph": "X",
+                "ts": round((span["start_s"] - t0) * 1e6, 1),
+                "dur": round((span["end_s"] - span["start_s"]) * 1e6, 1),
+                "pid": pid,
+                "tid": tid,
+                "args": args,
+            }
+        )
+    for thread, tid in tids.items():
+        events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread}})
+    return events
+
+
+def write_chrome_trace(path: Path, events: list[dict[str, Any]]) -> Path:
+    """Writes a trace viewable in chrome://tracing or ui.perfetto.dev."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}), encoding="utf-8")
+    return path
+
+
+def trace_path_from_env() -> Path | None:
+    """KASPARRO_TRACE_PATH: where to write the Chrome trace (unset = no export)."""
+    raw = os.getenv("KASPARRO_TRACE_PATH", "").strip()
+    return Path(raw) if raw else None
@@ -0,0 +1,149 @@
+# src/kasparro_agentic/data/json_stream.py
+from __future__ import annotations
+
+import json
+from collections.abc import Iterator
+from typing import Any, TextIO
+
+_WS = " \t\n\r"
+_DECODER = json.JSONDecoder()
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# A decode error further than this from the end of the buffer cannot be a
+# literal or number cut off by a chunk boundary, so reading on won't fix it.
+_LOOKAHEAD = 4096
+# Characters of context shown on each side of a decode error.
+_ERROR_CONTEXT = 40
+
+
+class _ChunkReader:
+    """
+    Incremental view over a text stream. Only the unread tail of the buffer is
+    kept, so memory is bounded by one chunk plus the value being decoded.
+    """
+
+    def __init__(self, f: TextIO, chunk_size: int) -> None:
+        self.f = f
+        self.chunk_size = max(1, chunk_size)
+        self.buf = ""
+        self.pos = 0
+        self.offset = 0  # stream position of buf[0], for error messages
+        self.eof = False
+
+    def fill(self, size: int | None = None) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.offset += self.pos
+        self.buf = self.buf[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str | None:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return None
+
+    def expect(self, ch: str) -> None:
+        got = self.peek()
+        if got != ch:
+            raise ValueError(f"Malformed JSON: expected {ch!r}, got {got!r}")
+        self.pos += 1
+
+    def decode(self) -> Any:
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                # only a value still running past the buffer is worth more input;
+                # an unterminated string may legitimately span many chunks
+                truncated = e.msg.startswith("Unterminated string") or len(self.buf) - e.pos <= _LOOKAHEAD
+                if truncated and self.fill(size):
+                    # grow reads for large values to avoid re-parsing too often
+                    size *= 2
+                    continue
+                error_pos, error_msg = e.pos, e.msg
+            else:
+                if end == len(self.buf) and self.fill(size):
+                    # a number/literal may continue in the next chunk
+                    size *= 2
+                    continue
+                self.pos = end
+                return value
+            # raised outside the except block: the JSONDecodeError holds the whole buffer
+            raise self._malformed(error_pos, error_msg)
+
+    def _malformed(self, pos: int, msg: str) -> ValueError:
+        near = self.buf[max(0, pos - _ERROR_CONTEXT) : pos + _ERROR_CONTEXT]
+        return ValueError(f"Malformed JSON at character {self.offset + pos}: {msg} (near {near!r})")
+
+
+def _iter_array(reader: _ChunkReader) -> Iterator[Any]:
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        yield reader.decode()
+        ch = reader.peek()
+        reader.pos += 1
+        if ch == "]":
+            return
+        if ch != ",":
+            raise ValueError(f"Malformed JSON array: unexpected {ch!r}")
+
+
+def iter_json_array(f: TextIO, key: str = "products", chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Yields the elements of a top-level JSON array, or of the array stored under
+    `key` in a top-level object, without reading the whole document.
+    Any other document shape yields nothing.
+    """
+    reader = _ChunkReader(f, chunk_size)
+    head = reader.peek()
+
+    if head == "[":
+        yield from _iter_array(reader)
+        return
+    if head != "{":
+        return
+
+    reader.pos += 1
+    if reader.peek() == "}":
+        return
+    while True:
+        name = reader.decode()
+        reader.expect(":")
+        if name == key:
+            if reader.peek() == "[":
+                yield from _iter_array(reader)
+            return
+        reader.decode()  # skip unrelated value
+        ch = reader.peek()
+        reader.pos += 1
+        if ch == "}":
+            return
+        if ch != ",":
+            raise ValueError(f"Malformed JSON object: unexpected {ch!r}")
+
+
+def iter_json_lines(f: TextIO) -> Iterator[Any]:
+    """JSON Lines: one value per line, blank lines ignored."""
+    for lineno, line in enumerate(f, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {lineno}: {e}") from e
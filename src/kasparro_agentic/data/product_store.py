@@ -3,14 +3,20 @@
 from __future__ import annotations
 
 import csv
-import json
+import logging
 import os
-from collections.abc import Iterable
+import stat
+import threading
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
+from kasparro_agentic.data.json_stream import iter_json_array, iter_json_lines
 from kasparro_agentic.models import Product
 
+logger = logging.getLogger(__name__)
+
 
 def _as_list(x: Any) -> list[str]:
     if x is None:
@@ -62,12 +68,7 @@ def _product_from_dict(d: dict[str, Any]) -> Product:
     )
 
 
-def _iter_json_products(path: Path) -> Iterable[Product]:
-    data = json.loads(path.read_text(encoding="utf-8"))
-    # Updated to use the 'X | Y' style for isinstance
-    items = data.get("products", []) if isinstance(data, dict) else data
-    if not isinstance(items, list):
-        return []
+def _products_from_items(items: Iterable[Any]) -> Iterator[Product]:
     for item in items:
         if isinstance(item, dict):
             p = _product_from_dict(item)
@@ -75,6 +76,17 @@ def _iter_json_products(path: Path) -> Iterable[Product]:
                 yield p
 
 
+def _iter_json_products(path: Path) -> Iterable[Product]:
+    # Streams a top-level array or {"products": [...]}; never loads the whole file.
+    with path.open("r", encoding="utf-8") as f:
+        yield from _products_from_items(iter_json_array(f, key="products"))
+
+
+def _iter_jsonl_products(path: Path) -> Iterable[Product]:
+    with path.open("r", encoding="utf-8") as f:
+        yield from _products_from_items(iter_json_lines(f))
+
+
 def _iter_csv_products(path: Path) -> Iterable[Product]:
     with path.open("r", encoding="utf-8", newline="") as f:
         reader = csv.DictReader(f)
@@ -84,13 +96,170 @@ def _iter_csv_products(path: Path) -> Iterable[Product]:
                 yield p
 
 
+def iter_products(path: Path) -> Iterable[Product]:
+    """Stream products from a JSON, JSON Lines or CSV dataset, dispatching on the file suffix."""
+    suffix = path.suffix.lower()
+    if suffix == ".json":
+        return _iter_json_products(path)
+    if suffix in (".jsonl", ".ndjson"):
+        return _iter_jsonl_products(path)
+    if suffix == ".csv":
+        return _iter_csv_products(path)
+    raise ValueError(f"Unsupported dataset format: {path}")
+
+
+def _trigrams(s: str) -> set[str]:
+    return {s[i : i + 3] for i in range(len(s) - 2)}
+
+
+@dataclass(frozen=True)
+class _ProductIndex:
+    products: list[Product] = field(default_factory=list)
+    names: list[str] = field(default_factory=list)
+    exact: dict[str, int] = field(default_factory=dict)
+    grams: dict[str, list[int]] = field(default_factory=dict)
+
+
+class ProductStore:
+    """
+    Loads the dataset files once and indexes them:
+      - exact: case-folded name -> first matching product (O(1))
+      - trigram inverted index for the "contains" fallback; candidates come
+        from the shortest posting list and are verified in dataset order
+
+    Every lookup stats the files (cheap) and reloads if any mtime/size changed.
+    """
+
+    def __init__(self, paths: Iterable[Path]) -> None:
+        unique: dict[Path, None] = {}
+        for p in paths:
+            unique.setdefault(p.resolve(), None)
+        self.paths = tuple(unique)
+        self._lock = threading.Lock()
+        self._signature: tuple[tuple[str, int, int], ...] | None = None
+        self._index = _ProductIndex()
+
+    def _current_signature(self) -> tuple[tuple[str, int, int], ...]:
+        sig: list[tuple[str, int, int]] = []
+        for p in self.paths:
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                sig.append((str(p), st.st_mtime_ns, st.st_size))
+        return tuple(sig)
+
+    def _ensure_loaded(self) -> _ProductIndex:
+        sig = self._current_signature()
+        if sig != self._signature:
+            with self._lock:
+                if sig != self._signature:
+                    self._build(sig)
+        # a single reference, so concurrent readers never see a half-built index
+        return self._index
+
+    def _build(self, sig: tuple[tuple[str, int, int], ...]) -> None:
+        products: list[Product] = []
+        for path_str, _, _ in sig:
+            # each file is parsed in full before any of it is indexed, so a file
+            # that fails mid-way (malformed, mid-rewrite, unreadable) adds nothing
+            try:
+                parsed = list(iter_products(Path(path_str)))
+            except (OSError, ValueError, csv.Error) as e:
+                logger.warning("Skipping dataset %s: %s", path_str, e)
+                continue
+            products.extend(parsed)
+
+        names = [p.product_name.casefold() for p in products]
+        exact: dict[str, int] = {}
+        grams: dict[str, list[int]] = {}
+        for idx, name in enumerate(names):
+            exact.setdefault(name, idx)
+            for g in _trigrams(name):
+                grams.setdefault(g, []).append(idx)
+
+        self._index = _ProductIndex(products=products, names=names, exact=exact, grams=grams)
+        self._signature = sig
+
+    def __len__(self) -> int:
+        return len(self._ensure_loaded().products)
+
+    def get(self, product_name: str) -> Product | None:
+        """Case-insensitive exact match."""
+        index = self._ensure_loaded()
+        idx = index.exact.get(product_name.strip().casefold())
+        return None if idx is None else index.products[idx]
+
+    def search(self, fragment: str) -> Product | None:
+        """First product (in dataset order) whose name contains the fragment."""
+        index = self._ensure_loaded()
+        t = fragment.strip().casefold()
+        if not t:
+            return None
+
+        if len(t) < 3:
+            # too short for the trigram index; rare on the request path
+            return next((index.products[i] for i, n in enumerate(index.names) if t in n), None)
+
+        postings: list[list[int]] = []
+        for g in _trigrams(t):
+            posting = index.grams.get(g)
+            if posting is None:
+                return None
+            postings.append(posting)
+
+        for idx in min(postings, key=len):
+            if t in index.names[idx]:
+                return index.products[idx]
+        return None
+
+    def find(self, product_name: str) -> Product | None:
+        """Exact match first, then contains (same precedence as the old linear scans)."""
+        return self.get(product_name) or self.search(product_name)
+
+
+def _candidate_paths() -> tuple[Path, ...]:
+    env_path = os.getenv("KASPARRO_DATA_PATH", "").strip()
+    candidates: list[Path] = []
+    if env_path:
+        candidates.append(Path(env_path))
+
+    # common defaults
+    root = Path(__file__).resolve().parents[2]  # .../src
+    candidates += [
+        root / "data" / "products.json",
+        root / "data" / "products.jsonl",
+        root / "data" / "products.csv",
+        root.parent / "data" / "products.json",
+        root.parent / "data" / "products.jsonl",
+        root.parent / "data" / "products.csv",
+    ]
+    return tuple(candidates)
+
+
+_stores: dict[tuple[Path, ...], ProductStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_product_store() -> ProductStore:
+    """Process-wide store for the current candidate paths (KASPARRO_DATA_PATH + defaults)."""
+    key = _candidate_paths()
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = ProductStore(key)
+        return store
+
+
 def load_product_by_name(product_name: str) -> Product:
     """
     Looks up the product from a dataset file if available.
 
     Supported:
-      - JSON: data/products.json OR path via KASPARRO_DATA_PATH
-      - CSV : data/products.csv  OR path via KASPARRO_DATA_PATH
+      - JSON : data/products.json  OR path via KASPARRO_DATA_PATH
+      - JSONL: data/products.jsonl OR path via KASPARRO_DATA_PATH
+      - CSV  : data/products.csv   OR path via KASPARRO_DATA_PATH
 
     If no dataset is found or no match: returns a minimal Product with only product_name.
     """
@@ -109,38 +278,10 @@ def load_product_by_name(product_name: str) -> Product:
             side_effects="",
         )
 
-    # choose dataset path
-    env_path = os.getenv("KASPARRO_DATA_PATH", "").strip()
-    candidates: list[Path] = []
-    if env_path:
-        candidates.append(Path(env_path))
-
-    # common defaults
-    root = Path(__file__).resolve().parents[2]  # .../src
-    candidates += [
-        root / "data" / "products.json",
-        root / "data" / "products.csv",
-        root.parent / "data" / "products.json",
-        root.parent / "data" / "products.csv",
-    ]
-
-    products: list[Product] = []
-    for c in candidates:
-        if not c.exists() or not c.is_file():
-            continue
-        if c.suffix.lower() == ".json":
-            products.extend(list(_iter_json_products(c)))
-        elif c.suffix.lower() == ".csv":
-            products.extend(list(_iter_csv_products(c)))
-
     # match by case-insensitive exact name first, then contains
-    t = target.lower()
-    exact = [p for p in products if p.product_name.lower() == t]
-    if exact:
-        return exact[0]
-    contains = [p for p in products if t in p.product_name.lower()]
-    if contains:
-        return contains[0]
+    found = get_product_store().find(target)
+    if found is not None:
+        return found
 
     # fallback minimal
     return Product(
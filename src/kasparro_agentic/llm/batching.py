@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import weakref
+from collections.abc import Callable, Hashable, Iterator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, TypeVar, cast
+
+from pydantic import BaseModel
+
+from kasparro_agentic.llm.provider import LLMProvider
+
+logger = logging.getLogger(__name__)
+T = TypeVar("T", bound=BaseModel)
+
+# dispatch(group, prompts) -> results in the same order
+Dispatch = Callable[[Hashable, list[str]], Sequence[Any]]
+
+
+@dataclass
+class BatchStats:
+    requests: int = 0
+    batches: int = 0
+    largest_batch: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        out: dict[str, Any] = asdict(self)
+        out["mean_batch_size"] = round(self.requests / self.batches, 2) if self.batches else 0.0
+        return out
+
+
+class MicroBatcher:
+    """
+    Collects prompts submitted from any thread and hands them to `dispatch` in
+    groups: a group is flushed once it holds `max_batch_size` prompts or its
+    oldest prompt has waited `max_wait_s`. Groups (e.g. one per schema) never mix.
+    """
+
+    def __init__(
+        self,
+        dispatch: Dispatch,
+        max_batch_size: int = 8,
+        max_wait_s: float = 0.02,
+        dispatch_workers: int = 4,
+    ) -> None:
+        self._dispatch = dispatch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_s = max_wait_s
+        self._cond = threading.Condition()
+        self._pending: dict[Hashable, list[tuple[str, Future[Any], float]]] = {}
+        self._pool = ThreadPoolExecutor(max_workers=max(1, dispatch_workers), thread_name_prefix="llm-batch")
+        self._worker: threading.Thread | None = None
+        self._closed = False
+        self._stats = BatchStats()
+
+    def submit(self, group: Hashable, prompt: str) -> Future[Any]:
+        fut: Future[Any] = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._pending.setdefault(group, []).append((prompt, fut, time.monotonic()))
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="llm-microbatcher", daemon=True)
+                self._worker.start()
+            self._cond.notify()
+        return fut
+
+    def _take_ready(self) -> tuple[Hashable, list[tuple[str, Future[Any], float]]] | None:
+        """Pops the next flushable group, or waits until one may be. Caller holds the lock."""
+        while True:
+            if self._closed and not self._pending:
+                return None
+            now = time.monotonic()
+            next_deadline: float | None = None
+            for group, items in self._pending.items():
+                deadline = items[0][2] + self.max_wait_s
+                if self._closed or len(items) >= self.max_batch_size or deadline <= now:
+                    batch, rest = items[: self.max_batch_size], items[self.max_batch_size :]
+                    if rest:
+                        self._pending[group] = rest
+                    else:
+                        del self._pending[group]
+                    return group, batch
+                next_deadline = deadline if next_deadline is None else min(next_deadline, deadline)
+            self._cond.wait(None if next_deadline is None else next_deadline - now)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                ready = self._take_ready()
+            if ready is None:
+                return
+            group, batch = ready
+            with self._cond:
+                self._stats.requests += len(batch)
+                self._stats.batches += 1
+                self._stats.largest_batch = max(self._stats.largest_batch, len(batch))
+            self._pool.submit(self._flush, group, batch)
+
+    def _flush(self, group: Hashable, batch: list[tuple[str, Future[Any], float]]) -> None:
+        try:
+            results = list(self._dispatch(group, [prompt for prompt, _, _ in batch]))
+            if len(results) != len(batch):
+                raise RuntimeError(f"batch dispatch returned {len(results)} results for {len(batch)} prompts")
+        except BaseException as e:  # noqa: BLE001
+            for _, fut, _ in batch:
+                fut.set_exception(e)
+            return
+        for (_, fut, _), result in zip(batch, results, strict=True):
+            fut.set_result(result)
+
+    def stats(self) -> BatchStats:
+        with self._cond:
+            return BatchStats(**asdict(self._stats))
+
+    def close(self) -> None:
+        """Flushes whatever is pending and stops the worker."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            worker = self._worker
+        if worker is not None:
+            worker.join()
+        self._pool.shutdown(wait=True)
+
+
+_TEXT = "text"
+
+
+def _dispatcher(inner: LLMProvider) -> Dispatch:
+    def dispatch(group: Hashable, prompts: list[str]) -> Sequence[Any]:
+        if group == _TEXT:
+            return inner.invoke_text_batch(prompts)
+        return inner.invoke_structured_batch(prompts, cast(type[BaseModel], group))
+
+    return dispatch
+
+
+class MicroBatchingLLMProvider(LLMProvider):
+    """
+    Single-prompt calls from concurrent graph nodes are queued and sent to the
+    inner provider's batch API, grouped by output schema, so e.g. the
+    question prompts of many products in a catalog run share one request.
+    """
+
+    def __init__(self, inner: LLMProvider, max_batch_size: int = 8, max_wait_s: float = 0.02) -> None:
+        self.inner = inner
+        self.batcher = MicroBatcher(_dispatcher(inner), max_batch_size=max_batch_size, max_wait_s=max_wait_s)
+        # The batcher's threads only reference `inner`, so a provider nobody
+        # holds any more is collected and its batcher stopped with it.
+        self._finalizer = weakref.finalize(self, self.batcher.close)
+
+    def cache_identity(self) -> dict[str, Any]:
+        return self.inner.cache_identity()
+
+    def invoke_text(self, prompt: str) -> str:
+        return cast(str, self.batcher.submit(_TEXT, prompt).result())
+
+    def invoke_structured(self, prompt: str, schema: type[T]) -> T:
+        return cast(T, self.batcher.submit(schema, prompt).result())
+
+    def stream_text(self, prompt: str) -> Iterator[str]:
+        return self.inner.stream_text(prompt)
+
+    # Callers that already hold a batch skip the queue.
+    def invoke_text_batch(self, prompts: Sequence[str]) -> list[str]:
+        return self.inner.invoke_text_batch(prompts)
+
+    def invoke_structured_batch(self, prompts: Sequence[str], schema: type[T]) -> list[T]:
+        return self.inner.invoke_structured_batch(prompts, schema)
+
+    async def ainvoke_text(self, prompt: str) -> str:
+        return cast(str, await asyncio.wrap_future(self.batcher.submit(_TEXT, prompt)))
+
+    async def ainvoke_structured(self, prompt: str, schema: type[T]) -> T:
+        return cast(T, await asyncio.wrap_future(self.batcher.submit(schema, prompt)))
+
+    def close(self) -> None:
+        self._finalizer()
+        self.inner.close()
+
+
+def with_microbatching(provider: LLMProvider) -> LLMProvider:
+    """
+    Env config:
+      - KASPARRO_LLM_MICROBATCH: enable the queue (default off)
+      - KASPARRO_LLM_MICROBATCH_SIZE: max prompts per request (default 8)
+      - KASPARRO_LLM_MICROBATCH_WAIT_MS: max time a prompt waits for company (default 20)
+    """
+    if os.getenv("KASPARRO_LLM_MICROBATCH", "0").strip().lower() not in ("1", "true", "yes", "on"):
+        return provider
+    return MicroBatchingLLMProvider(
+        provider,
+        max_batch_size=int(os.getenv("KASPARRO_LLM_MICROBATCH_SIZE", "8").strip() or "8"),
+        max_wait_s=float(os.getenv("KASPARRO_LLM_MICROBATCH_WAIT_MS", "20").strip() or "20") / 1000.0,
+    )
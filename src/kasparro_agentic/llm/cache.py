@@ -0,0 +1,430 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, TypeVar, cast
+
+from pydantic import BaseModel
+
+from kasparro_agentic.core.metrics import CACHE_HITS, CACHE_MISSES
+from kasparro_agentic.core.tracing import record_cache_hit
+from kasparro_agentic.llm.provider import LLMProvider, is_fallback
+
+logger = logging.getLogger(__name__)
+T = TypeVar("T", bound=BaseModel)
+
+Clock = Callable[[], float]
+
+# Bump when the cached value format changes so stale rows are never reused.
+CACHE_FORMAT_VERSION = 1
+
+
+@lru_cache(maxsize=256)
+def _schema_fingerprint(schema: type[BaseModel]) -> str:
+    schema_json = json.dumps(schema.model_json_schema(), sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha256(schema_json.encode("utf-8")).hexdigest()[:16]
+    return f"{schema.__module__}.{schema.__qualname__}:{digest}"
+
+
+def make_cache_key(
+    identity: dict[str, Any],
+    prompt: str,
+    schema: type[BaseModel] | None = None,
+) -> str:
+    """
+    Content-addressed key: provider identity (provider, model, generation params),
+    prompt hash and target schema. Any change to one of them is a different entry.
+    """
+    material = {
+        "v": CACHE_FORMAT_VERSION,
+        "identity": identity,
+        "prompt_sha256": hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+        "schema": _schema_fingerprint(schema) if schema is not None else None,
+    }
+    raw = json.dumps(material, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    writes: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        out: dict[str, Any] = asdict(self)
+        out["hit_rate"] = round(self.hit_rate, 4)
+        return out
+
+
+class MemoryCacheTier:
+    """Thread-safe LRU with per-entry TTL and a max entry count."""
+
+    def __init__(self, max_entries: int = 1024, ttl_s: float | None = None, clock: Clock = time.monotonic) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_s = ttl_s
+        self._clock = clock
+        self._data: OrderedDict[str, tuple[float | None, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and self._clock() >= expires_at:
+                del self._data[key]
+                self.expirations += 1
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        expires_at = self._clock() + self.ttl_s if self.ttl_s else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCacheTier:
+    """
+    Persistent tier so unchanged prompts survive process restarts.
+    Eviction is least-recently-accessed once max_entries is exceeded.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_entries: int = 100_000,
+        ttl_s: float | None = None,
+        clock: Clock = time.time,
+    ) -> None:
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.ttl_s = ttl_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache(accessed_at)")
+
+    def get(self, key: str) -> str | None:
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and now >= expires_at:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self.expirations += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return cast(str, value)
+
+    def set(self, key: str, value: str) -> None:
+        now = self._clock()
+        expires_at = now + self.ttl_s if self.ttl_s else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache(key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now),
+            )
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+            overflow = int(count) - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN "
+                    "(SELECT key FROM llm_cache ORDER BY accessed_at ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_MEMORY_HITS = CACHE_HITS.labels("memory")
+_DISK_HITS = CACHE_HITS.labels("disk")
+_MISSES = CACHE_MISSES.labels()
+
+
+class ResponseCache:
+    """Two-tier cache: memory LRU in front of an optional SQLite tier."""
+
+    def __init__(self, memory: MemoryCacheTier | None = None, disk: SQLiteCacheTier | None = None) -> None:
+        self.memory = memory if memory is not None else MemoryCacheTier()
+        self.disk = disk
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        value = self.memory.get(key)
+        if value is not None:
+            self._count(memory_hit=True)
+            return value
+
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                # promote so the next lookup is served from memory
+                self.memory.set(key, value)
+                self._count(disk_hit=True)
+                return value
+
+        self._count()
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+        with self._lock:
+            self._stats.writes += 1
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            snapshot = CacheStats(**asdict(self._stats))
+        snapshot.evictions = self.memory.evictions + (self.disk.evictions if self.disk else 0)
+        snapshot.expirations = self.memory.expirations + (self.disk.expirations if self.disk else 0)
+        return snapshot
+
+    def _count(self, memory_hit: bool = False, disk_hit: bool = False) -> None:
+        (_MEMORY_HITS if memory_hit else _DISK_HITS if disk_hit else _MISSES).inc()
+        with self._lock:
+            if memory_hit or disk_hit:
+                self._stats.hits += 1
+                self._stats.memory_hits += int(memory_hit)
+                self._stats.disk_hits += int(disk_hit)
+            else:
+                self._stats.misses += 1
+
+
+class CachingLLMProvider(LLMProvider):
+    """
+    Wraps any LLMProvider. Structured results are stored as validated JSON and
+    re-validated on a hit, so callers always get a fresh, mutable model instance.
+    """
+
+    def __init__(self, inner: LLMProvider, cache: ResponseCache) -> None:
+        self.inner = inner
+        self.cache = cache
+
+    def cache_identity(self) -> dict[str, Any]:
+        return self.inner.cache_identity()
+
+    def _cached_structured(self, key: str, schema: type[T]) -> T | None:
+        cached = self.cache.get(key)
+        if cached is None:
+            return None
+        try:
+            out = schema.model_validate_json(cached)
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Discarding unreadable cache entry for %s: %s", schema.__name__, e)
+            return None
+        record_cache_hit()
+        return out
+
+    def _store_structured(self, key: str, out: BaseModel) -> None:
+        # a mock stand-in for an unavailable backend must not outlive the outage
+        if not is_fallback(out):
+            self.cache.set(key, out.model_dump_json())
+
+    def invoke_text(self, prompt: str) -> str:
+        key = make_cache_key(self.cache_identity(), prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            record_cache_hit()
+            return cached
+
+        out = self.inner.invoke_text(prompt)
+        self.cache.set(key, out)
+        return out
+
+    def invoke_structured(self, prompt: str, schema: type[T]) -> T:
+        key = make_cache_key(self.cache_identity(), prompt, schema)
+        cached = self._cached_structured(key, schema)
+        if cached is not None:
+            return cached
+
+        out = self.inner.invoke_structured(prompt, schema)
+        self._store_structured(key, out)
+        return out
+
+    def stream_text(self, prompt: str) -> Iterator[str]:
+        key = make_cache_key(self.cache_identity(), prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            record_cache_hit()
+            yield cached
+            return
+
+        # tee: pass chunks through, store the full text only if the stream completes
+        chunks: list[str] = []
+        for chunk in self.inner.stream_text(prompt):
+            chunks.append(chunk)
+            yield chunk
+        self.cache.set(key, "".join(chunks))
+
+    def invoke_text_batch(self, prompts: Sequence[str]) -> list[str]:
+        identity = self.cache_identity()
+        keys = [make_cache_key(identity, p) for p in prompts]
+        out: list[str | None] = [self.cache.get(k) for k in keys]
+        misses = [i for i, v in enumerate(out) if v is None]
+        for _ in range(len(keys) - len(misses)):
+            record_cache_hit()
+        if misses:
+            fresh = self.inner.invoke_text_batch([prompts[i] for i in misses])
+            for i, value in zip(misses, fresh, strict=True):
+                self.cache.set(keys[i], value)
+                out[i] = value
+        return cast(list[str], out)
+
+    def invoke_structured_batch(self, prompts: Sequence[str], schema: type[T]) -> list[T]:
+        identity = self.cache_identity()
+        keys = [make_cache_key(identity, p, schema) for p in prompts]
+        out: list[T | None] = [self._cached_structured(k, schema) for k in keys]
+        misses = [i for i, v in enumerate(out) if v is None]
+        if misses:
+            fresh = self.inner.invoke_structured_batch([prompts[i] for i in misses], schema)
+            for i, value in zip(misses, fresh, strict=True):
+                self._store_structured(keys[i], value)
+                out[i] = value
+        return cast(list[T], out)
+
+    async def ainvoke_text(self, prompt: str) -> str:
+        key = make_cache_key(self.cache_identity(), prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            record_cache_hit()
+            return cached
+
+        out = await self.inner.ainvoke_text(prompt)
+        self.cache.set(key, out)
+        return out
+
+    async def ainvoke_structured(self, prompt: str, schema: type[T]) -> T:
+        key = make_cache_key(self.cache_identity(), prompt, schema)
+        cached = self._cached_structured(key, schema)
+        if cached is not None:
+            return cached
+
+        out = await self.inner.ainvoke_structured(prompt, schema)
+        self._store_structured(key, out)
+        return out
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+def _float_env(name: str, default: str) -> float:
+    return float(os.getenv(name, default).strip() or default)
+
+
+def build_response_cache() -> ResponseCache:
+    """
+    Env config:
+      - KASPARRO_LLM_CACHE_MAX_ENTRIES: memory LRU size (default 1024)
+      - KASPARRO_LLM_CACHE_TTL_S: entry lifetime in seconds, 0 = no expiry (default 0)
+      - KASPARRO_LLM_CACHE_PATH: SQLite file for the on-disk tier (unset = memory only)
+      - KASPARRO_LLM_CACHE_DISK_MAX_ENTRIES: on-disk size bound (default 100000)
+    """
+    ttl_s = _float_env("KASPARRO_LLM_CACHE_TTL_S", "0") or None
+    memory = MemoryCacheTier(
+        max_entries=int(_float_env("KASPARRO_LLM_CACHE_MAX_ENTRIES", "1024")),
+        ttl_s=ttl_s,
+    )
+
+    disk: SQLiteCacheTier | None = None
+    disk_path = os.getenv("KASPARRO_LLM_CACHE_PATH", "").strip()
+    if disk_path:
+        try:
+            disk = SQLiteCacheTier(
+                Path(disk_path),
+                max_entries=int(_float_env("KASPARRO_LLM_CACHE_DISK_MAX_ENTRIES", "100000")),
+                ttl_s=ttl_s,
+            )
+        except sqlite3.Error as e:
+            logger.warning("LLM disk cache unavailable at %s (%s). Using memory only.", disk_path, e)
+
+    return ResponseCache(memory=memory, disk=disk)
+
+
+_shared_cache: ResponseCache | None = None
+_shared_cache_lock = threading.Lock()
+
+
+def shared_response_cache() -> ResponseCache:
+    """Process-wide cache so every provider instance sees the same entries and counters."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = build_response_cache()
+        return _shared_cache
+
+
+def reset_shared_response_cache(close: bool = True) -> None:
+    """
+    Drops the shared cache; the next shared_response_cache() builds a new one.
+    close=False leaves the old one to providers still using it (its SQLite
+    connection closes when the last of them is collected).
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if close and _shared_cache is not None and _shared_cache.disk is not None:
+            _shared_cache.disk.close()
+        _shared_cache = None
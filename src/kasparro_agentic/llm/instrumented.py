@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator, Sequence
+from typing import Any, TypeVar
+
+from pydantic import BaseModel
+
+from kasparro_agentic.core.metrics import LLM_LATENCY
+from kasparro_agentic.core.tracing import record_llm_call, record_llm_fallback
+from kasparro_agentic.llm.provider import LLMProvider, is_fallback
+from kasparro_agentic.llm.registry import describe_provider
+
+T = TypeVar("T", bound=BaseModel)
+
+
+def _structured_chars(out: BaseModel) -> int:
+    return len(out.model_dump_json())
+
+
+def _record_structured(prompt: str, out: BaseModel) -> None:
+    record_llm_call(prompt, _structured_chars(out))
+    if is_fallback(out):
+        record_llm_fallback()
+
+
+class InstrumentedLLMProvider(LLMProvider):
+    """
+    Reports every call to the active node span (prompt and response size, and
+    whether a mock fallback answered it) and to the per-provider latency
+    histogram. Outside a span only the histogram is updated.
+    """
+
+    def __init__(self, inner: LLMProvider) -> None:
+        self.inner = inner
+        provider = describe_provider(inner)
+        self._ok = LLM_LATENCY.labels(provider, "ok")
+        self._error = LLM_LATENCY.labels(provider, "error")
+
+    def _observe(self, start: float, ok: bool) -> None:
+        (self._ok if ok else self._error).observe(time.perf_counter() - start)
+
+    def cache_identity(self) -> dict[str, Any]:
+        return self.inner.cache_identity()
+
+    def invoke_text(self, prompt: str) -> str:
+        start, ok = time.perf_counter(), False
+        try:
+            out = self.inner.invoke_text(prompt)
+            ok = True
+        finally:
+            self._observe(start, ok)
+        record_llm_call(prompt, len(out))
+        return out
+
+    def invoke_structured(self, prompt: str, schema: type[T]) -> T:
+        start, ok = time.perf_counter(), False
+        try:
+            out = self.inner.invoke_structured(prompt, schema)
+            ok = True
+        finally:
+            self._observe(start, ok)
+        _record_structured(prompt, out)
+        return out
+
+    def stream_text(self, prompt: str) -> Iterator[str]:
+        start, ok, size = time.perf_counter(), False, 0
+        try:
+            for chunk in self.inner.stream_text(prompt):
+                size += len(chunk)
+                yield chunk
+            ok = True
+        finally:
+            self._observe(start, ok)
+        record_llm_call(prompt, size)
+
+    def invoke_text_batch(self, prompts: Sequence[str]) -> list[str]:
+        start, ok = time.perf_counter(), False
+        try:
+            outs = self.inner.invoke_text_batch(prompts)
+            ok = True
+        finally:
+            self._observe(start, ok)
+        for prompt, out in zip(prompts, outs, strict=True):
+            record_llm_call(prompt, len(out))
+        return outs
+
+    def invoke_structured_batch(self, prompts: Sequence[str], schema: type[T]) -> list[T]:
+        start, ok = time.perf_counter(), False
+        try:
+            outs = self.inner.invoke_structured_batch(prompts, schema)
+            ok = True
+        finally:
+            self._observe(start, ok)
+        for prompt, out in zip(prompts, outs, strict=True):
+            _record_structured(prompt, out)
+        return outs
+
+    async def ainvoke_text(self, prompt: str) -> str:
+        start, ok = time.perf_counter(), False
+        try:
+            out = await self.inner.ainvoke_text(prompt)
+            ok = True
+        finally:
+            self._observe(start, ok)
+        record_llm_call(prompt, len(out))
+        return out
+
+    async def ainvoke_structured(self, prompt: str, schema: type[T]) -> T:
+        start, ok = time.perf_counter(), False
+        try:
+            out = await self.inner.ainvoke_structured(prompt, schema)
+            ok = True
+        finally:
+            self._observe(start, ok)
+        _record_structured(prompt, out)
+        return out
+
+
+def instrumented(llm: LLMProvider) -> LLMProvider:
+    """Wraps `llm` unless it is already instrumented."""
+    return llm if isinstance(llm, InstrumentedLLMProvider) else InstrumentedLLMProvider(llm)
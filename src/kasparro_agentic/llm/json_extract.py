@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Iterator
+from typing import Any, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+T = TypeVar("T", bound=BaseModel)
+
+# Structural characters outside strings, and the two that matter inside one.
+# _balance jumps between matches, so prose and long string values are skipped
+# at regex speed and every character is visited once.
+_STRUCTURAL = re.compile(r'[{}\[\]",:]')
+_IN_STRING = re.compile(r'["\\]')
+# An object opens with a key or closes at once; other brace groups ({x}, {{...}})
+# are skipped without raising a decode error.
+_OBJECT_START = re.compile(r'\{\s*["}]')
+_FENCE = "```"
+_DECODER = json.JSONDecoder()
+
+
+def _fenced_blocks(text: str) -> Iterator[str]:
+    """Bodies of closed ``` fences (the language tag line is dropped)."""
+    pos = 0
+    while True:
+        open_at = text.find(_FENCE, pos)
+        if open_at < 0:
+            return
+        body_at = text.find("\n", open_at + len(_FENCE))
+        if body_at < 0:
+            return
+        close_at = text.find(_FENCE, body_at)
+        if close_at < 0:
+            return
+        yield text[body_at + 1 : close_at]
+        pos = close_at + len(_FENCE)
+
+
+def _closers(stack: list[str] | tuple[str, ...]) -> str:
+    return "".join(reversed(stack))
+
+
+def _balance(text: str, start: int) -> tuple[int | None, list[str]]:
+    """
+    Walks the brace group opening at `start`, string- and escape-aware.
+    Returns (index after the group, []) when it closes or a bracket mismatches,
+    or (None, repairs) when the text ends inside it: the open string value
+    closed, then the trailing literal kept, then the last complete value, each
+    with its containers closed.
+    """
+    n = len(text)
+    stack = ["}"]
+    expect_key = True
+    # last point where the object could be closed: (index, open containers)
+    cut_stack: tuple[str, ...]
+    cut, cut_stack = start + 1, ("}",)
+    j = start + 1
+    while stack:
+        m = _STRUCTURAL.search(text, j)
+        if m is None:
+            break
+        j = m.start()
+        c = text[j]
+        if c == '"':
+            is_key = expect_key and stack[-1] == "}"
+            k = j + 1
+            while True:
+                s = _IN_STRING.search(text, k)
+                if s is None:
+                    repairs = []
+                    if not is_key:
+                        body = text[start:n]
+                        if (len(body) - len(body.rstrip("\\"))) % 2:
+                            body = body[:-1]
+                        repairs.append(body + '"' + _closers(stack))
+                    return None, [*repairs, text[start:cut] + _closers(cut_stack)]
+                k = s.start()
+                if text[k] == "\\":
+                    k += 2
+                    continue
+                break
+            j = k + 1
+            expect_key = False
+            if not is_key:
+                cut, cut_stack = j, tuple(stack)
+            continue
+        if c in "{[":
+            stack.append("}" if c == "{" else "]")
+            expect_key = c == "{"
+            cut, cut_stack = j + 1, tuple(stack)
+        elif c in "}]":
+            if c != stack[-1]:
+                return j + 1, []
+            stack.pop()
+            if stack:
+                cut, cut_stack = j + 1, tuple(stack)
+        elif c == ",":
+            cut, cut_stack = j, tuple(stack)
+            expect_key = stack[-1] == "}"
+        else:  # ":"
+            expect_key = False
+        j += 1
+
+    if not stack:
+        return j, []
+    repairs = []
+    tail = text[start:n].rstrip()
+    if not tail.endswith((",", ":")):
+        repairs.append(tail + _closers(stack))
+    return None, [*repairs, text[start:cut] + _closers(cut_stack)]
+
+
+def _scan_objects(text: str) -> Iterator[tuple[str, dict[str, Any] | None]]:
+    """
+    (span, parsed) for each JSON object in `text`, left to right. Each brace
+    group is delimited by _balance first and only that slice goes to
+    raw_decode (which parses in C), so a group that is not JSON costs its own
+    length, not a rescan from the start of the text for the error position.
+    If the text ends inside a group, its repairs are yielded unparsed.
+    """
+    pos = 0
+    while True:
+        start = text.find("{", pos)
+        if start < 0:
+            return
+        group_end, repairs = _balance(text, start)
+        if group_end is None:
+            for repaired in repairs:
+                yield repaired, None
+            return
+        if _OBJECT_START.match(text, start):
+            span = text[start:group_end]
+            try:
+                obj, _ = _DECODER.raw_decode(span)
+            except (ValueError, RecursionError):  # deeply nested junk is "not an object" too
+                pass
+            else:
+                yield span, obj
+        pos = group_end
+
+
+def _candidates(text: str) -> Iterator[tuple[str, dict[str, Any] | None]]:
+    if _FENCE in text:
+        for block in _fenced_blocks(text):
+            yield from _scan_objects(block)
+    yield from _scan_objects(text)
+
+
+def iter_json_candidates(text: str) -> Iterator[str]:
+    """
+    JSON object spans in raw model output, most likely first: objects inside
+    markdown fences, then objects anywhere in the text, then repairs of a
+    truncated tail. Repairs are not guaranteed to parse.
+    """
+    for span, _ in _candidates(text):
+        yield span
+
+
+def extract_json_object(text: str) -> dict[str, Any]:
+    """First candidate that parses as a JSON object."""
+    for span, obj in _candidates(text):
+        if obj is None:
+            try:
+                obj = json.loads(span)
+            except (ValueError, RecursionError):
+                continue
+        if isinstance(obj, dict):
+            return obj
+    raise ValueError("No JSON object found in model output.")
+
+
+def parse_json_model(text: str, schema: type[T]) -> T:
+    """
+    First candidate that validates as `schema`. Output that is exactly one
+    object goes straight through model_validate_json (a single parse in
+    pydantic-core); anything else falls back to the candidate scan. Raises the
+    last ValidationError, or ValueError when the text holds no object at all.
+    """
+    stripped = text.strip()
+    if stripped.startswith("{") and stripped.endswith("}"):
+        try:
+            return schema.model_validate_json(stripped)
+        except ValidationError:
+            pass
+
+    error: ValidationError | None = None
+    for span, obj in _candidates(text):
+        try:
+            return schema.model_validate(obj) if obj is not None else schema.model_validate_json(span)
+        except ValidationError as e:
+            error = e
+    if error is not None:
+        raise error
+    raise ValueError("No JSON object found in model output.")
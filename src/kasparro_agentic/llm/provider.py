@@ -1,14 +1,35 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import os
+import random
 import re
-from typing import TypeVar, cast
-
+import threading
+import time
+import weakref
+from collections.abc import Callable, Iterator, Sequence
+from functools import lru_cache
+from typing import Any, TypeVar, cast
+
+import httpx
 import requests
 from pydantic import BaseModel
-
+from requests.adapters import HTTPAdapter
+
+from kasparro_agentic.core.errors import LLMError
+from kasparro_agentic.core.metrics import JSON_PARSE_FAILURES, LLM_FALLBACKS
+from kasparro_agentic.llm.json_extract import parse_json_model
+from kasparro_agentic.llm.rate_limit import estimate_tokens, shared_backend_limiter
+from kasparro_agentic.llm.resilience import (
+    CircuitOpenError,
+    acall_with_retry,
+    call_with_retry,
+    is_retryable,
+    retry_policy_from_env,
+    shared_circuit_breaker,
+)
 from kasparro_agentic.models import (
     ComparisonPage,
     FAQPage,
@@ -25,13 +46,6 @@ def _truthy_env(name: str, default: str = "0") -> bool:
     return os.getenv(name, default).strip().lower() in {"1", "true", "yes", "y", "on"}
 
 
-def _extract_first_json_object(text: str) -> dict:
-    match = re.search(r"\{[\s\S]*\}", text)
-    if not match:
-        raise ValueError("No JSON object found in model output.")
-    return json.loads(match.group(0))
-
-
 def _extract_product_name(prompt: str) -> str:
     m = re.search(r"-\s*product_name:\s*(.+)", prompt)
     if m:
@@ -138,30 +152,102 @@ MOCK_COMPARISON = {
 }
 
 
+# Validated once at import; MockLLMProvider hands out copies (see _handout).
+_MOCK_FAQ_PAGE = FAQPage.model_validate(MOCK_FAQ)
+_MOCK_PRODUCT_PAGE = ProductPage.model_validate(MOCK_PRODUCT_PAGE)
+_MOCK_FICTIONAL_PRODUCT = FictionalProduct.model_validate(MOCK_FICTIONAL_PRODUCT)
+_MOCK_COMPARISON_PAGE = ComparisonPage.model_validate(MOCK_COMPARISON)
+
+
+@lru_cache(maxsize=1024)
+def _mock_questions(product_name: str) -> QuestionList:
+    return QuestionList.model_validate(_mock_question_list(product_name))
+
+
+def _handout(instance: T) -> T:
+    """
+    A per-caller copy of a shared mock instance: its own top-level fields and
+    lists, so callers can reassign fields (the finalize steps do) without
+    touching the cache. Nested models are shared and must not be mutated.
+    """
+    out = instance.model_copy()
+    fields = out.__dict__
+    for name, value in fields.items():
+        if type(value) is list:
+            fields[name] = list(value)
+    return out
+
+
+# schema -> prompt -> shared instance
+_MOCK_STRUCTURED: dict[type[BaseModel], Callable[[str], BaseModel]] = {
+    QuestionList: lambda prompt: _mock_questions(_extract_product_name(prompt)),
+    FAQPage: lambda _: _MOCK_FAQ_PAGE,
+    ProductPage: lambda _: _MOCK_PRODUCT_PAGE,
+    FictionalProduct: lambda _: _MOCK_FICTIONAL_PRODUCT,
+    ComparisonPage: lambda _: _MOCK_COMPARISON_PAGE,
+}
+
+
+# Results a provider substituted from the mock because the real backend was
+# down or its output unusable. Tracked by identity (models are unhashable)
+# so caching layers can refuse to persist them; entries go with the objects.
+_FALLBACK_RESULTS: weakref.WeakValueDictionary[int, BaseModel] = weakref.WeakValueDictionary()
+_fallback_lock = threading.Lock()
+
+
+def mark_fallback(result: T) -> T:
+    with _fallback_lock:
+        _FALLBACK_RESULTS[id(result)] = result
+    return result
+
+
+def is_fallback(result: object) -> bool:
+    """True for a structured result that is a mock stand-in, not a real answer."""
+    with _fallback_lock:
+        return _FALLBACK_RESULTS.get(id(result)) is result
+
+
 class LLMProvider:
+    def cache_identity(self) -> dict[str, Any]:
+        """Everything besides the prompt that changes the output (used for cache keys)."""
+        return {"provider": self.__class__.__name__}
+
     def invoke_structured(self, prompt: str, schema: type[T]) -> T:
         raise NotImplementedError
 
     def invoke_text(self, prompt: str) -> str:
         raise NotImplementedError
 
+    def stream_text(self, prompt: str) -> Iterator[str]:
+        """Yields the completion in chunks as they arrive; the default yields it whole."""
+        yield self.invoke_text(prompt)
 
-class MockLLMProvider(LLMProvider):
-    def invoke_structured(self, prompt: str, schema: type[T]) -> T:
-        product_name = _extract_product_name(prompt)
+    # Batch variants, results in prompt order. The defaults loop; providers
+    # whose backend accepts several inputs per request override them.
+    def invoke_structured_batch(self, prompts: Sequence[str], schema: type[T]) -> list[T]:
+        return [self.invoke_structured(p, schema) for p in prompts]
+
+    def invoke_text_batch(self, prompts: Sequence[str]) -> list[str]:
+        return [self.invoke_text(p) for p in prompts]
 
-        if schema is QuestionList:
-            return cast(T, schema.model_validate(_mock_question_list(product_name)))
-        if schema is FAQPage:
-            return cast(T, schema.model_validate(MOCK_FAQ))
-        if schema is ProductPage:
-            return cast(T, schema.model_validate(MOCK_PRODUCT_PAGE))
-        if schema is FictionalProduct:
-            return cast(T, schema.model_validate(MOCK_FICTIONAL_PRODUCT))
-        if schema is ComparisonPage:
-            return cast(T, schema.model_validate(MOCK_COMPARISON))
+    # Async variants. The defaults run the blocking call on a worker thread;
+    # providers with a native async client override them.
+    async def ainvoke_structured(self, prompt: str, schema: type[T]) -> T:
+        return await asyncio.to_thread(self.invoke_structured, prompt, schema)
 
-        return cast(T, schema.model_validate({}))
+    async def ainvoke_text(self, prompt: str) -> str:
+        return await asyncio.to_thread(self.invoke_text, prompt)
+
+    def close(self) -> None:
+        """Stops background threads the provider owns; shared pools and caches stay open."""
+
+
+class MockLLMProvider(LLMProvider):
+    def invoke_structured(self, prompt: str, schema: type[T]) -> T:
+        build = _MOCK_STRUCTURED.get(schema)
+        if build is None:
+            return cast(T, schema.model_validate({}))
+        return cast(T, _handout(build(prompt)))
 
     def invoke_text(self, prompt: str) -> str:
         product_name = _extract_product_name(prompt)
@@ -175,36 +261,185 @@ class MockLLMProvider(LLMProvider):
             "5) Stop use if irritation persists."
         )
 
+    def stream_text(self, prompt: str) -> Iterator[str]:
+        # word-sized chunks so streaming consumers behave the same as with hf
+        yield from re.findall(r"\S+\s*|\s+", self.invoke_text(prompt))
+
+    # No I/O, so no thread hop.
+    async def ainvoke_structured(self, prompt: str, schema: type[T]) -> T:
+        return self.invoke_structured(prompt, schema)
+
+    async def ainvoke_text(self, prompt: str) -> str:
+        return self.invoke_text(prompt)
+
+
+class LatencyMockLLMProvider(MockLLMProvider):
+    """
+    Mock answers with HF-like timing, for benchmarking orchestration:
+    each call waits latency_ms +/- jitter_ms (uniform); streams spread that
+    wait over the chunks after a time-to-first-token of half the latency.
+    `seed` makes the delay sequence reproducible.
+    """
+
+    def __init__(self, latency_ms: float = 1500.0, jitter_ms: float = 500.0, seed: int | None = None) -> None:
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def cache_identity(self) -> dict[str, Any]:
+        # same answers as the plain mock, so cache entries are interchangeable
+        return {"provider": "MockLLMProvider"}
+
+    def delay_s(self) -> float:
+        with self._rng_lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(0.0, self.latency_ms + jitter) / 1000.0
+
+    def invoke_structured(self, prompt: str, schema: type[T]) -> T:
+        time.sleep(self.delay_s())
+        return super().invoke_structured(prompt, schema)
+
+    def invoke_text(self, prompt: str) -> str:
+        time.sleep(self.delay_s())
+        return super().invoke_text(prompt)
+
+    def invoke_structured_batch(self, prompts: Sequence[str], schema: type[T]) -> list[T]:
+        # one round trip for the whole batch, like a batched HF request
+        time.sleep(self.delay_s())
+        return [MockLLMProvider.invoke_structured(self, p, schema) for p in prompts]
+
+    def invoke_text_batch(self, prompts: Sequence[str]) -> list[str]:
+        time.sleep(self.delay_s())
+        return [MockLLMProvider.invoke_text(self, p) for p in prompts]
+
+    def stream_text(self, prompt: str) -> Iterator[str]:
+        total = self.delay_s()
+        chunks = re.findall(r"\S+\s*|\s+", MockLLMProvider.invoke_text(self, prompt))
+        time.sleep(total / 2)
+        for chunk in chunks:
+            time.sleep(total / 2 / max(1, len(chunks)))
+            yield chunk
+
+    async def ainvoke_structured(self, prompt: str, schema: type[T]) -> T:
+        await asyncio.sleep(self.delay_s())
+        return MockLLMProvider.invoke_structured(self, prompt, schema)
+
+    async def ainvoke_text(self, prompt: str) -> str:
+        await asyncio.sleep(self.delay_s())
+        return MockLLMProvider.invoke_text(self, prompt)
+
+
+# ----------------------------
+# Shared HTTP connection pools
+# ----------------------------
+_sessions: dict[int, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def shared_http_session(pool_size: int) -> requests.Session:
+    """
+    One keep-alive session per pool size for the whole process, so every
+    provider instance, thread and graph invocation reuses the same sockets.
+    pool_block=True caps open connections at pool_size under load.
+    """
+    with _sessions_lock:
+        session = _sessions.get(pool_size)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, pool_block=True, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["Connection"] = "keep-alive"
+            _sessions[pool_size] = session
+        return session
+
+
+def http_pool_stats(session: requests.Session) -> dict[str, Any]:
+    """Per-host connection counts for a pooled session (urllib3 internals, best effort)."""
+    hosts: dict[str, Any] = {}
+    for adapter in {id(a): a for a in session.adapters.values()}.values():
+        if not isinstance(adapter, HTTPAdapter):
+            continue
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            idle = pool.pool.qsize() if pool.pool is not None else 0
+            hosts[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                "connections_opened": pool.num_connections,
+                "requests": pool.num_requests,
+                "idle_slots": idle,
+                "max_size": adapter._pool_maxsize,
+            }
+    return hosts
+
 
 class HuggingFaceProvider(LLMProvider):
     def __init__(self) -> None:
         self.token = os.getenv("HF_API_TOKEN", "").strip()
         self.model = os.getenv("KASPARRO_HF_MODEL", "mistralai/Mistral-7B-Instruct-v0.3").strip()
         self.timeout_s = float(os.getenv("KASPARRO_HF_TIMEOUT_S", "60").strip())
+        self.connect_timeout_s = float(os.getenv("KASPARRO_HF_CONNECT_TIMEOUT_S", "10").strip())
+        self.read_timeout_s = float(os.getenv("KASPARRO_HF_READ_TIMEOUT_S", str(self.timeout_s)).strip())
+        self.pool_size = int(os.getenv("KASPARRO_HF_POOL_SIZE", "8").strip())
         self.max_new_tokens = int(os.getenv("KASPARRO_HF_MAX_NEW_TOKENS", "700").strip())
+        self.temperature = 0.2
 
         if not self.token:
             raise RuntimeError("HF_API_TOKEN is not set (required for KASPARRO_LLM_MODE=hf).")
 
-        self.url = f"https://api-inference.huggingface.co/models/{self.model}"
+        base_url = os.getenv("KASPARRO_HF_BASE_URL", "https://api-inference.huggingface.co/models").strip()
+        self.url = f"{base_url.rstrip('/')}/{self.model}"
         self.headers = {
             "Authorization": f"Bearer {self.token}",
             "Content-Type": "application/json",
         }
+        self.session = shared_http_session(self.pool_size)
+        self.limiter = shared_backend_limiter(self.url)
+        self.retry_policy = retry_policy_from_env()
+        self.breaker = shared_circuit_breaker(self.url)
+        # httpx async clients are bound to the loop they were created on
+        self._async_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def pool_stats(self) -> dict[str, Any]:
+        return http_pool_stats(self.session)
+
+    def _async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                headers=self.headers,
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+                timeout=httpx.Timeout(self.read_timeout_s, connect=self.connect_timeout_s),
+            )
+            self._async_clients[loop] = client
+        return client
+
+    def cache_identity(self) -> dict[str, Any]:
+        return {
+            "provider": "huggingface",
+            "model": self.model,
+            "max_new_tokens": self.max_new_tokens,
+            "temperature": self.temperature,
+        }
 
-    def invoke_text(self, prompt: str) -> str:
-        payload = {
+    def _payload(self, prompt: str) -> dict[str, Any]:
+        return {
             "inputs": prompt,
             "parameters": {
                 "max_new_tokens": self.max_new_tokens,
-                "temperature": 0.2,
+                "temperature": self.temperature,
                 "return_full_text": False,
             },
         }
-        resp = requests.post(self.url, headers=self.headers, data=json.dumps(payload), timeout=self.timeout_s)
-        resp.raise_for_status()
-        data = resp.json()
 
+    @staticmethod
+    def _generated_text(data: Any) -> str:
         if isinstance(data, list) and data and isinstance(data[0], dict) and "generated_text" in data[0]:
             return str(data[0]["generated_text"]).strip()
 
@@ -216,18 +451,169 @@ class HuggingFaceProvider(LLMProvider):
 
         return str(data)
 
-    def invoke_structured(self, prompt: str, schema: type[T]) -> T:
-        strict = _truthy_env("KASPARRO_LLM_STRICT", "0")
-        raw = self.invoke_text(prompt)
+    @classmethod
+    def _generated_texts(cls, data: Any, expected: int) -> list[str]:
+        # Batched inputs come back as one entry per prompt, each either a dict
+        # or a single-element list of dicts depending on the backend.
+        if not isinstance(data, list) or len(data) != expected:
+            raise LLMError(f"HF batch response does not match {expected} inputs: {str(data)[:200]}")
+        return [cls._generated_text(item) for item in data]
 
+    def _structured_from_raw(self, prompt: str, raw: str, schema: type[T]) -> T:
+        strict = _truthy_env("KASPARRO_LLM_STRICT", "0")
         try:
-            obj = _extract_first_json_object(raw)
-            return cast(T, schema.model_validate(obj))
+            return parse_json_model(raw, schema)
         except Exception as e:  # noqa: BLE001
+            JSON_PARSE_FAILURES.labels("huggingface").inc()
             if strict:
                 raise RuntimeError(f"HF structured parse/validate failed: {e}\nRaw:\n{raw}") from e
+            LLM_FALLBACKS.labels("huggingface", "invalid_output").inc()
             logger.warning("HF structured output invalid; falling back to mock. Error=%s", e)
-            return MockLLMProvider().invoke_structured(prompt, schema)
+            return mark_fallback(MockLLMProvider().invoke_structured(prompt, schema))
+
+    def _token_budget(self, prompt: str) -> int:
+        return estimate_tokens(prompt) + self.max_new_tokens
+
+    def _unavailable(self, prompt: str, schema: type[T], error: LLMError) -> T:
+        if _truthy_env("KASPARRO_LLM_STRICT", "0"):
+            raise error
+        LLM_FALLBACKS.labels("huggingface", "unavailable").inc()
+        logger.warning("HF backend unavailable; falling back to mock. Error=%s", error)
+        return mark_fallback(MockLLMProvider().invoke_structured(prompt, schema))
+
+    def _post_once(self, prompt: str) -> str:
+        with self.limiter.slot(self._token_budget(prompt)) as slot:
+            resp = self.session.post(
+                self.url,
+                headers=self.headers,
+                data=json.dumps(self._payload(prompt)),
+                timeout=(self.connect_timeout_s, self.read_timeout_s),
+            )
+            slot.observe(resp.status_code, resp.headers.get("Retry-After"))
+        resp.raise_for_status()
+        return self._generated_text(resp.json())
+
+    def _post_batch_once(self, prompts: Sequence[str]) -> list[str]:
+        payload = self._payload(prompts[0])
+        payload["inputs"] = list(prompts)
+        tokens = sum(self._token_budget(p) for p in prompts)
+        with self.limiter.slot(tokens) as slot:
+            resp = self.session.post(
+                self.url,
+                headers=self.headers,
+                data=json.dumps(payload),
+                timeout=(self.connect_timeout_s, self.read_timeout_s),
+            )
+            slot.observe(resp.status_code, resp.headers.get("Retry-After"))
+        resp.raise_for_status()
+        return self._generated_texts(resp.json(), len(prompts))
+
+    async def _apost_once(self, prompt: str) -> str:
+        async with self.limiter.aslot(self._token_budget(prompt)) as slot:
+            resp = await self._async_client().post(self.url, content=json.dumps(self._payload(prompt)))
+            slot.observe(resp.status_code, resp.headers.get("Retry-After"))
+        resp.raise_for_status()
+        return self._generated_text(resp.json())
+
+    def _open_stream(self, prompt: str) -> requests.Response:
+        payload = self._payload(prompt)
+        payload["stream"] = True
+        # The slot covers this attempt up to the response headers; it is not
+        # held through retry backoff or while the caller reads tokens.
+        with self.limiter.slot(self._token_budget(prompt)) as slot:
+            resp = self.session.post(
+                self.url,
+                headers=self.headers,
+                data=json.dumps(payload),
+                timeout=(self.connect_timeout_s, self.read_timeout_s),
+                stream=True,
+            )
+            slot.observe(resp.status_code, resp.headers.get("Retry-After"))
+        if resp.status_code >= 400:
+            resp.close()
+        resp.raise_for_status()
+        return resp
+
+    @staticmethod
+    def _sse_tokens(resp: requests.Response) -> Iterator[str]:
+        # TGI stream format: `data: {"token": {"text": ..., "special": bool}, ...}`
+        # SSE is always UTF-8; requests would guess ISO-8859-1 for text/* without a charset.
+        for raw in resp.iter_lines():
+            line = raw.decode("utf-8")
+            if not line.startswith("data:"):
+                continue
+            body = line[len("data:") :].strip()
+            if body == "[DONE]":
+                return
+            event = json.loads(body)
+            if "error" in event:
+                raise LLMError(f"HF stream error: {event['error']}")
+            token = event.get("token") or {}
+            if token.get("text") and not token.get("special"):
+                yield str(token["text"])
+
+    def invoke_text(self, prompt: str) -> str:
+        return call_with_retry(lambda: self._post_once(prompt), self.retry_policy, self.breaker)
+
+    def invoke_structured(self, prompt: str, schema: type[T]) -> T:
+        try:
+            raw = self.invoke_text(prompt)
+        except LLMError as e:
+            return self._unavailable(prompt, schema, e)
+        return self._structured_from_raw(prompt, raw, schema)
+
+    def invoke_text_batch(self, prompts: Sequence[str]) -> list[str]:
+        if len(prompts) <= 1:
+            return [self.invoke_text(p) for p in prompts]
+        try:
+            return call_with_retry(lambda: self._post_batch_once(prompts), self.retry_policy, self.breaker)
+        except LLMError as e:
+            if isinstance(e, CircuitOpenError) or e.__cause__ is None or is_retryable(e.__cause__):
+                raise
+            # e.g. a backend/model that rejects list inputs: fall back to one request per prompt
+            logger.warning("HF batched request rejected (%s); sending prompts one by one.", e)
+            return [self.invoke_text(p) for p in prompts]
+
+    def invoke_structured_batch(self, prompts: Sequence[str], schema: type[T]) -> list[T]:
+        try:
+            raws = self.invoke_text_batch(prompts)
+        except LLMError as e:
+            return [self._unavailable(p, schema, e) for p in prompts]
+        return [self._structured_from_raw(p, raw, schema) for p, raw in zip(prompts, raws, strict=True)]
+
+    def stream_text(self, prompt: str) -> Iterator[str]:
+        # Retries only cover opening the stream; once tokens flow, a failure is surfaced.
+        resp = call_with_retry(lambda: self._open_stream(prompt), self.retry_policy, self.breaker)
+        with resp:
+            if "text/event-stream" not in resp.headers.get("Content-Type", ""):
+                # backend ignored "stream": one JSON body
+                yield self._generated_text(resp.json())
+                return
+            yield from self._sse_tokens(resp)
+
+    async def ainvoke_text(self, prompt: str) -> str:
+        return await acall_with_retry(lambda: self._apost_once(prompt), self.retry_policy, self.breaker)
+
+    async def ainvoke_structured(self, prompt: str, schema: type[T]) -> T:
+        try:
+            raw = await self.ainvoke_text(prompt)
+        except LLMError as e:
+            return self._unavailable(prompt, schema, e)
+        return self._structured_from_raw(prompt, raw, schema)
+
+
+def _with_cache(provider: LLMProvider, default: str) -> LLMProvider:
+    if not _truthy_env("KASPARRO_LLM_CACHE", default):
+        return provider
+    from kasparro_agentic.llm.cache import CachingLLMProvider, shared_response_cache
+
+    return CachingLLMProvider(provider, shared_response_cache())
+
+
+def _with_microbatching(provider: LLMProvider) -> LLMProvider:
+    from kasparro_agentic.llm.batching import with_microbatching
+
+    return with_microbatching(provider)
 
 
 def build_llm_provider() -> LLMProvider:
@@ -235,19 +621,35 @@ def build_llm_provider() -> LLMProvider:
     Modes:
       - mock (default): deterministic, CI-friendly, no network.
       - hf: Hugging Face Inference API (real LLM) if HF_API_TOKEN is set.
+      - mock-latency: mock answers delayed like a remote model
+        (KASPARRO_MOCK_LATENCY_MS, default 1500; KASPARRO_MOCK_JITTER_MS, default 500).
+
+    KASPARRO_LLM_CACHE wraps the provider in the shared response cache
+    (on by default for hf, off for mock). See llm/cache.py for tier settings.
+    KASPARRO_LLM_MICROBATCH queues single calls into batched requests
+    (off by default). See llm/batching.py.
     """
     mode = os.getenv("KASPARRO_LLM_MODE", "mock").strip().lower()
 
     if mode in ("", "mock"):
-        return MockLLMProvider()
+        return _with_cache(_with_microbatching(MockLLMProvider()), "0")
+
+    if mode == "mock-latency":
+        provider = LatencyMockLLMProvider(
+            latency_ms=float(os.getenv("KASPARRO_MOCK_LATENCY_MS", "1500").strip()),
+            jitter_ms=float(os.getenv("KASPARRO_MOCK_JITTER_MS", "500").strip()),
+        )
+        return _with_cache(_with_microbatching(provider), "0")
 
     if mode == "hf":
         try:
-            return HuggingFaceProvider()
+            return _with_cache(_with_microbatching(HuggingFaceProvider()), "1")
         except Exception as e:  # noqa: BLE001
+            LLM_FALLBACKS.labels("huggingface", "init_failed").inc()
             logger.warning("HF provider init failed (%s). Falling back to mock.", e)
             return MockLLMProvider()
 
     # Do NOT support broken puter-sdk mode in backend (browser Puter SDK is reliable)
+    LLM_FALLBACKS.labels(mode, "unknown_mode").inc()
     logger.warning("Unknown KASPARRO_LLM_MODE=%r. Falling back to mock.", mode)
     return MockLLMProvider()
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import math
+import os
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+Clock = Callable[[], float]
+
+# Statuses that mean "slow down" rather than "your request is wrong".
+OVERLOAD_STATUSES = frozenset({429, 503})
+
+
+def parse_retry_after(value: str | None, now: float | None = None) -> float | None:
+    """Retry-After as seconds; accepts delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - (time.time() if now is None else now))
+
+
+class TokenBucket:
+    """
+    Classic token bucket. Callers reserve tokens up front (the balance may go
+    negative) and sleep off the debt outside the lock, which keeps it fair
+    across threads without a wakeup queue.
+    """
+
+    def __init__(self, rate_per_s: float, capacity: float, clock: Clock = time.monotonic) -> None:
+        self.rate_per_s = rate_per_s
+        self.capacity = max(capacity, 1.0)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Takes `amount` tokens and returns how long the caller must wait before using them."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_s)
+            self._updated = now
+            self._tokens -= min(amount, self.capacity)
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate_per_s
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit: +1/limit per fast success (about +1 per window of
+    `limit` requests), x0.5 on overload (429/503/timeouts), x0.9 when latency
+    exceeds the target.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 32,
+        latency_target_s: float = 30.0,
+    ) -> None:
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.latency_target_s = latency_target_s
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def try_acquire(self) -> bool:
+        with self._cond:
+            if self.in_flight < math.floor(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self.in_flight >= math.floor(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, latency_s: float, overloaded: bool) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            if overloaded:
+                self.limit = max(self.minimum, self.limit * 0.5)
+            elif latency_s > self.latency_target_s:
+                self.limit = max(self.minimum, self.limit * 0.9)
+            else:
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+
+@dataclass
+class RequestSlot:
+    """Outcome of one request, filled in by the caller inside BackendLimiter.slot()."""
+
+    status: int | None = None
+    retry_after_s: float | None = None
+
+    def observe(self, status: int, retry_after: str | None = None) -> None:
+        self.status = status
+        self.retry_after_s = parse_retry_after(retry_after)
+
+
+class BackendLimiter:
+    """
+    Client-side throttle for one inference backend, shared by every thread:
+    requests/sec and tokens/min buckets, an AIMD concurrency limit, and a
+    backend-wide pause when the server sends Retry-After.
+    """
+
+    def __init__(
+        self,
+        requests_per_s: float = 0.0,
+        tokens_per_min: float = 0.0,
+        concurrency: AdaptiveConcurrencyLimiter | None = None,
+        clock: Clock = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self._clock = clock
+        self._sleep = sleep
+        self.requests = TokenBucket(requests_per_s, max(1.0, requests_per_s), clock) if requests_per_s > 0 else None
+        self.tokens = TokenBucket(tokens_per_min / 60.0, tokens_per_min, clock) if tokens_per_min > 0 else None
+        self.concurrency = concurrency or AdaptiveConcurrencyLimiter()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.throttled = 0
+        self.retry_after_pauses = 0
+
+    def _admission_delay(self, tokens: int) -> float:
+        delay = 0.0
+        with self._lock:
+            delay = max(delay, self._paused_until - self._clock())
+        if self.requests is not None:
+            delay = max(delay, self.requests.reserve(1))
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.reserve(tokens))
+        if delay > 0:
+            with self._lock:
+                self.throttled += 1
+        return delay
+
+    def _finish(self, slot: RequestSlot, started: float, failed: bool) -> None:
+        overloaded = failed or slot.status in OVERLOAD_STATUSES
+        if slot.retry_after_s:
+            with self._lock:
+                self._paused_until = max(self._paused_until, self._clock() + slot.retry_after_s)
+                self.retry_after_pauses += 1
+        self.concurrency.release(self._clock() - started, overloaded)
+
+    @contextmanager
+    def slot(self, tokens: int = 0) -> Iterator[RequestSlot]:
+        delay = self._admission_delay(tokens)
+        if delay > 0:
+            self._sleep(delay)
+        self.concurrency.acquire()
+
+        slot = RequestSlot()
+        started = self._clock()
+        failed = True
+        try:
+            yield slot
+            failed = False
+        finally:
+            self._finish(slot, started, failed)
+
+    @asynccontextmanager
+    async def aslot(self, tokens: int = 0) -> AsyncIterator[RequestSlot]:
+        delay = self._admission_delay(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        backoff = 0.005
+        while not self.concurrency.try_acquire():
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 0.1)
+
+        slot = RequestSlot()
+        started = self._clock()
+        failed = True
+        try:
+            yield slot
+            failed = False
+        finally:
+            self._finish(slot, started, failed)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            paused_for = max(0.0, self._paused_until - self._clock())
+        return {
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "in_flight": self.concurrency.in_flight,
+            "throttled": self.throttled,
+            "retry_after_pauses": self.retry_after_pauses,
+            "paused_for_s": round(paused_for, 3),
+        }
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token is close enough for budgeting
+    return max(1, len(text) // 4)
+
+
+def _env_float(name: str, default: str) -> float:
+    return float(os.getenv(name, default).strip() or default)
+
+
+# Keyed by backend and settings: a changed setting gets a fresh limiter (the
+# provider rebuilt for it picks that up), unchanged ones keep their state.
+_limiters: dict[tuple[str, float, float, int, float], BackendLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def shared_backend_limiter(backend: str) -> BackendLimiter:
+    """
+    One limiter per backend URL (and setting values) for the whole process.
+
+    Env config:
+      - KASPARRO_HF_RPS: max requests/sec, 0 = unlimited (default 0)
+      - KASPARRO_HF_TOKENS_PER_MIN: prompt + max_new_tokens budget, 0 = unlimited (default 0)
+      - KASPARRO_HF_MAX_CONCURRENCY: AIMD ceiling (default 16); starts at a quarter of it
+      - KASPARRO_HF_LATENCY_TARGET_S: back off when calls get slower than this (default 30)
+    """
+    rps = _env_float("KASPARRO_HF_RPS", "0")
+    tokens_per_min = _env_float("KASPARRO_HF_TOKENS_PER_MIN", "0")
+    maximum = int(_env_float("KASPARRO_HF_MAX_CONCURRENCY", "16"))
+    latency_target_s = _env_float("KASPARRO_HF_LATENCY_TARGET_S", "30")
+    key = (backend, rps, tokens_per_min, maximum, latency_target_s)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = _limiters[key] = BackendLimiter(
+                requests_per_s=rps,
+                tokens_per_min=tokens_per_min,
+                concurrency=AdaptiveConcurrencyLimiter(
+                    initial=max(1, maximum // 4),
+                    maximum=maximum,
+                    latency_target_s=latency_target_s,
+                ),
+            )
+        return limiter
+
+
+def reset_backend_limiters() -> None:
+    with _limiters_lock:
+        _limiters.clear()
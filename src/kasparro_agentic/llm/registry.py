@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections.abc import Callable, Mapping
+from typing import Any
+
+from kasparro_agentic.llm.cache import reset_shared_response_cache
+from kasparro_agentic.llm.provider import LLMProvider, build_llm_provider
+
+logger = logging.getLogger(__name__)
+
+# Env vars build_llm_provider() reads. Only these trigger a rebuild: checking
+# them is a few dict lookups, and unrelated settings (data/output/trace paths)
+# must not throw away warm connections, caches and batchers.
+_PROVIDER_ENV = (
+    "HF_API_TOKEN",
+    "KASPARRO_LLM_MODE",
+    "KASPARRO_LLM_STRICT",
+    "KASPARRO_LLM_CACHE",
+    "KASPARRO_LLM_CACHE_PATH",
+    "KASPARRO_LLM_CACHE_MAX_ENTRIES",
+    "KASPARRO_LLM_CACHE_DISK_MAX_ENTRIES",
+    "KASPARRO_LLM_CACHE_TTL_S",
+    "KASPARRO_LLM_MICROBATCH",
+    "KASPARRO_LLM_MICROBATCH_SIZE",
+    "KASPARRO_LLM_MICROBATCH_WAIT_MS",
+    "KASPARRO_MOCK_LATENCY_MS",
+    "KASPARRO_MOCK_JITTER_MS",
+    "KASPARRO_HF_MODEL",
+    "KASPARRO_HF_BASE_URL",
+    "KASPARRO_HF_MAX_NEW_TOKENS",
+    "KASPARRO_HF_TIMEOUT_S",
+    "KASPARRO_HF_CONNECT_TIMEOUT_S",
+    "KASPARRO_HF_READ_TIMEOUT_S",
+    "KASPARRO_HF_POOL_SIZE",
+    "KASPARRO_HF_MAX_ATTEMPTS",
+    "KASPARRO_HF_BACKOFF_BASE_S",
+    "KASPARRO_HF_BACKOFF_MAX_S",
+    "KASPARRO_HF_BREAKER_THRESHOLD",
+    "KASPARRO_HF_BREAKER_RESET_S",
+    "KASPARRO_HF_RPS",
+    "KASPARRO_HF_TOKENS_PER_MIN",
+    "KASPARRO_HF_MAX_CONCURRENCY",
+    "KASPARRO_HF_LATENCY_TARGET_S",
+)
+
+
+def _config_fingerprint() -> tuple[str | None, ...]:
+    return tuple(os.environ.get(k) for k in _PROVIDER_ENV)
+
+
+class ProviderRegistry:
+    """
+    Builds the configured provider once and hands out the shared instance, so
+    connection pools, caches and limiters are actually shared.
+
+    - get(): shared instance; rebuilt automatically when a provider env var changes
+    - configure(provider): pin an explicit instance (tests, embedding apps)
+    - reload(): drop the current instance and rebuild from env on next get()
+
+    Rebuilds and reload() also start a fresh shared response cache. Replaced
+    instances and caches are not closed here: callers may still hold them from
+    an earlier get(), so they keep working and are closed (batcher thread and
+    pool stopped, SQLite connection closed) once the last holder drops them.
+    """
+
+    def __init__(self, factory: Callable[[], LLMProvider] = build_llm_provider) -> None:
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._provider: LLMProvider | None = None
+        self._fingerprint: tuple[str | None, ...] | None = None
+        self._pinned = False
+
+    def get(self) -> LLMProvider:
+        provider = self._provider
+        if provider is not None and (self._pinned or self._fingerprint == _config_fingerprint()):
+            return provider
+
+        with self._lock:
+            fingerprint = _config_fingerprint()
+            if self._provider is not None and (self._pinned or self._fingerprint == fingerprint):
+                return self._provider
+            if self._provider is not None:
+                logger.info("LLM provider config changed; rebuilding provider.")
+                reset_shared_response_cache(close=False)
+            self._provider = self._factory()
+            self._fingerprint = fingerprint
+            return self._provider
+
+    def configure(self, provider: LLMProvider) -> None:
+        with self._lock:
+            self._provider = provider
+            self._pinned = True
+
+    def reload(self) -> None:
+        with self._lock:
+            self._provider = None
+            self._fingerprint = None
+            self._pinned = False
+            reset_shared_response_cache(close=False)
+
+
+_REGISTRY = ProviderRegistry()
+
+
+def get_llm_provider() -> LLMProvider:
+    return _REGISTRY.get()
+
+
+def configure_llm_provider(provider: LLMProvider) -> None:
+    _REGISTRY.configure(provider)
+
+
+def reload_llm_provider() -> None:
+    _REGISTRY.reload()
+
+
+def resolve_llm_provider(config: Mapping[str, Any] | None = None) -> LLMProvider:
+    """
+    Dependency injection for graph nodes: a provider passed as
+    config["configurable"]["llm"] wins, otherwise the shared instance.
+    """
+    if config:
+        llm = (config.get("configurable") or {}).get("llm")
+        if isinstance(llm, LLMProvider):
+            return llm
+    return get_llm_provider()
+
+
+def describe_provider(llm: LLMProvider) -> str:
+    """Class name of the innermost provider (wrappers expose it as .inner)."""
+    inner: Any = llm
+    while isinstance(getattr(inner, "inner", None), LLMProvider):
+        inner = inner.inner
+    return str(inner.__class__.__name__).lower()
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+import httpx
+import requests
+
+from kasparro_agentic.core.errors import LLMError
+from kasparro_agentic.llm.rate_limit import parse_retry_after
+
+logger = logging.getLogger(__name__)
+R = TypeVar("R")
+
+Clock = Callable[[], float]
+
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(LLMError):
+    """Raised without calling the backend while its circuit breaker is open."""
+
+
+def _status_and_retry_after(exc: BaseException) -> tuple[int | None, float | None]:
+    response: Any = None
+    if isinstance(exc, (requests.HTTPError, httpx.HTTPStatusError)):
+        response = exc.response
+    if response is None:
+        return None, None
+    return response.status_code, parse_retry_after(response.headers.get("Retry-After"))
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Transient failures only: timeouts, dropped connections and the statuses in RETRYABLE_STATUSES."""
+    if isinstance(exc, (requests.Timeout, requests.ConnectionError, httpx.TimeoutException, httpx.TransportError)):
+        return True
+    status, _ = _status_and_retry_after(exc)
+    return status in RETRYABLE_STATUSES
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with full jitter; a server Retry-After takes precedence when longer."""
+
+    max_attempts: int = 3
+    base_delay_s: float = 0.5
+    max_delay_s: float = 8.0
+
+    def delay(self, attempt: int, exc: BaseException) -> float:
+        backoff = random.uniform(0, min(self.max_delay_s, self.base_delay_s * (2**attempt)))
+        _, retry_after = _status_and_retry_after(exc)
+        if retry_after is not None:
+            return max(backoff, min(retry_after, self.max_delay_s))
+        return backoff
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive transient failures;
+    open -> half-open after `reset_timeout_s`, letting a single probe through;
+    the probe's outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout_s: float = 30.0, clock: Clock = time.monotonic) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout_s = reset_timeout_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.reset_timeout_s:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._probing:
+                    logger.warning("LLM circuit opened after %d consecutive failures.", self._failures)
+                self._opened_at = self._clock()
+            self._probing = False
+
+
+def call_with_retry(
+    fn: Callable[[], R],
+    policy: RetryPolicy,
+    breaker: CircuitBreaker,
+    sleep: Callable[[float], None] = time.sleep,
+) -> R:
+    """Runs fn under the breaker, retrying transient failures. Failures surface as LLMError."""
+    for attempt in range(policy.max_attempts):
+        if not breaker.allow():
+            raise CircuitOpenError("LLM backend circuit is open; skipping call.")
+        try:
+            out = fn()
+        except Exception as e:
+            if not is_retryable(e):
+                # a bad request says nothing about backend health
+                breaker.record_success()
+                raise LLMError(f"LLM call failed: {e}") from e
+            breaker.record_failure()
+            if attempt + 1 >= policy.max_attempts:
+                raise LLMError(f"LLM call failed after {policy.max_attempts} attempts: {e}") from e
+            delay = policy.delay(attempt, e)
+            logger.info("Transient LLM failure (%s); retry %d in %.2fs.", e, attempt + 1, delay)
+            sleep(delay)
+        else:
+            breaker.record_success()
+            return out
+    raise LLMError("LLM retry policy allows no attempts.")
+
+
+async def acall_with_retry(fn: Callable[[], Awaitable[R]], policy: RetryPolicy, breaker: CircuitBreaker) -> R:
+    for attempt in range(policy.max_attempts):
+        if not breaker.allow():
+            raise CircuitOpenError("LLM backend circuit is open; skipping call.")
+        try:
+            out = await fn()
+        except Exception as e:
+            if not is_retryable(e):
+                breaker.record_success()
+                raise LLMError(f"LLM call failed: {e}") from e
+            breaker.record_failure()
+            if attempt + 1 >= policy.max_attempts:
+                raise LLMError(f"LLM call failed after {policy.max_attempts} attempts: {e}") from e
+            delay = policy.delay(attempt, e)
+            logger.info("Transient LLM failure (%s); retry %d in %.2fs.", e, attempt + 1, delay)
+            await asyncio.sleep(delay)
+        else:
+            breaker.record_success()
+            return out
+    raise LLMError("LLM retry policy allows no attempts.")
+
+
+def _env_float(name: str, default: str) -> float:
+    return float(os.getenv(name, default).strip() or default)
+
+
+def retry_policy_from_env() -> RetryPolicy:
+    """
+    Env config:
+      - KASPARRO_HF_MAX_ATTEMPTS: attempts per call including the first (default 3)
+      - KASPARRO_HF_BACKOFF_BASE_S: first backoff ceiling, doubled per retry (default 0.5)
+      - KASPARRO_HF_BACKOFF_MAX_S: backoff cap (default 8)
+    """
+    return RetryPolicy(
+        max_attempts=max(1, int(_env_float("KASPARRO_HF_MAX_ATTEMPTS", "3"))),
+        base_delay_s=_env_float("KASPARRO_HF_BACKOFF_BASE_S", "0.5"),
+        max_delay_s=_env_float("KASPARRO_HF_BACKOFF_MAX_S", "8"),
+    )
+
+
+# Keyed by model and settings, like the backend limiters: changed settings
+# take effect on the next provider build.
+_breakers: dict[tuple[str, int, float], CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def shared_circuit_breaker(model: str) -> CircuitBreaker:
+    """
+    One breaker per model (and setting values) for the whole process.
+
+    Env config:
+      - KASPARRO_HF_BREAKER_THRESHOLD: consecutive failures before opening (default 5)
+      - KASPARRO_HF_BREAKER_RESET_S: seconds before a half-open probe (default 30)
+    """
+    threshold = int(_env_float("KASPARRO_HF_BREAKER_THRESHOLD", "5"))
+    reset_timeout_s = _env_float("KASPARRO_HF_BREAKER_RESET_S", "30")
+    key = (model, threshold, reset_timeout_s)
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker(failure_threshold=threshold, reset_timeout_s=reset_timeout_s)
+        return breaker
+
+
+def reset_circuit_breakers() -> None:
+    with _breakers_lock:
+        _breakers.clear()
@@ -3,34 +3,24 @@ from __future__ import annotations
 from kasparro_agentic.llm.provider import LLMProvider
 from kasparro_agentic.logic_blocks.blocks import disclaimer_informational, safety_block, usage_block
 from kasparro_agentic.models import FAQItem, FAQPage, Product, Question
+from kasparro_agentic.templates.prompts import FAQ_PROMPT, product_block, questions_block
 
 
 def _faq_prompt(product: Product, questions: list[Question]) -> str:
-    return f"""
-You are generating a FAQPage JSON using ONLY the given dataset fields.
-Do NOT invent new facts.
+    return FAQ_PROMPT.render(product_block("catalog", product), questions_block(questions))
 
-Product:
-- product_name: {product.product_name}
-- brand: {product.brand}
-- category: {product.category}
-- price_inr: {product.price_inr}
-- key_ingredients: {list(product.key_ingredients)}
-- benefits: {list(product.benefits)}
-- skin_type: {list(product.skin_type)}
-- concentration: {product.concentration}
-- how_to_use: {product.how_to_use}
-- side_effects: {product.side_effects}
 
-Questions:
-{[q.model_dump() for q in questions]}
+def build_faq_page(product: Product, questions: list[Question], llm: LLMProvider) -> FAQPage:
+    page = llm.invoke_structured(_faq_prompt(product, questions), FAQPage)
+    return _finalize_faq_page(page, product, questions)
 
-Return JSON matching the FAQPage schema.
-""".strip()
 
+async def abuild_faq_page(product: Product, questions: list[Question], llm: LLMProvider) -> FAQPage:
+    page = await llm.ainvoke_structured(_faq_prompt(product, questions), FAQPage)
+    return _finalize_faq_page(page, product, questions)
 
-def build_faq_page(product: Product, questions: list[Question], llm: LLMProvider) -> FAQPage:
-    page = llm.invoke_structured(_faq_prompt(product, questions), FAQPage)
+
+def _finalize_faq_page(page: FAQPage, product: Product, questions: list[Question]) -> FAQPage:
     page.disclaimer = disclaimer_informational()
 
     # Deterministic fallback if LLM returns too few items
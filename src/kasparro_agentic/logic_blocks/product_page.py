@@ -3,32 +3,24 @@ from __future__ import annotations
 from kasparro_agentic.llm.provider import LLMProvider
 from kasparro_agentic.logic_blocks.blocks import one_liner_summary, product_page_highlights
 from kasparro_agentic.models import Product, ProductPage
+from kasparro_agentic.templates.prompts import PRODUCT_PAGE_PROMPT, product_block
 
 
 def _product_page_prompt(product: Product) -> str:
-    return f"""
-You are generating a structured product page JSON using ONLY the given dataset fields.
-Do NOT invent new facts.
-
-Product:
-- product_name: {product.product_name}
-- brand: {product.brand}
-- category: {product.category}
-- price_inr: {product.price_inr}
-- key_ingredients: {list(product.key_ingredients)}
-- benefits: {list(product.benefits)}
-- skin_type: {list(product.skin_type)}
-- concentration: {product.concentration}
-- how_to_use: {product.how_to_use}
-- side_effects: {product.side_effects}
-
-Return JSON matching the ProductPage schema.
-""".strip()
+    return PRODUCT_PAGE_PROMPT.render(product_block("catalog", product))
 
 
 def build_product_page(product: Product, llm: LLMProvider) -> ProductPage:
     page = llm.invoke_structured(_product_page_prompt(product), ProductPage)
+    return _finalize_product_page(page, product)
 
+
+async def abuild_product_page(product: Product, llm: LLMProvider) -> ProductPage:
+    page = await llm.ainvoke_structured(_product_page_prompt(product), ProductPage)
+    return _finalize_product_page(page, product)
+
+
+def _finalize_product_page(page: ProductPage, product: Product) -> ProductPage:
     # Guardrail: keep highlights/summary dataset-consistent even if LLM deviates
     page.summary = one_liner_summary(product)
     page.highlights = product_page_highlights(product)
@@ -1,3 +1,9 @@
-from .dag import run_agent_workflow, run_workflow
+from .dag import (
+    arun_agent_workflow,
+    arun_workflow,
+    run_agent_workflow,
+    run_workflow,
+    stream_workflow,
+)
 
-__all__ = ["run_workflow", "run_agent_workflow"]
+__all__ = ["run_workflow", "run_agent_workflow", "arun_workflow", "arun_agent_workflow", "stream_workflow"]
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
-from typing import TypedDict
+from typing import Any, TypedDict
 
 from langgraph.graph import END, StateGraph
 
 from kasparro_agentic.agents.question_agent import generate_answer, generate_questions
 from kasparro_agentic.models import Product
+from kasparro_agentic.orchestration.graph_registry import get_compiled_graph, register_graph
+
+AGENT_WORKFLOW_GRAPH = "agent_workflow"
 
 
 class WorkflowState(TypedDict, total=False):
@@ -37,36 +40,44 @@ def _build_min_product(product_name: str) -> Product:
     )
 
 
-def run_agent_workflow(product_name: str) -> dict:
-    """
-    LangGraph-orchestrated workflow (required framework).
-    Returns a JSON-serializable dict.
-    """
+def _build_product_node(state: WorkflowState) -> WorkflowState:
+    return {"product": _build_min_product(state["product_name"])}
+
 
-    def build_product_node(state: WorkflowState) -> WorkflowState:
-        state["product"] = _build_min_product(state["product_name"])
-        return state
+def _questions_node(state: WorkflowState) -> WorkflowState:
+    qs = generate_questions(state["product"])
+    return {"questions": [q.model_dump() for q in qs]}
 
-    def questions_node(state: WorkflowState) -> WorkflowState:
-        qs = generate_questions(state["product"])
-        state["questions"] = [q.model_dump() for q in qs]
-        return state
 
-    def answer_node(state: WorkflowState) -> WorkflowState:
-        state["answer"] = generate_answer(state["product"])
-        return state
+def _answer_node(state: WorkflowState) -> WorkflowState:
+    product = state["product"]
+    question = f"What is {product.product_name} and how do I use it safely?"
+    return {"answer": generate_answer(product, question)}
 
+
+def _build_graph() -> Any:
     graph = StateGraph(WorkflowState)
-    graph.add_node("build_product", build_product_node)
-    graph.add_node("generate_questions", questions_node)
-    graph.add_node("generate_answer", answer_node)
+    graph.add_node("build_product", _build_product_node)
+    graph.add_node("generate_questions", _questions_node)
+    graph.add_node("generate_answer", _answer_node)
 
     graph.set_entry_point("build_product")
     graph.add_edge("build_product", "generate_questions")
     graph.add_edge("generate_questions", "generate_answer")
     graph.add_edge("generate_answer", END)
 
-    app = graph.compile()
+    return graph.compile()
+
+
+register_graph(AGENT_WORKFLOW_GRAPH, _build_graph)
+
+
+def run_agent_workflow(product_name: str) -> dict:
+    """
+    LangGraph-orchestrated workflow (required framework).
+    Returns a JSON-serializable dict.
+    """
+    app = get_compiled_graph(AGENT_WORKFLOW_GRAPH, _build_graph)
     final = app.invoke({"product_name": product_name})
 
     return {
@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import struct
+import threading
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any, TypeVar, cast
+
+from langchain_core.runnables import RunnableConfig
+
+logger = logging.getLogger(__name__)
+
+# One node's partial state update, exactly as the node returned it.
+NodeOutput = dict[str, Any]
+
+
+class NodeCheckpointer:
+    """
+    Durable store for per-node outputs, keyed by (run_id, node). Nodes save
+    only the partial dict they return, so a write costs one small record no
+    matter how large the accumulated graph state is. Payloads are pickled:
+    only point a checkpointer at storage this process owns.
+    """
+
+    def load(self, run_id: str) -> dict[str, NodeOutput]:
+        raise NotImplementedError
+
+    def save(self, run_id: str, node: str, output: NodeOutput) -> None:
+        raise NotImplementedError
+
+    def clear(self, run_id: str) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        return None
+
+
+class SQLiteCheckpointer(NodeCheckpointer):
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS node_checkpoints ("
+            " run_id TEXT NOT NULL,"
+            " node TEXT NOT NULL,"
+            " payload BLOB NOT NULL,"
+            " PRIMARY KEY (run_id, node))"
+        )
+
+    def load(self, run_id: str) -> dict[str, NodeOutput]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT node, payload FROM node_checkpoints WHERE run_id = ?", (run_id,)
+            ).fetchall()
+        out: dict[str, NodeOutput] = {}
+        for node, payload in rows:
+            try:
+                out[node] = pickle.loads(payload)
+            except Exception as e:  # noqa: BLE001
+                logger.warning("Dropping unreadable checkpoint %s/%s: %s", run_id, node, e)
+        return out
+
+    def save(self, run_id: str, node: str, output: NodeOutput) -> None:
+        payload = pickle.dumps(output, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO node_checkpoints(run_id, node, payload) VALUES (?, ?, ?)",
+                (run_id, node, payload),
+            )
+
+    def clear(self, run_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM node_checkpoints WHERE run_id = ?", (run_id,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_FRAME = struct.Struct("<I")
+
+
+class FileCheckpointer(NodeCheckpointer):
+    """
+    One append-only file per run: length-prefixed pickled (node, output)
+    frames. A save is a single append; a torn final frame (process killed
+    mid-write) is ignored on load and cut off before the next append.
+    fsync=True also survives power loss.
+    """
+
+    def __init__(self, directory: Path, fsync: bool = False) -> None:
+        self.directory = directory
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        # runs whose file this instance has checked for a torn tail
+        self._repaired: set[str] = set()
+        directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, run_id: str) -> Path:
+        # run ids are arbitrary strings; hash them into safe file names
+        return self.directory / f"{hashlib.sha1(run_id.encode('utf-8')).hexdigest()}.ckpt"
+
+    def _read(self, run_id: str) -> tuple[dict[str, NodeOutput], int]:
+        """The readable outputs and the byte length of the complete frames holding them."""
+        try:
+            data = self._path(run_id).read_bytes()
+        except FileNotFoundError:
+            return {}, 0
+        out: dict[str, NodeOutput] = {}
+        pos = 0
+        while pos + _FRAME.size <= len(data):
+            (size,) = _FRAME.unpack_from(data, pos)
+            end = pos + _FRAME.size + size
+            if end > len(data):
+                break
+            try:
+                node, output = pickle.loads(data[pos + _FRAME.size : end])
+            except Exception as e:  # noqa: BLE001
+                logger.warning("Stopping at unreadable checkpoint frame in %s: %s", run_id, e)
+                break
+            out[node] = output
+            pos = end
+        if pos < len(data):
+            logger.warning("Checkpoint file for %s ends in a torn frame at byte %d", run_id, pos)
+        return out, pos
+
+    def load(self, run_id: str) -> dict[str, NodeOutput]:
+        return self._read(run_id)[0]
+
+    def save(self, run_id: str, node: str, output: NodeOutput) -> None:
+        payload = pickle.dumps((node, output), protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            path = self._path(run_id)
+            if run_id not in self._repaired:
+                # frames appended after a torn one could never be read back
+                _, good = self._read(run_id)
+                if path.exists() and path.stat().st_size > good:
+                    with path.open("r+b") as f:
+                        f.truncate(good)
+                self._repaired.add(run_id)
+            with path.open("ab") as f:
+                f.write(_FRAME.pack(len(payload)) + payload)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+
+    def clear(self, run_id: str) -> None:
+        with self._lock:
+            self._path(run_id).unlink(missing_ok=True)
+            self._repaired.discard(run_id)
+
+
+class RunCheckpoint:
+    """
+    A checkpointer bound to one run, with that run's saved outputs loaded once.
+    Each output is stored with the fingerprint of the inputs that produced it
+    and is only replayed while they still match.
+    """
+
+    def __init__(self, checkpointer: NodeCheckpointer, run_id: str) -> None:
+        self.checkpointer = checkpointer
+        self.run_id = run_id
+        self.completed = checkpointer.load(run_id)
+        if self.completed:
+            logger.info("Resuming run %s: %s already done", run_id, ", ".join(sorted(self.completed)))
+
+    def replay(self, node: str, fingerprint: str) -> NodeOutput | None:
+        saved = self.completed.get(node)
+        if saved is None:
+            return None
+        if saved.get("fingerprint") != fingerprint:
+            logger.info("Run %s: inputs of %s changed since its checkpoint; rerunning it.", self.run_id, node)
+            return None
+        output: NodeOutput = saved["output"]
+        return output
+
+    def save(self, node: str, output: NodeOutput, fingerprint: str) -> None:
+        self.checkpointer.save(self.run_id, node, {"fingerprint": fingerprint, "output": output})
+
+    def clear(self) -> None:
+        self.checkpointer.clear(self.run_id)
+
+
+def with_checkpoint(
+    config: RunnableConfig, checkpointer: NodeCheckpointer | None, run_id: str | None
+) -> RunnableConfig:
+    """Adds a RunCheckpoint for `run_id` to the invoke config (no-op without both)."""
+    if checkpointer is None or not run_id:
+        return config
+    configurable = {**config.get("configurable", {}), "checkpoint": RunCheckpoint(checkpointer, run_id)}
+    return {**config, "configurable": configurable}
+
+
+def run_checkpoint(config: RunnableConfig | None) -> RunCheckpoint | None:
+    checkpoint = ((config or {}).get("configurable") or {}).get("checkpoint")
+    return checkpoint if isinstance(checkpoint, RunCheckpoint) else None
+
+
+# Nodes return their graph's own TypedDict; any mapping of state keys will do.
+NodeFn = TypeVar("NodeFn", bound=Callable[[Any, RunnableConfig], Any])
+AsyncNodeFn = TypeVar("AsyncNodeFn", bound=Callable[[Any, RunnableConfig], Awaitable[Any]])
+# Digest of everything a node's output depends on (product fields, provider, upstream outputs).
+Fingerprint = Callable[[Any, RunnableConfig], str]
+
+
+def input_fingerprint(*parts: Any) -> str:
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def checkpointed(name: str, fingerprint: Fingerprint) -> Callable[[NodeFn], NodeFn]:
+    """
+    Replays the node's saved output when the run already completed it with
+    the same input fingerprint; runs and saves it otherwise.
+    """
+
+    def decorator(fn: NodeFn) -> NodeFn:
+        def wrapper(state: Any, config: RunnableConfig) -> Any:
+            checkpoint = run_checkpoint(config)
+            if checkpoint is None:
+                return fn(state, config)
+            inputs = fingerprint(state, config)
+            out = checkpoint.replay(name, inputs)
+            if out is None:
+                out = fn(state, config)
+                checkpoint.save(name, out, inputs)
+            return out
+
+        return cast(NodeFn, wrapper)
+
+    return decorator
+
+
+def acheckpointed(name: str, fingerprint: Fingerprint) -> Callable[[AsyncNodeFn], AsyncNodeFn]:
+    def decorator(fn: AsyncNodeFn) -> AsyncNodeFn:
+        async def wrapper(state: Any, config: RunnableConfig) -> Any:
+            checkpoint = run_checkpoint(config)
+            if checkpoint is None:
+                return await fn(state, config)
+            inputs = fingerprint(state, config)
+            out = checkpoint.replay(name, inputs)
+            if out is None:
+                out = await fn(state, config)
+                await asyncio.to_thread(checkpoint.save, name, out, inputs)
+            return out
+
+        return cast(AsyncNodeFn, wrapper)
+
+    return decorator
+
+
+def build_checkpointer(path: Path) -> NodeCheckpointer:
+    """*.db / *.sqlite / *.sqlite3 -> SQLiteCheckpointer; anything else is a FileCheckpointer directory."""
+    if path.suffix.lower() in {".db", ".sqlite", ".sqlite3"}:
+        return SQLiteCheckpointer(path)
+    return FileCheckpointer(path)
+
+
+_shared: dict[str, NodeCheckpointer] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_checkpointer() -> NodeCheckpointer | None:
+    """
+    Env config:
+      - KASPARRO_CHECKPOINT_PATH: SQLite file or directory for node checkpoints (unset = off)
+    """
+    raw = os.getenv("KASPARRO_CHECKPOINT_PATH", "").strip()
+    if not raw:
+        return None
+    with _shared_lock:
+        checkpointer = _shared.get(raw)
+        if checkpointer is None:
+            checkpointer = _shared[raw] = build_checkpointer(Path(raw))
+        return checkpointer
+
+
+def reset_checkpointers() -> None:
+    with _shared_lock:
+        for checkpointer in _shared.values():
+            checkpointer.close()
+        _shared.clear()
@@ -1,12 +1,36 @@
 from __future__ import annotations
 
-from typing import TypedDict
+import asyncio
+from collections.abc import Callable, Iterator
+from typing import Any, TypedDict
 
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langgraph.graph import END, StateGraph
 
-from kasparro_agentic.agents.question_agent import generate_answer, generate_questions
-from kasparro_agentic.llm.provider import build_llm_provider
+from kasparro_agentic.agents.question_agent import (
+    agenerate_answer,
+    agenerate_questions,
+    generate_answer,
+    generate_questions,
+    stream_answer,
+)
+from kasparro_agentic.data.product_store import load_product_by_name
+from kasparro_agentic.llm.instrumented import instrumented
+from kasparro_agentic.llm.provider import LLMProvider
+from kasparro_agentic.llm.registry import describe_provider, resolve_llm_provider
 from kasparro_agentic.models import Product, Question
+from kasparro_agentic.orchestration.checkpoint import (
+    NodeCheckpointer,
+    acheckpointed,
+    checkpointed,
+    input_fingerprint,
+    shared_checkpointer,
+    with_checkpoint,
+)
+from kasparro_agentic.orchestration.graph_registry import get_compiled_graph, register_graph
+from kasparro_agentic.orchestration.singleflight import SingleFlight, SingleFlightStats
+
+WORKFLOW_GRAPH = "workflow"
 
 
 class GraphState(TypedDict, total=False):
@@ -18,38 +42,70 @@ class GraphState(TypedDict, total=False):
     mode: str
 
 
+def _llm(config: RunnableConfig) -> LLMProvider:
+    return instrumented(resolve_llm_provider(config))
+
+
+def _inputs(name: str) -> Callable[[GraphState, RunnableConfig], str]:
+    # both LLM steps depend only on the parsed product and the provider
+    def fingerprint(state: GraphState, config: RunnableConfig) -> str:
+        return input_fingerprint(
+            name, state["product"].model_dump(mode="json"), resolve_llm_provider(config).cache_identity()
+        )
+
+    return fingerprint
+
+
 def _node_build_product(state: GraphState) -> GraphState:
-    product_name = state["product_name"].strip()
-    product = Product(product_name=product_name)
+    # Indexed dataset lookup; unknown names get a minimal product.
+    product = load_product_by_name(state["product_name"])
     return {"product": product}
 
 
-def _node_generate_questions(state: GraphState) -> GraphState:
+@checkpointed("questions", _inputs("questions"))
+def _node_generate_questions(state: GraphState, config: RunnableConfig) -> GraphState:
     product = state["product"]
-    qs = generate_questions(product)
+    qs = generate_questions(product, llm=_llm(config))
     return {"questions": qs}
 
 
-def _node_generate_answer(state: GraphState) -> GraphState:
-    product = state["product"]
+def _default_question(product: Product) -> str:
     # standard question for demo
-    q = f"What is {product.product_name} and how do I use it safely?"
-    ans = generate_answer(product, q)
+    return f"What is {product.product_name} and how do I use it safely?"
+
+
+@checkpointed("answer", _inputs("answer"))
+def _node_generate_answer(state: GraphState, config: RunnableConfig) -> GraphState:
+    product = state["product"]
+    ans = generate_answer(product, _default_question(product), llm=_llm(config))
+    return {"answer": ans}
+
+
+@acheckpointed("questions", _inputs("questions"))
+async def _anode_generate_questions(state: GraphState, config: RunnableConfig) -> GraphState:
+    qs = await agenerate_questions(state["product"], llm=_llm(config))
+    return {"questions": qs}
+
+
+@acheckpointed("answer", _inputs("answer"))
+async def _anode_generate_answer(state: GraphState, config: RunnableConfig) -> GraphState:
+    product = state["product"]
+    ans = await agenerate_answer(product, _default_question(product), llm=_llm(config))
     return {"answer": ans}
 
 
-def _node_metadata(state: GraphState) -> GraphState:
+def _node_metadata(state: GraphState, config: RunnableConfig) -> GraphState:
     # record mode for debugging
-    mode = (build_llm_provider().__class__.__name__).lower()
+    mode = describe_provider(resolve_llm_provider(config))
     return {"mode": mode}
 
 
-def _build_graph():
+def _build_graph() -> Any:
     g = StateGraph(GraphState)
 
     g.add_node("build_product", _node_build_product)
-    g.add_node("questions", _node_generate_questions)
-    g.add_node("answer", _node_generate_answer)
+    g.add_node("questions", RunnableLambda(_node_generate_questions, afunc=_anode_generate_questions))
+    g.add_node("answer", RunnableLambda(_node_generate_answer, afunc=_anode_generate_answer))
     g.add_node("metadata", _node_metadata)
 
     g.set_entry_point("build_product")
@@ -61,38 +117,160 @@ def _build_graph():
     return g.compile()
 
 
-_GRAPH = _build_graph()
+register_graph(WORKFLOW_GRAPH, _build_graph)
+
+
+def _graph() -> Any:
+    return get_compiled_graph(WORKFLOW_GRAPH, _build_graph)
+
+
+def _workflow_config(
+    llm: LLMProvider | None, checkpointer: NodeCheckpointer | None = None, run_id: str | None = None
+) -> RunnableConfig:
+    config: RunnableConfig = {"configurable": {"llm": llm}} if llm is not None else {}
+    return with_checkpoint(config, checkpointer, run_id)
+
+
+def _workflow_result(product_name: str, out: dict) -> dict:
+    product: Product = out.get("product")  # type: ignore[assignment]
+    questions: list[Question] = out.get("questions", [])  # type: ignore[assignment]
+    answer: str = out.get("answer", "")
+
+    return {
+        "productName": product.product_name if product else product_name,
+        "questions": [q.question for q in questions],
+        "answer": answer,
+        "mode": out.get("mode", "mock"),
+        "error": None,
+    }
+
+
+def _workflow_error(product_name: str, e: Exception) -> dict:
+    return {
+        "productName": product_name,
+        "questions": [],
+        "answer": "",
+        "mode": "error",
+        "error": str(e),
+    }
+
+
+def _invoke_workflow(
+    product_name: str, llm: LLMProvider | None, checkpointer: NodeCheckpointer | None, run_id: str | None
+) -> dict:
+    init: GraphState = {"product_name": product_name}
+    try:
+        out = _graph().invoke(init, config=_workflow_config(llm, checkpointer, run_id))
+        if checkpointer is not None and run_id:
+            checkpointer.clear(run_id)
+        return _workflow_result(product_name, out)
+    except Exception as e:  # noqa: BLE001
+        return _workflow_error(product_name, e)
+
+
+async def _ainvoke_workflow(
+    product_name: str, llm: LLMProvider | None, checkpointer: NodeCheckpointer | None, run_id: str | None
+) -> dict:
+    init: GraphState = {"product_name": product_name}
+    try:
+        config = await asyncio.to_thread(_workflow_config, llm, checkpointer, run_id)
+        out = await _graph().ainvoke(init, config=config)
+        if checkpointer is not None and run_id:
+            await asyncio.to_thread(checkpointer.clear, run_id)
+        return _workflow_result(product_name, out)
+    except Exception as e:  # noqa: BLE001
+        return _workflow_error(product_name, e)
+
+
+# Concurrent identical requests (e.g. a viral product) share one execution.
+_SINGLE_FLIGHT: SingleFlight[dict] = SingleFlight()
+
+
+def _flight_key(
+    product_name: str, llm: LLMProvider | None, run_id: str | None, checkpointer: NodeCheckpointer | None
+) -> tuple[str, str, int, str | None, int]:
+    provider = llm or resolve_llm_provider()
+    # a run_id only joins the flight of the same run: each run checkpoints and
+    # clears its own state
+    name = " ".join(product_name.split()).casefold()
+    return name, describe_provider(provider), id(provider), run_id if checkpointer else None, id(checkpointer)
+
+
+def _own_copy(result: dict) -> dict:
+    # Waiters share the leader's dict; give each caller its own.
+    return {**result, "questions": list(result.get("questions", []))}
 
 
-def run_workflow(product_name: str) -> dict:
+def run_workflow(
+    product_name: str,
+    llm: LLMProvider | None = None,
+    run_id: str | None = None,
+    checkpointer: NodeCheckpointer | None = None,
+) -> dict:
     """
     Backend LangGraph workflow (safe default is mock provider).
-    Returns a JSON-serializable dict.
+    Returns a JSON-serializable dict. `llm` overrides the shared provider.
+    Concurrent calls for the same normalized name, provider and run are coalesced.
+    With a `run_id`, completed LLM steps are checkpointed (to `checkpointer`, or
+    KASPARRO_CHECKPOINT_PATH) and a failed run retried under the same id resumes
+    after the last one that finished.
     """
-    init: GraphState = {"product_name": product_name}
-    try:
-        out = _GRAPH.invoke(init)
-        product: Product = out.get("product")  # type: ignore[assignment]
-        questions: list[Question] = out.get("questions", [])  # type: ignore[assignment]
-        answer: str = out.get("answer", "")
+    checkpointer = checkpointer or shared_checkpointer()
+    key = _flight_key(product_name, llm, run_id, checkpointer)
+    return _own_copy(
+        _SINGLE_FLIGHT.do(key, lambda: _invoke_workflow(product_name, llm, checkpointer, run_id))
+    )
+
+
+async def arun_workflow(
+    product_name: str,
+    llm: LLMProvider | None = None,
+    run_id: str | None = None,
+    checkpointer: NodeCheckpointer | None = None,
+) -> dict:
+    """Async twin of run_workflow: LLM nodes await the provider instead of blocking a thread."""
+    checkpointer = checkpointer or shared_checkpointer()
+    key = _flight_key(product_name, llm, run_id, checkpointer)
+    return _own_copy(
+        await _SINGLE_FLIGHT.ado(key, lambda: _ainvoke_workflow(product_name, llm, checkpointer, run_id))
+    )
+
+
+def workflow_dedup_stats() -> SingleFlightStats:
+    """How many run_workflow calls were served by another caller's in-flight execution."""
+    return _SINGLE_FLIGHT.stats()
+
 
-        return {
-            "productName": product.product_name if product else product_name,
+def stream_workflow(product_name: str, llm: LLMProvider | None = None) -> Iterator[tuple[str, dict[str, Any]]]:
+    """
+    Same steps as run_workflow, emitted as (event, data) pairs as they complete:
+    "questions" once they exist, then one "token" per answer chunk, then "done"
+    (or "error"). Lets a client render something long before the answer is finished.
+    """
+    llm = instrumented(llm or resolve_llm_provider())
+    try:
+        product = load_product_by_name(product_name)
+        questions = generate_questions(product, llm=llm)
+        mode = describe_provider(llm)
+        yield "questions", {
+            "productName": product.product_name,
             "questions": [q.question for q in questions],
-            "answer": answer,
-            "mode": out.get("mode", "mock"),
-            "error": None,
+            "mode": mode,
         }
+
+        chunks: list[str] = []
+        for chunk in stream_answer(product, _default_question(product), llm=llm):
+            chunks.append(chunk)
+            yield "token", {"text": chunk}
+        yield "done", {"answer": "".join(chunks).strip(), "mode": mode, "error": None}
     except Exception as e:  # noqa: BLE001
-        return {
-            "productName": product_name,
-            "questions": [],
-            "answer": "",
-            "mode": "error",
-            "error": str(e),
-        }
+        yield "error", {"mode": "error", "error": str(e)}
 
 
 # Backward-compatible name (some earlier code calls this)
 def run_agent_workflow(product_name: str) -> dict:
     return run_workflow(product_name)
+
+
+async def arun_agent_workflow(product_name: str) -> dict:
+    return await arun_workflow(product_name)
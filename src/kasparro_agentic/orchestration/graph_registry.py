@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import importlib
+import logging
+import threading
+import time
+from collections.abc import Callable, Hashable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+GraphBuilder = Callable[..., Any]
+
+# Modules that register graphs on import; warm_graphs() loads them.
+_GRAPH_MODULES = (
+    "kasparro_agentic.orchestration.langgraph_pipeline",
+    "kasparro_agentic.orchestration.dag",
+    "kasparro_agentic.orchestration.agent_orchestrator",
+)
+
+
+@dataclass(frozen=True)
+class CompileRecord:
+    name: str
+    config: dict[str, Any]
+    compile_ms: float
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class GraphRegistry:
+    """
+    Compiled LangGraph apps keyed by (name, config). A compiled graph is
+    immutable and safe to invoke concurrently, so each one is built once per
+    process and every entry point shares it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._builders: dict[str, GraphBuilder] = {}
+        self._graphs: dict[tuple[str, Hashable], Any] = {}
+        self._records: list[CompileRecord] = []
+
+    def register(self, name: str, builder: GraphBuilder) -> None:
+        with self._lock:
+            self._builders[name] = builder
+
+    def get(self, name: str, builder: GraphBuilder | None = None, **config: Any) -> Any:
+        key = (name, tuple(sorted(config.items())))
+        graph = self._graphs.get(key)
+        if graph is not None:
+            return graph
+
+        with self._lock:
+            graph = self._graphs.get(key)
+            if graph is not None:
+                return graph
+            build = builder or self._builders.get(name)
+            if build is None:
+                raise KeyError(f"No graph builder registered as {name!r}")
+
+            start = time.perf_counter()
+            graph = build(**config)
+            record = CompileRecord(name, dict(config), round((time.perf_counter() - start) * 1000.0, 3))
+            self._graphs[key] = graph
+            self._records.append(record)
+        logger.info("Compiled graph %r %s in %.1f ms", name, config or "", record.compile_ms)
+        return graph
+
+    def names(self) -> list[str]:
+        with self._lock:
+            return sorted(self._builders)
+
+    def compile_stats(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return [r.as_dict() for r in self._records]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._graphs.clear()
+            self._records.clear()
+
+
+_REGISTRY = GraphRegistry()
+
+
+def register_graph(name: str, builder: GraphBuilder) -> None:
+    _REGISTRY.register(name, builder)
+
+
+def get_compiled_graph(name: str, builder: GraphBuilder | None = None, **config: Any) -> Any:
+    """Shared compiled graph; `builder(**config)` runs only on the first request for this key."""
+    return _REGISTRY.get(name, builder, **config)
+
+
+def compile_stats() -> list[dict[str, Any]]:
+    return _REGISTRY.compile_stats()
+
+
+def warm_graphs() -> list[dict[str, Any]]:
+    """Compile every known graph up front (app startup) and return the compile costs."""
+    for module in _GRAPH_MODULES:
+        importlib.import_module(module)
+    for name in _REGISTRY.names():
+        get_compiled_graph(name)
+    stats = compile_stats()
+    total_ms = sum(r["compile_ms"] for r in stats)
+    logger.info("Warmed %d graphs in %.1f ms total", len(stats), total_ms)
+    return stats
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from kasparro_agentic.core.tracing import current_span
+from kasparro_agentic.llm.provider import LLMProvider
+from kasparro_agentic.models import FictionalProduct, Product, Question
+from kasparro_agentic.templates.prompts import (
+    COMPARISON_PROMPT,
+    FAQ_PROMPT,
+    PRODUCT_PAGE_PROMPT,
+    QUESTIONS_PROMPT,
+    PromptTemplate,
+)
+
+logger = logging.getLogger(__name__)
+
+# Written next to the page JSON files; holds each node's fingerprint and output.
+NODE_CACHE_FILE = "_node_cache.json"
+
+# Bump when node logic outside the prompts (finalize steps, page models)
+# changes what a node produces for the same inputs.
+FINGERPRINT_VERSION = "1"
+
+_ALL_FIELDS = tuple(Product.model_fields)
+
+
+@dataclass(frozen=True)
+class NodeInputs:
+    """What a node's output depends on besides the provider."""
+
+    fields: tuple[str, ...]
+    templates: tuple[PromptTemplate, ...]
+    upstream: tuple[str, ...] = ()
+    # node output <-> JSON; identity for nodes that already return plain dicts
+    encode: Callable[[dict[str, Any]], dict[str, Any]] = dict
+    decode: Callable[[dict[str, Any]], dict[str, Any]] = dict
+
+
+def _encode_questions(out: dict[str, Any]) -> dict[str, Any]:
+    return {"questions": [q.model_dump() for q in out["questions"]]}
+
+
+def _decode_questions(data: dict[str, Any]) -> dict[str, Any]:
+    return {"questions": [Question.model_validate(q) for q in data["questions"]]}
+
+
+def _encode_comparison(out: dict[str, Any]) -> dict[str, Any]:
+    return {**out, "fictional_product_b": out["fictional_product_b"].model_dump(mode="json")}
+
+
+def _decode_comparison(data: dict[str, Any]) -> dict[str, Any]:
+    return {**data, "fictional_product_b": FictionalProduct.model_validate(data["fictional_product_b"])}
+
+
+# Fields are the ones each node's prompt and finalize step actually read, so a
+# price change leaves the questions alone but rebuilds the pages that show it.
+NODE_INPUTS: dict[str, NodeInputs] = {
+    "question_generator": NodeInputs(
+        fields=("product_name", "brand", "category", "benefits", "how_to_use"),
+        templates=(QUESTIONS_PROMPT,),
+        encode=_encode_questions,
+        decode=_decode_questions,
+    ),
+    "faq_page_builder": NodeInputs(
+        fields=_ALL_FIELDS,
+        templates=(FAQ_PROMPT,),
+        upstream=("question_generator",),
+    ),
+    "product_page_builder": NodeInputs(fields=_ALL_FIELDS, templates=(PRODUCT_PAGE_PROMPT,)),
+    "comparison_page_builder": NodeInputs(
+        fields=("product_name", "brand", "category", "price_inr", "key_ingredients", "benefits", "skin_type"),
+        templates=(COMPARISON_PROMPT,),
+        encode=_encode_comparison,
+        decode=_decode_comparison,
+    ),
+}
+
+
+def node_fingerprint(
+    name: str,
+    product: Product,
+    llm: LLMProvider,
+    node_cache: Mapping[str, Mapping[str, Any]] | None = None,
+) -> str:
+    spec = NODE_INPUTS[name]
+    node_cache = node_cache or {}
+    payload = {
+        "v": FINGERPRINT_VERSION,
+        "node": name,
+        "fields": {f: getattr(product, f) for f in spec.fields},
+        "templates": {t.name: t.version for t in spec.templates},
+        "provider": llm.cache_identity(),
+        "upstream": {u: node_cache.get(u, {}).get("fingerprint") for u in spec.upstream},
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=list)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _previous(name: str, state: Mapping[str, Any], fingerprint: str) -> dict[str, Any] | None:
+    entry = (state.get("previous_outputs") or {}).get(name)
+    if not entry or entry.get("fingerprint") != fingerprint:
+        return None
+    try:
+        return NODE_INPUTS[name].decode(entry["output"])
+    except Exception as e:  # noqa: BLE001
+        logger.warning("Stored output for %s is unreadable; regenerating. Error=%s", name, e)
+        return None
+
+
+def _fallbacks() -> int:
+    span = current_span()
+    return span.fallbacks if span is not None else 0
+
+
+def _with_cache_entry(
+    name: str, state: Mapping[str, Any], out: dict[str, Any], fingerprint: str, reused: bool, fell_back: bool
+) -> dict[str, Any]:
+    node_cache = state.get("node_cache") or {}
+    if fell_back or any(u not in node_cache for u in NODE_INPUTS[name].upstream):
+        # Mock stand-ins (or pages built on them) would be reused by every later
+        # healthy run with the same fingerprint; leave no entry, so they rebuild.
+        logger.warning("Not recording %s in the node cache: built from a mock fallback.", name)
+        return out
+    entry = {"fingerprint": fingerprint, "reused": reused, "output": NODE_INPUTS[name].encode(out)}
+    return {**out, "node_cache": {name: entry}}
+
+
+def reuse_or_run(
+    name: str, state: Mapping[str, Any], llm: LLMProvider, run: Callable[[], dict[str, Any]]
+) -> dict[str, Any]:
+    """
+    The node's previous output if its inputs are unchanged, else `run()`; plus
+    its node_cache entry, unless a mock fallback answered one of its LLM calls.
+    """
+    fingerprint = node_fingerprint(name, state["product"], llm, state.get("node_cache"))
+    out = _previous(name, state, fingerprint)
+    reused = out is not None
+    before = _fallbacks()
+    if out is None:
+        out = run()
+    return _with_cache_entry(name, state, out, fingerprint, reused, _fallbacks() > before)
+
+
+async def areuse_or_run(
+    name: str, state: Mapping[str, Any], llm: LLMProvider, run: Callable[[], Awaitable[dict[str, Any]]]
+) -> dict[str, Any]:
+    fingerprint = node_fingerprint(name, state["product"], llm, state.get("node_cache"))
+    out = _previous(name, state, fingerprint)
+    reused = out is not None
+    before = _fallbacks()
+    if out is None:
+        out = await run()
+    return _with_cache_entry(name, state, out, fingerprint, reused, _fallbacks() > before)
+
+
+def incremental_summary(node_cache: Mapping[str, Mapping[str, Any]]) -> dict[str, list[str]]:
+    return {
+        "regenerated": sorted(n for n, e in node_cache.items() if not e.get("reused")),
+        "reused": sorted(n for n, e in node_cache.items() if e.get("reused")),
+    }
+
+
+def load_node_cache(output_dir: Path) -> dict[str, Any]:
+    """Fingerprints and outputs from the last run into `output_dir` ({} if none or unreadable)."""
+    path = output_dir / NODE_CACHE_FILE
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable node cache %s: %s", path, e)
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def node_cache_payload(node_cache: Mapping[str, Mapping[str, Any]]) -> dict[str, Any]:
+    return {n: {"fingerprint": e["fingerprint"], "output": e["output"]} for n, e in sorted(node_cache.items())}
@@ -1,24 +1,51 @@
 from __future__ import annotations
 
-import time
-from collections.abc import Callable
-from typing import Any, TypedDict
+import operator
+import os
+from collections.abc import Awaitable, Callable
+from typing import Annotated, Any, TypedDict
 
-from langchain_core.runnables import RunnableLambda
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langgraph.graph import END, StateGraph
 
 from kasparro_agentic.agents.page_agents import (
+    abuild_comparison_page_agent,
+    abuild_faq_page_agent,
+    abuild_product_page_agent,
     build_comparison_page_agent,
     build_faq_page_agent,
     build_fictional_product_b_agent,
     build_product_page_agent,
 )
 from kasparro_agentic.agents.parser_agent import parse_product
-from kasparro_agentic.agents.question_agent import generate_questions
+from kasparro_agentic.agents.question_agent import agenerate_questions, generate_questions
+from kasparro_agentic.core.tracing import node_span
 from kasparro_agentic.data.product_data import RAW_PRODUCT_DATA
+from kasparro_agentic.llm.instrumented import instrumented
+from kasparro_agentic.llm.provider import LLMProvider
+from kasparro_agentic.llm.registry import resolve_llm_provider
+from kasparro_agentic.orchestration.checkpoint import (
+    NodeCheckpointer,
+    acheckpointed,
+    checkpointed,
+    with_checkpoint,
+)
+from kasparro_agentic.orchestration.graph_registry import get_compiled_graph, register_graph
+from kasparro_agentic.orchestration.incremental import (
+    areuse_or_run,
+    incremental_summary,
+    node_fingerprint,
+    reuse_or_run,
+)
+
+PIPELINE_GRAPH = "content_pipeline"
 
 
 class GraphState(TypedDict, total=False):
+    # Optional input; the seed RAW_PRODUCT_DATA is used when absent.
+    raw_product: dict[str, Any]
+    # Optional input: the last run's node cache (see orchestration/incremental.py).
+    previous_outputs: dict[str, Any]
     product: Any
     questions: Any
     faq: Any
@@ -26,63 +53,237 @@ class GraphState(TypedDict, total=False):
     fictional_product_b: Any
     comparison_page: Any
     dag_metadata: Any
+    # Appended by every timed node; parallel branches merge through the reducer.
+    node_timings: Annotated[list[dict[str, Any]], operator.add]
+    # node -> {fingerprint, reused, output}, one entry per LLM node
+    node_cache: Annotated[dict[str, dict[str, Any]], operator.or_]
+
+
+DEFAULT_MAX_CONCURRENCY = 4
+
+_SPAN_COUNTERS = ("llm_calls", "cache_hits", "prompt_chars", "response_chars")
+
+# Nodes that always run after every measured node has finished.
+_TRAILING_NODES = ["dag_metadata_writer", "output_writer"]
+
+
+def execution_config(
+    max_concurrency: int | None = None,
+    llm: LLMProvider | None = None,
+    checkpointer: NodeCheckpointer | None = None,
+    run_id: str | None = None,
+) -> RunnableConfig:
+    """
+    Invoke config for the page graph. Independent branches (product page,
+    comparison page, questions -> FAQ) run concurrently on LangGraph's thread
+    pool, bounded by max_concurrency; 1 gives the old sequential behaviour.
+    Falls back to KASPARRO_MAX_CONCURRENCY, then DEFAULT_MAX_CONCURRENCY.
+    `llm` is injected into every node; the shared registry provider otherwise.
+    With both `checkpointer` and `run_id`, LLM nodes already completed under
+    `run_id` are replayed from the checkpoint instead of re-run.
+    """
+    if max_concurrency is None:
+        max_concurrency = int(os.getenv("KASPARRO_MAX_CONCURRENCY", str(DEFAULT_MAX_CONCURRENCY)).strip())
+    config: RunnableConfig = {"max_concurrency": max(1, max_concurrency)}
+    if llm is not None:
+        config["configurable"] = {"llm": llm}
+    return with_checkpoint(config, checkpointer, run_id)
+
+
+def _llm(config: RunnableConfig) -> LLMProvider:
+    # every call is reported to the running node's span
+    return instrumented(resolve_llm_provider(config))
+
+
+def _inputs(name: str) -> Callable[[GraphState, RunnableConfig], str]:
+    """The node's incremental fingerprint, which also guards replaying its checkpoint."""
+
+    def fingerprint(state: GraphState, config: RunnableConfig) -> str:
+        return node_fingerprint(name, state["product"], resolve_llm_provider(config), state.get("node_cache"))
 
+    return fingerprint
 
-def timed(name: str) -> Callable[[Callable[[GraphState], dict[str, Any]]], Callable[[GraphState], dict[str, Any]]]:
-    def decorator(fn: Callable[[GraphState], dict[str, Any]]) -> Callable[[GraphState], dict[str, Any]]:
-        def wrapper(state: GraphState) -> dict[str, Any]:
-            _start = time.time()
-            out = fn(state)
-            _ = int((time.time() - _start) * 1000)
-            return out
+
+NodeFn = Callable[[GraphState, RunnableConfig], dict[str, Any]]
+AsyncNodeFn = Callable[[GraphState, RunnableConfig], Awaitable[dict[str, Any]]]
+
+
+def timed(name: str) -> Callable[[NodeFn], NodeFn]:
+    def decorator(fn: NodeFn) -> NodeFn:
+        def wrapper(state: GraphState, config: RunnableConfig) -> dict[str, Any]:
+            with node_span(name) as span:
+                out = fn(state, config)
+            return {**out, "node_timings": [span.as_dict()]}
+        return wrapper
+    return decorator
+
+
+def atimed(name: str) -> Callable[[AsyncNodeFn], AsyncNodeFn]:
+    def decorator(fn: AsyncNodeFn) -> AsyncNodeFn:
+        async def wrapper(state: GraphState, config: RunnableConfig) -> dict[str, Any]:
+            with node_span(name) as span:
+                out = await fn(state, config)
+            return {**out, "node_timings": [span.as_dict()]}
         return wrapper
     return decorator
 
 
+def _summarize_timings(timings: list[dict[str, Any]]) -> dict[str, Any]:
+    ordered = sorted(timings, key=lambda t: t["start_s"])
+    if not ordered:
+        return {
+            "execution_order": list(_TRAILING_NODES),
+            "timings": [],
+            "wall_ms": 0.0,
+            "busy_ms": 0.0,
+            "totals": {"cpu_ms": 0.0, **dict.fromkeys(_SPAN_COUNTERS, 0)},
+        }
+
+    t0 = ordered[0]["start_s"]
+    rows = [
+        {
+            "name": t["name"],
+            "start_ms": round((t["start_s"] - t0) * 1000, 3),
+            "end_ms": round((t["end_s"] - t0) * 1000, 3),
+            "duration_ms": round((t["end_s"] - t["start_s"]) * 1000, 3),
+            "cpu_ms": round(t.get("cpu_s", 0.0) * 1000, 3),
+            "thread": t.get("thread", ""),
+            **{k: t.get(k, 0) for k in _SPAN_COUNTERS},
+        }
+        for t in ordered
+    ]
+    wall_ms = round((max(t["end_s"] for t in ordered) - t0) * 1000, 3)
+    busy_ms = round(sum(r["duration_ms"] for r in rows), 3)
+    return {
+        "execution_order": [r["name"] for r in rows] + list(_TRAILING_NODES),
+        "timings": rows,
+        "wall_ms": wall_ms,
+        "busy_ms": busy_ms,
+        "totals": {
+            "cpu_ms": round(sum(r["cpu_ms"] for r in rows), 3),
+            **{k: sum(r[k] for r in rows) for k in _SPAN_COUNTERS},
+        },
+    }
+
+
 def build_graph() -> Any:
     g: Any = StateGraph(GraphState)
 
     @timed("data_parser")
-    def node_data_parser(_: GraphState) -> dict[str, Any]:
-        product = parse_product(RAW_PRODUCT_DATA)
+    def node_data_parser(state: GraphState, _: RunnableConfig) -> dict[str, Any]:
+        product = parse_product(state.get("raw_product", RAW_PRODUCT_DATA))
         return {"product": product}  # ✅ partial write only
 
+    # LLM nodes reuse their previous output when their input fingerprint is
+    # unchanged (state["previous_outputs"]), so re-runs only rebuild what changed.
+    # With a checkpointer in the config, each one's partial output is saved as it
+    # completes and replayed when a failed run is resumed under the same run_id.
     @timed("question_generator")
-    def node_question_generator(state: GraphState) -> dict[str, Any]:
-        questions = generate_questions(state["product"])
-        return {"questions": questions}  # ✅ partial write only
+    @checkpointed("question_generator", _inputs("question_generator"))
+    def node_question_generator(state: GraphState, config: RunnableConfig) -> dict[str, Any]:
+        llm = _llm(config)
+
+        def run() -> dict[str, Any]:
+            return {"questions": generate_questions(state["product"], llm=llm)}
+
+        return reuse_or_run("question_generator", state, llm, run)  # ✅ partial write only
 
     @timed("faq_page_builder")
-    def node_faq_builder(state: GraphState) -> dict[str, Any]:
-        faq = build_faq_page_agent(state["product"], state["questions"])
-        return {"faq": faq}  # ✅ partial write only
+    @checkpointed("faq_page_builder", _inputs("faq_page_builder"))
+    def node_faq_builder(state: GraphState, config: RunnableConfig) -> dict[str, Any]:
+        llm = _llm(config)
+
+        def run() -> dict[str, Any]:
+            return {"faq": build_faq_page_agent(state["product"], state["questions"], llm=llm)}
+
+        return reuse_or_run("faq_page_builder", state, llm, run)  # ✅ partial write only
 
     @timed("product_page_builder")
-    def node_product_builder(state: GraphState) -> dict[str, Any]:
-        page = build_product_page_agent(state["product"])
-        return {"product_page": page}  # ✅ partial write only
+    @checkpointed("product_page_builder", _inputs("product_page_builder"))
+    def node_product_builder(state: GraphState, config: RunnableConfig) -> dict[str, Any]:
+        llm = _llm(config)
+
+        def run() -> dict[str, Any]:
+            return {"product_page": build_product_page_agent(state["product"], llm=llm)}
+
+        return reuse_or_run("product_page_builder", state, llm, run)  # ✅ partial write only
 
     @timed("comparison_page_builder")
-    def node_comparison_builder(state: GraphState) -> dict[str, Any]:
-        product_a = state["product"]
-        product_b = build_fictional_product_b_agent(product_a)
-        comp = build_comparison_page_agent(product_a, product_b)
-        return {"fictional_product_b": product_b, "comparison_page": comp}  # ✅ partial write only
-
-    @timed("dag_metadata_writer")
-    def node_metadata(_: GraphState) -> dict[str, Any]:
+    @checkpointed("comparison_page_builder", _inputs("comparison_page_builder"))
+    def node_comparison_builder(state: GraphState, config: RunnableConfig) -> dict[str, Any]:
+        llm = _llm(config)
+
+        def run() -> dict[str, Any]:
+            product_a = state["product"]
+            product_b = build_fictional_product_b_agent(product_a)
+            comp = build_comparison_page_agent(product_a, product_b, llm=llm)
+            return {"fictional_product_b": product_b, "comparison_page": comp}
+
+        return reuse_or_run("comparison_page_builder", state, llm, run)  # ✅ partial write only
+
+    # Async twins of the LLM-bound nodes, used by graph.ainvoke(); they await the
+    # provider's ainvoke_* methods instead of holding a thread per call.
+    @atimed("question_generator")
+    @acheckpointed("question_generator", _inputs("question_generator"))
+    async def anode_question_generator(state: GraphState, config: RunnableConfig) -> dict[str, Any]:
+        llm = _llm(config)
+
+        async def run() -> dict[str, Any]:
+            return {"questions": await agenerate_questions(state["product"], llm=llm)}
+
+        return await areuse_or_run("question_generator", state, llm, run)
+
+    @atimed("faq_page_builder")
+    @acheckpointed("faq_page_builder", _inputs("faq_page_builder"))
+    async def anode_faq_builder(state: GraphState, config: RunnableConfig) -> dict[str, Any]:
+        llm = _llm(config)
+
+        async def run() -> dict[str, Any]:
+            return {"faq": await abuild_faq_page_agent(state["product"], state["questions"], llm=llm)}
+
+        return await areuse_or_run("faq_page_builder", state, llm, run)
+
+    @atimed("product_page_builder")
+    @acheckpointed("product_page_builder", _inputs("product_page_builder"))
+    async def anode_product_builder(state: GraphState, config: RunnableConfig) -> dict[str, Any]:
+        llm = _llm(config)
+
+        async def run() -> dict[str, Any]:
+            return {"product_page": await abuild_product_page_agent(state["product"], llm=llm)}
+
+        return await areuse_or_run("product_page_builder", state, llm, run)
+
+    @atimed("comparison_page_builder")
+    @acheckpointed("comparison_page_builder", _inputs("comparison_page_builder"))
+    async def anode_comparison_builder(state: GraphState, config: RunnableConfig) -> dict[str, Any]:
+        llm = _llm(config)
+
+        async def run() -> dict[str, Any]:
+            product_a = state["product"]
+            product_b = build_fictional_product_b_agent(product_a)
+            comp = await abuild_comparison_page_agent(product_a, product_b, llm=llm)
+            return {"fictional_product_b": product_b, "comparison_page": comp}
+
+        return await areuse_or_run("comparison_page_builder", state, llm, run)
+
+    def node_metadata(state: GraphState, config: RunnableConfig) -> dict[str, Any]:
+        summary = _summarize_timings(state.get("node_timings", []))
+        wall_ms = summary["wall_ms"]
         return {
             "dag_metadata": {
                 "framework": "langgraph",
-                "execution_order": [
-                    "data_parser",
-                    "question_generator",
-                    "faq_page_builder",
-                    "product_page_builder",
-                    "comparison_page_builder",
-                    "dag_metadata_writer",
-                    "output_writer",
-                ],
+                "execution_order": summary["execution_order"],
+                "execution": {
+                    "max_concurrency": config.get("max_concurrency"),
+                    "wall_ms": wall_ms,
+                    "busy_ms": summary["busy_ms"],
+                    # > 1.0 means branches genuinely overlapped
+                    "overlap_factor": round(summary["busy_ms"] / wall_ms, 3) if wall_ms else 1.0,
+                },
+                "timings": summary["timings"],
+                "totals": summary["totals"],
+                # which LLM nodes ran vs. reused the previous run's output
+                "incremental": incremental_summary(state.get("node_cache", {})),
                 "nodes": [
                     {"name": "data_parser", "depends_on": []},
                     {"name": "question_generator", "depends_on": ["data_parser"]},
@@ -99,10 +300,12 @@ def build_graph() -> Any:
         }
 
     g.add_node("data_parser", RunnableLambda(node_data_parser))
-    g.add_node("question_generator", RunnableLambda(node_question_generator))
-    g.add_node("faq_page_builder", RunnableLambda(node_faq_builder))
-    g.add_node("product_page_builder", RunnableLambda(node_product_builder))
-    g.add_node("comparison_page_builder", RunnableLambda(node_comparison_builder))
+    g.add_node("question_generator", RunnableLambda(node_question_generator, afunc=anode_question_generator))
+    g.add_node("faq_page_builder", RunnableLambda(node_faq_builder, afunc=anode_faq_builder))
+    g.add_node("product_page_builder", RunnableLambda(node_product_builder, afunc=anode_product_builder))
+    g.add_node(
+        "comparison_page_builder", RunnableLambda(node_comparison_builder, afunc=anode_comparison_builder)
+    )
     g.add_node("dag_metadata_writer", RunnableLambda(node_metadata))
 
     g.set_entry_point("data_parser")
@@ -112,9 +315,16 @@ def build_graph() -> Any:
     g.add_edge("data_parser", "product_page_builder")
     g.add_edge("data_parser", "comparison_page_builder")
 
-    g.add_edge("faq_page_builder", "dag_metadata_writer")
-    g.add_edge("product_page_builder", "dag_metadata_writer")
-    g.add_edge("comparison_page_builder", "dag_metadata_writer")
+    # Fan-in: wait for all three branches so the metadata writer runs exactly once.
+    g.add_edge(["faq_page_builder", "product_page_builder", "comparison_page_builder"], "dag_metadata_writer")
 
     g.add_edge("dag_metadata_writer", END)
     return g.compile()
+
+
+register_graph(PIPELINE_GRAPH, build_graph)
+
+
+def get_graph() -> Any:
+    """The process-wide compiled content pipeline (built on first use)."""
+    return get_compiled_graph(PIPELINE_GRAPH, build_graph)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import asdict, dataclass
+from typing import Any, Generic, TypeVar
+
+V = TypeVar("V")
+
+
+@dataclass
+class SingleFlightStats:
+    calls: int = 0
+    executions: int = 0
+    deduplicated: int = 0
+    in_flight: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class _Call(Generic[V]):
+    __slots__ = ("done", "error", "result")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: V | None = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight(Generic[V]):
+    """
+    Collapses concurrent calls with the same key into one execution; every
+    caller that arrives while it is running gets the leader's result (or error).
+    Nothing is cached: once the call finishes, the next caller runs again.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call[V]] = {}
+        self._async_calls: dict[tuple[int, Hashable], asyncio.Future[V]] = {}
+        self._stats = SingleFlightStats()
+
+    def do(self, key: Hashable, fn: Callable[[], V]) -> V:
+        with self._lock:
+            self._stats.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+                self._stats.executions += 1
+                self._stats.in_flight += 1
+            else:
+                self._stats.deduplicated += 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:  # noqa: BLE001
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                    self._stats.in_flight -= 1
+                call.done.set()
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.result  # type: ignore[return-value]
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[V]]) -> V:
+        # Futures belong to one loop, so coalescing is per running loop.
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+        with self._lock:
+            self._stats.calls += 1
+            fut = self._async_calls.get(loop_key)
+            if fut is None:
+                # The work runs as its own task, so no single caller owns it.
+                fut = self._async_calls[loop_key] = asyncio.ensure_future(self._arun(loop_key, fn))
+                self._stats.executions += 1
+                self._stats.in_flight += 1
+            else:
+                self._stats.deduplicated += 1
+
+        # shield: a cancelled caller (leader or not) only detaches; the shared
+        # execution keeps running for everyone else still waiting on it
+        return await asyncio.shield(fut)
+
+    async def _arun(self, loop_key: tuple[int, Hashable], fn: Callable[[], Awaitable[V]]) -> V:
+        try:
+            return await fn()
+        finally:
+            with self._lock:
+                del self._async_calls[loop_key]
+                self._stats.in_flight -= 1
+
+    def stats(self) -> SingleFlightStats:
+        with self._lock:
+            return SingleFlightStats(**asdict(self._stats))
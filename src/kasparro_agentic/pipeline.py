@@ -1,13 +1,69 @@
 # src/kasparro_agentic/pipeline.py
 from __future__ import annotations
 
+import asyncio
 from pathlib import Path
 
 from .agents.output_agent import write_outputs
-from .orchestration.langgraph_pipeline import build_graph
+from .core.tracing import chrome_trace_events, trace_path_from_env, write_chrome_trace
+from .llm.provider import LLMProvider
+from .orchestration.checkpoint import NodeCheckpointer, shared_checkpointer
+from .orchestration.incremental import load_node_cache
+from .orchestration.langgraph_pipeline import execution_config, get_graph
 
 
-def run_pipeline(output_dir: Path) -> dict[str, Path]:
-    graph = build_graph()
-    state = graph.invoke({})  # returns dict-like GraphState
-    return write_outputs(output_dir, state)
+def _export_trace(state: dict, trace_path: Path | None) -> None:
+    trace_path = trace_path or trace_path_from_env()
+    spans = state.get("node_timings", [])
+    if trace_path is not None and spans:
+        t0 = min(s["start_s"] for s in spans)
+        write_chrome_trace(trace_path, chrome_trace_events(spans, t0, process_name="content_pipeline"))
+
+
+def run_pipeline(
+    output_dir: Path,
+    max_concurrency: int | None = None,
+    llm: LLMProvider | None = None,
+    trace_path: Path | None = None,
+    checkpointer: NodeCheckpointer | None = None,
+    run_id: str | None = None,
+) -> dict[str, Path]:
+    """
+    `trace_path` (or KASPARRO_TRACE_PATH) also writes a Chrome/Perfetto trace of the node spans.
+    Pages whose inputs are unchanged since the last run into output_dir are reused, not regenerated.
+    `checkpointer` (or KASPARRO_CHECKPOINT_PATH) saves each LLM node's output as it completes; a
+    failed run resumes from there when re-run with the same run_id (default: the output dir).
+    The checkpoint is cleared once the outputs are written.
+    """
+    checkpointer = checkpointer or shared_checkpointer()
+    run_id = run_id or str(output_dir.resolve())
+    graph = get_graph()
+    init = {"previous_outputs": load_node_cache(output_dir)}
+    config = execution_config(max_concurrency, llm, checkpointer, run_id)
+    state = graph.invoke(init, config=config)  # returns dict-like GraphState
+    _export_trace(state, trace_path)
+    paths = write_outputs(output_dir, state)
+    if checkpointer is not None:
+        checkpointer.clear(run_id)
+    return paths
+
+
+async def arun_pipeline(
+    output_dir: Path,
+    max_concurrency: int | None = None,
+    llm: LLMProvider | None = None,
+    trace_path: Path | None = None,
+    checkpointer: NodeCheckpointer | None = None,
+    run_id: str | None = None,
+) -> dict[str, Path]:
+    checkpointer = checkpointer or shared_checkpointer()
+    run_id = run_id or str(output_dir.resolve())
+    graph = get_graph()
+    init = {"previous_outputs": await asyncio.to_thread(load_node_cache, output_dir)}
+    config = await asyncio.to_thread(execution_config, max_concurrency, llm, checkpointer, run_id)
+    state = await graph.ainvoke(init, config=config)
+    _export_trace(state, trace_path)
+    paths = await asyncio.to_thread(write_outputs, output_dir, state)
+    if checkpointer is not None:
+        await asyncio.to_thread(checkpointer.clear, run_id)
+    return paths
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import time
+
+from flask import Blueprint, Flask, Response, g, request
+
+from kasparro_agentic.core.metrics import API_LATENCY, CONTENT_TYPE, render_metrics
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.get("/metrics")
+def metrics() -> Response:
+    return Response(render_metrics(), mimetype=None, content_type=CONTENT_TYPE)
+
+
+def _start_timer() -> None:
+    g.kasparro_request_start = time.perf_counter()
+
+
+def _observe_latency(response: Response) -> Response:
+    start = g.pop("kasparro_request_start", None)
+    # label by route rule, not raw path, so label cardinality stays bounded
+    if start is not None and request.url_rule is not None and request.url_rule.rule != "/metrics":
+        API_LATENCY.labels(request.url_rule.rule, str(response.status_code)).observe(time.perf_counter() - start)
+    return response
+
+
+def instrument_app(app: Flask) -> None:
+    """Adds GET /metrics and records request latency for every routed endpoint."""
+    app.before_request(_start_timer)
+    app.after_request(_observe_latency)
+    app.register_blueprint(metrics_bp)
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable
+from typing import Any
+
+from flask import Response, stream_with_context
+
+
+def sse_event(event: str, data: dict[str, Any]) -> str:
+    """One Server-Sent Events frame: `event:` + a single-line JSON `data:`."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def sse_response(events: Iterable[tuple[str, dict[str, Any]]]) -> Response:
+    """Streams (event, payload) pairs as text/event-stream."""
+    return Response(
+        stream_with_context(sse_event(event, payload) for event, payload in events),
+        mimetype="text/event-stream",
+        # keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
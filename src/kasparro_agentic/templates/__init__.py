@@ -1,3 +1,3 @@
-from .template_engine import Template, TemplateField
+from .base import Template
 
-__all__ = ["Template", "TemplateField"]
+__all__ = ["Template"]
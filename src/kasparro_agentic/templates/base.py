@@ -9,6 +9,16 @@ from pydantic import BaseModel
 
 TOut = TypeVar("TOut", bound=BaseModel)
 
+# Static framing around the context JSON, built once rather than per prompt.
+_PROMPT_HEADER = (
+    "You are an expert content generator.\n"
+    "Use ONLY the provided context. Do not add external facts.\n"
+    "Return ONLY valid JSON that matches the required schema exactly.\n"
+    "\n"
+    "<<<CONTEXT_JSON>>>\n"
+)
+_PROMPT_FOOTER = "\n<<<END_CONTEXT_JSON>>>\n\nJSON ONLY. No markdown. No commentary."
+
 
 class Template(ABC, Generic[TOut]):
     """
@@ -30,16 +40,4 @@ class Template(ABC, Generic[TOut]):
     def build_prompt(self, context: dict[str, object]) -> str:
         # Standardized context framing so the mock provider can deterministically parse inputs
         context_json = json.dumps(context, ensure_ascii=False, indent=2)
-        return "\n".join(
-            [
-                "You are an expert content generator.",
-                "Use ONLY the provided context. Do not add external facts.",
-                "Return ONLY valid JSON that matches the required schema exactly.",
-                "",
-                "<<<CONTEXT_JSON>>>",
-                context_json,
-                "<<<END_CONTEXT_JSON>>>",
-                "",
-                "JSON ONLY. No markdown. No commentary.",
-            ]
-        )
+        return _PROMPT_HEADER + context_json + _PROMPT_FOOTER
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+import os
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Any, NamedTuple
+
+from kasparro_agentic.logic_blocks.comparison import build_fictional_product_b
+from kasparro_agentic.models import Product
+from kasparro_agentic.templates.pages import (
+    QuestionTemplate,
+    render_comparison_page,
+    render_faq_page,
+    render_product_page,
+)
+
+DEFAULT_CHUNKSIZE = 64
+
+# Products cross the process boundary as bare field-value tuples in this
+# order: no pydantic state to pickle and nothing to re-validate on arrival.
+_FIELDS = tuple(Product.model_fields)
+
+CompactProduct = tuple[Any, ...]
+
+
+class RenderedPages(NamedTuple):
+    # page dicts, or their JSON text when rendered with as_json=True
+    product_name: str
+    faq: Any
+    product_page: Any
+    comparison_page: Any
+
+
+def _compact(product: Product) -> CompactProduct:
+    return tuple(getattr(product, f) for f in _FIELDS)
+
+
+def _expand(row: CompactProduct) -> Product:
+    # already validated in the parent
+    return Product.model_construct(**dict(zip(_FIELDS, row, strict=True)))
+
+
+def _dump_json(page: dict[str, Any]) -> str:
+    # byte-identical to the page files written by agents/output_agent.py
+    return json.dumps(page, indent=2, ensure_ascii=False)
+
+
+def render_pages(product: Product, as_json: bool = False) -> RenderedPages:
+    """The deterministic FAQ, product and comparison pages for one product."""
+    questions = QuestionTemplate().render(product)
+    pages = (
+        render_faq_page(product, questions).model_dump(),
+        render_product_page(product).model_dump(),
+        render_comparison_page(product, build_fictional_product_b(product)).model_dump(),
+    )
+    if as_json:
+        return RenderedPages(product.product_name, *map(_dump_json, pages))
+    return RenderedPages(product.product_name, *pages)
+
+
+def _render_chunk(rows: list[CompactProduct], as_json: bool) -> list[RenderedPages]:
+    return [render_pages(_expand(row), as_json) for row in rows]
+
+
+def _workers_from_env() -> int:
+    raw = os.getenv("KASPARRO_RENDER_WORKERS", "").strip()
+    return int(raw) if raw else os.cpu_count() or 1
+
+
+def iter_rendered_pages(
+    products: Iterable[Product],
+    workers: int | None = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    as_json: bool = False,
+) -> Iterator[RenderedPages]:
+    """
+    Renders pages for every product across a process pool, yielding results in
+    input order as they complete.
+
+    Products are sent in chunks of `chunksize` so per-task IPC is amortised,
+    and at most 2 * workers chunks are in flight, so a catalog of any size is
+    streamed with bounded memory. workers=1 renders in this process.
+
+    Unpickling page dicts is the one step that stays serial in this process;
+    as_json=True ships each page as its finished JSON text instead, which is
+    several times cheaper to receive and is what a file or shard writer needs.
+
+    Env config:
+      - KASPARRO_RENDER_WORKERS: pool size when `workers` is None (default os.cpu_count())
+    """
+    workers = max(1, workers if workers is not None else _workers_from_env())
+    chunksize = max(1, chunksize)
+    if workers == 1:
+        for product in products:
+            yield render_pages(product, as_json)
+        return
+
+    rows = (_compact(p) for p in products)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight: deque[Future[list[RenderedPages]]] = deque()
+        try:
+            while True:
+                while len(in_flight) < 2 * workers:
+                    chunk = list(islice(rows, chunksize))
+                    if not chunk:
+                        break
+                    in_flight.append(pool.submit(_render_chunk, chunk, as_json))
+                if not in_flight:
+                    return
+                yield from in_flight.popleft().result()
+        finally:
+            # consumer stopped early or a chunk failed: drop work not yet started
+            for fut in in_flight:
+                fut.cancel()
+
+
+def render_catalog(
+    products: Iterable[Product],
+    workers: int | None = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    as_json: bool = False,
+) -> list[RenderedPages]:
+    return list(iter_rendered_pages(products, workers=workers, chunksize=chunksize, as_json=as_json))
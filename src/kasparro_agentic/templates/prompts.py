@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from kasparro_agentic.models import Product, Question
+
+_SLOT = re.compile(r"\$\{(\w+)\}")
+
+
+class PromptTemplate:
+    """
+    A prompt compiled once into static segments and named `${slot}`s. Rendering
+    is one C-level %-substitution into the precompiled static text.
+
+    `prefix` is the text before the first slot. It is byte-identical for every
+    call, and backends with prefix caching (TGI/vLLM) reuse it. `version` hashes
+    the static text, so any wording change shows up in output fingerprints.
+    """
+
+    def __init__(self, name: str, source: str) -> None:
+        pieces = _SLOT.split(source.strip())
+        self.name = name
+        self.statics: tuple[str, ...] = tuple(pieces[0::2])
+        self.slots: tuple[str, ...] = tuple(pieces[1::2])
+        self.prefix = self.statics[0]
+        self.version = hashlib.sha256("\x00".join(pieces).encode("utf-8")).hexdigest()[:12]
+        self._format = "%s".join(static.replace("%", "%%") for static in self.statics)
+
+    def render(self, *segments: str) -> str:
+        """Fills the slots in order (see `slots`)."""
+        # the legacy f-string prompts were .strip()ped, which could trim a trailing field value
+        return (self._format % segments).rstrip()
+
+
+# ----------------------------
+# Product context blocks
+# ----------------------------
+def _catalog_block(p: Product) -> str:
+    return (
+        f"- product_name: {p.product_name}\n"
+        f"- brand: {p.brand}\n"
+        f"- category: {p.category}\n"
+        f"- price_inr: {p.price_inr}\n"
+        f"- key_ingredients: {list(p.key_ingredients)}\n"
+        f"- benefits: {list(p.benefits)}\n"
+        f"- skin_type: {list(p.skin_type)}\n"
+        f"- concentration: {p.concentration}\n"
+        f"- how_to_use: {p.how_to_use}\n"
+        f"- side_effects: {p.side_effects}"
+    )
+
+
+def _questions_block(p: Product) -> str:
+    return (
+        f"- product_name: {p.product_name}\n"
+        f"- brand: {p.brand}\n"
+        f"- category: {p.category}\n"
+        f"- benefits: {p.benefits}\n"
+        f"- how_to_use: {p.how_to_use}"
+    )
+
+
+def _answer_block(p: Product) -> str:
+    return (
+        f"- Name: {p.product_name}\n"
+        f"- Brand: {p.brand}\n"
+        f"- Key Ingredients: {p.key_ingredients}\n"
+        f"- How to use: {p.how_to_use}\n"
+        f"- Side effects: {p.side_effects}"
+    )
+
+
+def _comparison_block(p: Product) -> str:
+    return (
+        f"- product_name: {p.product_name}\n"
+        f"- brand: {p.brand}\n"
+        f"- price_inr: {p.price_inr}\n"
+        f"- key_ingredients: {list(p.key_ingredients)}\n"
+        f"- benefits: {list(p.benefits)}\n"
+        f"- skin_type: {list(p.skin_type)}"
+    )
+
+
+_BLOCKS: dict[str, Callable[[Product], str]] = {
+    "catalog": _catalog_block,
+    "questions": _questions_block,
+    "answer": _answer_block,
+    "comparison": _comparison_block,
+}
+
+_BLOCK_CACHE: dict[tuple[Any, ...], str] = {}
+_BLOCK_CACHE_MAX = 4096
+
+
+def _store(key: tuple[Any, ...], block: str) -> str:
+    if len(_BLOCK_CACHE) >= _BLOCK_CACHE_MAX:
+        _BLOCK_CACHE.clear()
+    _BLOCK_CACHE[key] = block
+    return block
+
+
+def product_block(kind: str, product: Product) -> str:
+    """The rendered `kind` context block for `product`, cached by its field values."""
+    # blocks depend only on field values, so Product and FictionalProduct share entries
+    key = (kind, *product.__dict__.values())
+    try:
+        return _BLOCK_CACHE[key]
+    except KeyError:
+        return _store(key, _BLOCKS[kind](product))
+    except TypeError:  # unhashable field value, e.g. a list set via model_construct
+        return _BLOCKS[kind](product)
+
+
+def questions_block(questions: Sequence[Question]) -> str:
+    key = ("questions_list", *[tuple(q.__dict__.values()) for q in questions])
+    try:
+        return _BLOCK_CACHE[key]
+    except KeyError:
+        return _store(key, str([q.model_dump() for q in questions]))
+
+
+def clear_prompt_cache() -> None:
+    _BLOCK_CACHE.clear()
+
+
+# ----------------------------
+# Compiled prompts
+# ----------------------------
+QUESTIONS_PROMPT = PromptTemplate(
+    "questions",
+    """
+Generate at least 15 product FAQ questions with categories.
+Return JSON matching this schema:
+
+{
+  "questions": [
+    {"category": "Benefits", "question": "..."},
+    ...
+  ]
+}
+
+Product context:
+${product}
+""",
+)
+
+ANSWER_PROMPT = PromptTemplate(
+    "answer",
+    """
+You are an expert product assistant.
+Write a clear, helpful, safe, non-medical answer to the question below,
+based on the provided product context.
+
+Question: ${question}
+
+Product Context:
+${product}
+
+Constraints:
+- Be practical and consumer-friendly.
+- Mention patch test and irritation guidance.
+- Avoid medical claims.
+""",
+)
+
+FAQ_PROMPT = PromptTemplate(
+    "faq",
+    """
+You are generating a FAQPage JSON using ONLY the given dataset fields.
+Do NOT invent new facts.
+
+Product:
+${product}
+
+Questions:
+${questions}
+
+Return JSON matching the FAQPage schema.
+""",
+)
+
+PRODUCT_PAGE_PROMPT = PromptTemplate(
+    "product_page",
+    """
+You are generating a structured product page JSON using ONLY the given dataset fields.
+Do NOT invent new facts.
+
+Product:
+${product}
+
+Return JSON matching the ProductPage schema.
+""",
+)
+
+COMPARISON_PROMPT = PromptTemplate(
+    "comparison",
+    """
+You are generating a comparison page as strict JSON matching the provided schema.
+
+RULES:
+- Product B is fictional, but must still be coherent.
+- Use only provided product fields for A and B.
+- No external claims.
+- Similarities and differences must reference ingredient/benefit/skin_type/price.
+
+PRODUCT A:
+${product_a}
+
+PRODUCT B (fictional):
+${product_b}
+""",
+)
+
+PROMPTS: dict[str, PromptTemplate] = {
+    t.name: t for t in (QUESTIONS_PROMPT, ANSWER_PROMPT, FAQ_PROMPT, PRODUCT_PAGE_PROMPT, COMPARISON_PROMPT)
+}
+
+# Changes whenever any prompt's static text does.
+PROMPTS_VERSION = hashlib.sha256("".join(t.version for t in PROMPTS.values()).encode("utf-8")).hexdigest()[:12]
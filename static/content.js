@@ -105,6 +105,52 @@ async function generateViaBackend(productName) {
   };
 }
 
+// Streaming backend: questions render first, then the answer token by token.
+async function generateViaBackendStream(productName) {
+  const r = await fetch("/api/generate/stream", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ productName }),
+  });
+  if (!r.ok || !r.body) throw new Error("Streaming backend unavailable");
+
+  const reader = r.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let answer = "";
+
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let sep;
+    while ((sep = buffer.indexOf("\n\n")) !== -1) {
+      const frame = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+
+      let event = "message";
+      let data = "";
+      frame.split("\n").forEach((line) => {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data += line.slice(5).trim();
+      });
+      const payload = data ? JSON.parse(data) : {};
+
+      if (event === "questions") {
+        setQuestionsList(payload.questions);
+      } else if (event === "token") {
+        answer += payload.text || "";
+        setAnswer(answer);
+      } else if (event === "done") {
+        setAnswer(payload.answer || answer);
+      } else if (event === "error") {
+        throw new Error(payload.error || "Backend failed");
+      }
+    }
+  }
+}
+
 async function onGenerate() {
   setError("");
   setQuestionsList([]);
@@ -131,11 +177,16 @@ async function onGenerate() {
   } catch (e) {
     console.error(e);
 
-    // Fallback path: backend (LangGraph mock/HF)
+    // Fallback path: backend (LangGraph mock/HF), streamed when available
     try {
-      const out = await generateViaBackend(productName);
-      setQuestionsList(out.questions);
-      setAnswer(out.answer);
+      try {
+        await generateViaBackendStream(productName);
+      } catch (streamErr) {
+        console.warn(streamErr);
+        const out = await generateViaBackend(productName);
+        setQuestionsList(out.questions);
+        setAnswer(out.answer);
+      }
       setError("Puter failed; used backend fallback.");
     } catch (e2) {
       console.error(e2);
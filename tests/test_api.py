@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import json
+
+from app import app
+from kasparro_agentic.pipeline import run_pipeline
+
+
+def _events(body: str) -> list[tuple[str, dict]]:
+    out = []
+    for frame in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.split("\n"))
+        out.append((lines["event"], json.loads(lines["data"])))
+    return out
+
+
+def test_generate_stream_sends_questions_then_tokens() -> None:
+    client = app.test_client()
+    resp = client.post("/api/generate/stream", json={"productName": "Mama Earth Vitamin C Serum"})
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/event-stream"
+
+    events = _events(resp.get_data(as_text=True))
+    names = [name for name, _ in events]
+    assert names[0] == "questions"
+    assert names[-1] == "done"
+    assert names.count("token") > 1
+    assert events[0][1]["questions"]
+
+    streamed = "".join(data["text"] for name, data in events if name == "token")
+    plain = client.post("/api/generate", json={"productName": "Mama Earth Vitamin C Serum"}).get_json()
+    assert events[-1][1]["answer"] == streamed.strip() == plain["answer"]
+
+
+def test_generate_stream_requires_product_name() -> None:
+    resp = app.test_client().post("/api/generate/stream", json={})
+    assert resp.status_code == 400
+
+
+def test_metrics_endpoint_reports_api_node_and_llm_metrics(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    client = app.test_client()
+    client.post("/api/generate", json={"productName": "Metrics Serum"})
+    run_pipeline(tmp_path)
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.content_type.startswith("text/plain; version=0.0.4")
+    text = resp.get_data(as_text=True)
+    assert 'kasparro_api_request_seconds_count{endpoint="/api/generate",status="200"}' in text
+    assert 'kasparro_node_seconds_count{node="faq_page_builder"}' in text
+    assert 'kasparro_llm_call_seconds_count{provider="mockllmprovider",outcome="ok"}' in text
+    assert "# TYPE kasparro_llm_fallback_to_mock_total counter" in text
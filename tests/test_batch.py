@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from kasparro_agentic.agents.shard_sink import INDEX_FILE, ShardReader
+from kasparro_agentic.batch import CHECKPOINT_FILE, percentiles, product_key, run_batch
+
+
+def _dataset(tmp_path: Path, names: list[str]) -> Path:
+    path = tmp_path / "products.json"
+    rows = [{"product_name": n, "brand": "Acme", "category": "Skincare", "price_inr": 100 + i} for i, n in enumerate(names)]
+    path.write_text(json.dumps({"products": rows}), encoding="utf-8")
+    return path
+
+
+def test_batch_writes_one_directory_per_product(tmp_path: Path) -> None:
+    dataset = _dataset(tmp_path, ["Serum A", "Serum B", "Serum A"])
+    out = tmp_path / "out"
+
+    report = run_batch(dataset, out, workers=2, trace_path=tmp_path / "trace.json")
+
+    assert report.completed == 3
+    assert sorted(p.name for p in out.iterdir() if p.is_dir()) == ["serum-a", "serum-a-2", "serum-b"]
+    assert "Serum B by Acme" in json.loads((out / "serum-b" / "product_page.json").read_text())["summary"]
+    assert "question_generator" in report.as_dict()["stage_latency_ms"]
+
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    assert {e["args"]["name"] for e in events if e["name"] == "process_name"} == {"serum-a", "serum-a-2", "serum-b"}
+    assert sum(e["ph"] == "X" for e in events) == 3 * 5
+
+
+def test_batch_resumes_from_checkpoint(tmp_path: Path) -> None:
+    dataset = _dataset(tmp_path, ["Serum A", "Serum B"])
+    out = tmp_path / "out"
+    out.mkdir()
+    (out / CHECKPOINT_FILE).write_text("serum-a\n", encoding="utf-8")
+
+    report = run_batch(dataset, out, workers=2)
+
+    assert (report.completed, report.skipped) == (1, 1)
+    assert not (out / "serum-a").exists()
+    assert (out / CHECKPOINT_FILE).read_text().split() == ["serum-a", "serum-b"]
+
+
+def test_helpers() -> None:
+    assert product_key("GlowBoost Vitamin C Serum (30ml)") == "glowboost-vitamin-c-serum-30ml"
+    assert percentiles([float(i) for i in range(1, 101)])["p90"] == 90.0
+
+
+def test_rerun_regenerates_only_nodes_whose_inputs_changed(tmp_path: Path) -> None:
+    out = tmp_path / "out"
+    first = run_batch(_dataset(tmp_path, ["Serum A", "Serum B"]), out, workers=2)
+    assert first.as_dict()["incremental"]["regenerated"]["question_generator"] == 2
+    assert first.changed == {}
+
+    # same catalog, Serum B repriced
+    path = tmp_path / "products.json"
+    rows = json.loads(path.read_text())["products"]
+    rows[1]["price_inr"] = 999
+    path.write_text(json.dumps({"products": rows}), encoding="utf-8")
+
+    report = run_batch(path, out, workers=2, resume=False)
+
+    assert report.completed == 2
+    assert report.changed == {"serum-b": ["comparison_page_builder", "faq_page_builder", "product_page_builder"]}
+    assert report.reused["question_generator"] == 2
+    meta = json.loads((out / "serum-b" / "dag_metadata.json").read_text())
+    assert meta["incremental"]["reused"] == ["question_generator"]
+
+
+@pytest.mark.parametrize("compression", ["none", "gzip"])
+def test_jsonl_format_writes_indexed_shards(tmp_path: Path, compression: str) -> None:
+    dataset = _dataset(tmp_path, ["Serum A", "Serum B", "Serum C"])
+    out = tmp_path / "out"
+
+    report = run_batch(dataset, out, workers=2, output_format="jsonl", compression=compression)
+
+    assert report.completed == 3
+    assert not [p for p in out.iterdir() if p.is_dir()]  # no per-product directories
+    assert len((out / INDEX_FILE).read_text().splitlines()) == 3
+    record = ShardReader(out).get("serum-b")
+    assert record is not None
+    assert record["key"] == "serum-b"
+    assert "Serum B by Acme" in record["product_page"]["summary"]
+    assert "question_generator" in record["node_cache"]
+
+    # re-runs append new shards and still reuse the stored node outputs
+    rerun = run_batch(dataset, out, workers=2, resume=False, output_format="jsonl", compression=compression)
+    assert rerun.as_dict()["incremental"]["regenerated"] == {}
+    assert len(ShardReader(out)) == 3
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+from pydantic import ValidationError
+
+from kasparro_agentic.llm.json_extract import (
+    extract_json_object,
+    iter_json_candidates,
+    parse_json_model,
+)
+from kasparro_agentic.models import Question, QuestionList
+
+
+def test_first_balanced_object_ignores_trailing_prose_and_braces_in_strings() -> None:
+    text = 'Sure! {"a": "x}y{\\"", "b": [1, {"c": 2}]} then {"second": true} and a stray }'
+    assert extract_json_object(text) == {"a": 'x}y{"', "b": [1, {"c": 2}]}
+    assert list(iter_json_candidates(text)) == ['{"a": "x}y{\\"", "b": [1, {"c": 2}]}', '{"second": true}']
+
+
+def test_skips_non_json_brace_groups_and_prefers_fences() -> None:
+    assert extract_json_object('Use the {placeholder} format: {"a": 1}') == {"a": 1}
+    fenced = 'Example: {"a": 0}\n```json\n{"a": 1}\n```'
+    assert extract_json_object(fenced) == {"a": 1}
+
+
+def _best_time(text: str) -> float:
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        with pytest.raises(ValueError):
+            extract_json_object(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def test_scan_is_linear_in_non_json_brace_groups() -> None:
+    # every group fails to decode; 8x the text must cost ~8x, not ~64x
+    small, large = _best_time('{"x" y} ' * 3_000), _best_time('{"x" y} ' * 24_000)
+    assert large < small * 20
+
+
+def test_deeply_nested_junk_is_not_an_object() -> None:
+    with pytest.raises(ValueError, match="No JSON object"):
+        extract_json_object('{"a": ' * 20_000)
+    assert extract_json_object("[" * 20_000 + ' {"a": 1}') == {"a": 1}
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ('{"a": 1, "b": "cut of', {"a": 1, "b": "cut of"}),
+        ('{"a": 1, "b": [1, 2', {"a": 1, "b": [1, 2]}),
+        ('{"a": 1, "b": tr', {"a": 1}),
+        ('{"a": {"b": 1}, "c":', {"a": {"b": 1}}),
+        ('{"a": 1, "b', {"a": 1}),
+    ],
+)
+def test_repairs_truncated_output(text: str, expected: dict) -> None:
+    assert extract_json_object(text) == expected
+
+
+def test_parse_json_model_validates_first_matching_candidate() -> None:
+    q = '{"category": "Usage", "question": "How?"}'
+    raw = f'Here you go: {{"note": "x"}} {{"questions": [{q}, {q}, {q}'
+    parsed = parse_json_model(raw, QuestionList)
+    assert parsed.questions == [Question(category="Usage", question="How?")] * 3
+
+    with pytest.raises(ValidationError):
+        parse_json_model('{"note": "x"}', QuestionList)
+    with pytest.raises(ValueError, match="No JSON object"):
+        parse_json_model("no json here", QuestionList)
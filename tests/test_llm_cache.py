@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from kasparro_agentic.llm.cache import (
+    CachingLLMProvider,
+    MemoryCacheTier,
+    ResponseCache,
+    SQLiteCacheTier,
+)
+from kasparro_agentic.llm.provider import MockLLMProvider
+from kasparro_agentic.models import ProductPage, QuestionList
+
+
+class CountingProvider(MockLLMProvider):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def invoke_text(self, prompt: str) -> str:
+        self.calls += 1
+        return super().invoke_text(prompt)
+
+    def invoke_structured(self, prompt, schema):  # type: ignore[no-untyped-def]
+        self.calls += 1
+        return super().invoke_structured(prompt, schema)
+
+
+def test_repeated_prompt_is_served_from_memory() -> None:
+    inner = CountingProvider()
+    llm = CachingLLMProvider(inner, ResponseCache())
+    prompt = "- product_name: GlowBoost Vitamin C Serum"
+
+    first = llm.invoke_structured(prompt, QuestionList)
+    second = llm.invoke_structured(prompt, QuestionList)
+
+    assert inner.calls == 1
+    assert first == second
+    assert first is not second
+    stats = llm.cache.stats()
+    assert (stats.hits, stats.misses) == (1, 1)
+
+
+def test_schema_is_part_of_the_key() -> None:
+    inner = CountingProvider()
+    llm = CachingLLMProvider(inner, ResponseCache())
+
+    llm.invoke_structured("same prompt", QuestionList)
+    llm.invoke_structured("same prompt", ProductPage)
+    llm.invoke_text("same prompt")
+
+    assert inner.calls == 3
+
+
+def test_memory_tier_ttl_and_lru_eviction() -> None:
+    now = [0.0]
+    tier = MemoryCacheTier(max_entries=2, ttl_s=10, clock=lambda: now[0])
+    tier.set("a", "1")
+    tier.set("b", "2")
+    tier.get("a")
+    tier.set("c", "3")
+
+    assert tier.get("b") is None
+    assert tier.get("a") == "1"
+    assert tier.evictions == 1
+
+    now[0] = 11.0
+    assert tier.get("a") is None
+    assert tier.expirations == 1
+
+
+def test_disk_tier_survives_new_process_cache(tmp_path: Path) -> None:
+    db = tmp_path / "llm_cache.sqlite"
+    inner = CountingProvider()
+
+    first = CachingLLMProvider(inner, ResponseCache(disk=SQLiteCacheTier(db)))
+    first.invoke_text("- product_name: X")
+
+    second = CachingLLMProvider(inner, ResponseCache(disk=SQLiteCacheTier(db)))
+    second.invoke_text("- product_name: X")
+
+    assert inner.calls == 1
+    assert second.cache.stats().disk_hits == 1
+
+
+def test_disk_tier_is_size_bounded(tmp_path: Path) -> None:
+    tier = SQLiteCacheTier(tmp_path / "c.sqlite", max_entries=3)
+    for i in range(5):
+        tier.set(f"k{i}", str(i))
+
+    assert tier.evictions == 2
+    assert tier.get("k0") is None
+    assert tier.get("k4") == "4"
@@ -0,0 +1,421 @@
+from __future__ import annotations
+
+import asyncio
+import gc
+import json
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import pytest
+
+from kasparro_agentic.core.errors import LLMError
+from kasparro_agentic.llm.batching import MicroBatchingLLMProvider
+from kasparro_agentic.llm.cache import CachingLLMProvider, ResponseCache
+from kasparro_agentic.llm.provider import (
+    HuggingFaceProvider,
+    LatencyMockLLMProvider,
+    LLMProvider,
+    MockLLMProvider,
+    build_llm_provider,
+    is_fallback,
+)
+from kasparro_agentic.llm.rate_limit import (
+    AdaptiveConcurrencyLimiter,
+    TokenBucket,
+    parse_retry_after,
+)
+from kasparro_agentic.llm.registry import (
+    ProviderRegistry,
+    describe_provider,
+    get_llm_provider,
+    reload_llm_provider,
+)
+from kasparro_agentic.llm.resilience import CircuitBreaker, CircuitOpenError
+from kasparro_agentic.models import FAQPage, QuestionList
+from kasparro_agentic.orchestration.langgraph_pipeline import build_graph, execution_config
+
+
+class FakeInference:
+    """Minimal stand-in for the HF inference endpoint (HTTP/1.1 keep-alive)."""
+
+    def __init__(self) -> None:
+        self.requests: list[dict[str, Any]] = []
+        self.responses: list[tuple[int, dict[str, str], Any]] = []
+        self.lock = threading.Lock()
+
+    def next_response(self, body: dict[str, Any]) -> tuple[int, dict[str, str], Any]:
+        with self.lock:
+            if self.responses:
+                return self.responses.pop(0)
+        if isinstance(body["inputs"], list):
+            return 200, {}, [[{"generated_text": f"ok:{p}"}] for p in body["inputs"]]
+        return 200, {}, [{"generated_text": "ok"}]
+
+
+@pytest.fixture
+def fake_hf(monkeypatch: pytest.MonkeyPatch) -> Iterator[FakeInference]:
+    fake = FakeInference()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self) -> None:
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            with fake.lock:
+                fake.requests.append(body)
+            status, headers, payload = fake.next_response(body)
+            data = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            for k, v in {"Content-Type": "application/json", **headers}.items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setenv("HF_API_TOKEN", "test-token")
+    monkeypatch.setenv("KASPARRO_HF_BASE_URL", f"http://127.0.0.1:{server.server_port}/models")
+    yield fake
+    server.shutdown()
+    server.server_close()
+
+
+def test_hf_provider_reuses_pooled_connections(fake_hf: FakeInference, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("KASPARRO_HF_POOL_SIZE", "2")
+    first, second = HuggingFaceProvider(), HuggingFaceProvider()
+    assert first.session is second.session
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        outputs = list(pool.map(lambda i: (first if i % 2 else second).invoke_text(f"p{i}"), range(24)))
+
+    assert outputs == ["ok"] * 24
+    (stats,) = [v for k, v in first.pool_stats().items() if k.startswith("http://127.0.0.1")]
+    assert stats["requests"] == 24
+    assert stats["connections_opened"] <= 2
+
+
+def test_registry_shares_one_instance_and_rebuilds_on_config_change(monkeypatch: pytest.MonkeyPatch) -> None:
+    registry = ProviderRegistry()
+    first = registry.get()
+    assert registry.get() is first
+
+    monkeypatch.setenv("KASPARRO_LLM_CACHE", "1")
+    rebuilt = registry.get()
+    assert rebuilt is not first
+    assert describe_provider(rebuilt) == "mockllmprovider"
+
+    pinned = MockLLMProvider()
+    registry.configure(pinned)
+    monkeypatch.setenv("KASPARRO_LLM_CACHE", "0")
+    assert registry.get() is pinned
+
+    registry.reload()
+    assert registry.get() is not pinned
+
+
+def test_registry_keeps_replaced_providers_usable_until_released(monkeypatch: pytest.MonkeyPatch) -> None:
+    registry = ProviderRegistry(factory=lambda: MicroBatchingLLMProvider(MockLLMProvider()))
+    first = registry.get()
+    monkeypatch.setenv("KASPARRO_OUTPUT_WORKERS", "4")  # not a provider setting
+    assert registry.get() is first
+
+    monkeypatch.setenv("KASPARRO_LLM_MODE", "mock-latency")
+    assert registry.get() is not first
+    # a caller still holding the old instance (mid-request) keeps working
+    assert first.invoke_structured("Product Data (JSON): {}", QuestionList).questions
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert all(pool.map(first.invoke_text, ["p"] * 8))
+
+    batcher = first.batcher  # type: ignore[attr-defined]
+    del first
+    gc.collect()
+    with pytest.raises(RuntimeError, match="closed"):
+        batcher.submit("text", "p")
+
+
+def _hf_inner(llm: LLMProvider) -> HuggingFaceProvider:
+    while not isinstance(llm, HuggingFaceProvider):
+        llm = llm.inner  # type: ignore[attr-defined]
+    return llm
+
+
+def test_reload_applies_changed_limiter_and_breaker_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("KASPARRO_LLM_MODE", "hf")
+    monkeypatch.setenv("HF_API_TOKEN", "test-token")
+    monkeypatch.setenv("KASPARRO_HF_RPS", "5")
+    monkeypatch.setenv("KASPARRO_HF_BREAKER_THRESHOLD", "5")
+    reload_llm_provider()
+    before = _hf_inner(get_llm_provider())
+
+    monkeypatch.setenv("KASPARRO_HF_RPS", "2")
+    monkeypatch.setenv("KASPARRO_HF_BREAKER_THRESHOLD", "2")
+    reload_llm_provider()
+    after = _hf_inner(get_llm_provider())
+    assert after.limiter is not before.limiter
+    assert after.limiter.requests is not None and after.limiter.requests.rate_per_s == 2
+    assert after.breaker.failure_threshold == 2
+
+    # unchanged settings keep the same (stateful) limiter and breaker
+    reload_llm_provider()
+    again = _hf_inner(get_llm_provider())
+    assert again.limiter is after.limiter
+    assert again.breaker is after.breaker
+    reload_llm_provider()
+
+
+def test_graph_nodes_receive_injected_provider() -> None:
+    calls: list[str] = []
+
+    class Recording(MockLLMProvider):
+        def invoke_structured(self, prompt, schema):  # type: ignore[no-untyped-def]
+            calls.append(schema.__name__)
+            return super().invoke_structured(prompt, schema)
+
+    build_graph().invoke({}, config=execution_config(llm=Recording()))
+    assert sorted(calls) == ["ComparisonPage", "FAQPage", "ProductPage", "QuestionList"]
+
+
+def test_hf_provider_async_path(fake_hf: FakeInference) -> None:
+    reply = (200, {}, [{"generated_text": 'Sure: {"questions": []} done'}])
+    fake_hf.responses += [reply, reply]
+    llm = HuggingFaceProvider()
+
+    async def go() -> tuple[str, list]:
+        text = await llm.ainvoke_text("hello")
+        out = await llm.ainvoke_structured("hello", QuestionList)
+        return text, out.questions
+
+    text, questions = asyncio.run(go())
+    assert text == 'Sure: {"questions": []} done'
+    assert questions == []
+    assert fake_hf.requests[0]["inputs"] == "hello"
+
+
+def test_token_bucket_and_aimd_limits() -> None:
+    now = [0.0]
+    bucket = TokenBucket(rate_per_s=2.0, capacity=2.0, clock=lambda: now[0])
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.5]
+    now[0] = 1.5
+    assert bucket.reserve() == 0.0
+
+    aimd = AdaptiveConcurrencyLimiter(initial=4, maximum=8, latency_target_s=1.0)
+    for _ in range(8):
+        assert aimd.try_acquire()
+        aimd.release(0.1, overloaded=False)
+    assert 5 <= aimd.limit <= 6
+    aimd.acquire()
+    aimd.release(0.1, overloaded=True)
+    assert aimd.limit < 3
+    assert parse_retry_after("2") == 2.0
+
+
+def test_hf_provider_honours_retry_after(fake_hf: FakeInference) -> None:
+    fake_hf.responses.append((429, {"Retry-After": "0.3"}, {"error": "rate limited"}))
+    llm = HuggingFaceProvider()
+    limit_before = llm.limiter.concurrency.limit
+
+    started = time.monotonic()
+    assert llm.invoke_text("first") == "ok"
+    assert time.monotonic() - started >= 0.25
+    assert len(fake_hf.requests) == 2
+    assert llm.limiter.concurrency.limit < limit_before
+    assert llm.limiter.stats()["retry_after_pauses"] == 1
+
+
+def test_hf_provider_retries_transient_errors_only(fake_hf: FakeInference, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("KASPARRO_HF_BACKOFF_BASE_S", "0.01")
+    fake_hf.responses += [(502, {}, {"error": "bad gateway"}), (503, {}, {"error": "loading"})]
+    llm = HuggingFaceProvider()
+    assert llm.invoke_text("p") == "ok"
+    assert len(fake_hf.requests) == 3
+
+    fake_hf.responses.append((400, {}, {"error": "bad input"}))
+    with pytest.raises(LLMError):
+        llm.invoke_text("p")
+    assert len(fake_hf.requests) == 4
+
+
+def test_circuit_breaker_fails_fast_and_falls_back(fake_hf: FakeInference, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("KASPARRO_HF_BACKOFF_BASE_S", "0.01")
+    monkeypatch.setenv("KASPARRO_HF_BREAKER_THRESHOLD", "3")
+    fake_hf.responses += [(503, {}, {"error": "down"})] * 3
+    llm = HuggingFaceProvider()
+
+    # retries exhausted -> breaker open -> mock answer instead of a failed graph
+    out = llm.invoke_structured("p", QuestionList)
+    assert out.questions
+    assert llm.breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        llm.invoke_text("p")
+    assert len(fake_hf.requests) == 3
+
+    monkeypatch.setenv("KASPARRO_LLM_STRICT", "1")
+    with pytest.raises(CircuitOpenError):
+        llm.invoke_structured("p", QuestionList)
+
+
+def test_fallback_results_are_not_cached(fake_hf: FakeInference, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("KASPARRO_HF_BACKOFF_BASE_S", "0.01")
+    fake_hf.responses += [(503, {}, {"error": "down"})] * 3  # unavailable, then unparseable "ok"
+    cache = ResponseCache()
+    llm = CachingLLMProvider(HuggingFaceProvider(), cache)
+
+    first = llm.invoke_structured("p", QuestionList)
+    second = llm.invoke_structured("p", QuestionList)
+    assert is_fallback(first) and is_fallback(second)
+    assert cache.stats().writes == 0
+    assert len(fake_hf.requests) == 4  # the second call went back to the backend
+    assert llm.invoke_structured_batch(["a", "b"], QuestionList)[0].questions
+    assert cache.stats().writes == 0
+    assert not is_fallback(MockLLMProvider().invoke_structured("p", QuestionList))
+
+
+def test_circuit_breaker_half_open_probe() -> None:
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_s=10, clock=lambda: now[0])
+    breaker.record_failure()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    now[0] = 10.0
+    assert breaker.allow()
+    assert not breaker.allow()  # only one probe at a time
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    now[0] = 20.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_hf_batch_sends_list_inputs(fake_hf: FakeInference) -> None:
+    llm = HuggingFaceProvider()
+    assert llm.invoke_text_batch(["a", "b", "c"]) == ["ok:a", "ok:b", "ok:c"]
+    assert len(fake_hf.requests) == 1
+    assert fake_hf.requests[0]["inputs"] == ["a", "b", "c"]
+
+    # a backend that rejects list inputs degrades to one request per prompt
+    fake_hf.responses.append((400, {}, {"error": "inputs must be a string"}))
+    assert llm.invoke_text_batch(["x", "y"]) == ["ok", "ok"]
+    assert len(fake_hf.requests) == 4
+
+
+def test_microbatching_groups_concurrent_calls(fake_hf: FakeInference) -> None:
+    llm = MicroBatchingLLMProvider(HuggingFaceProvider(), max_batch_size=8, max_wait_s=0.2)
+    prompts = [f'Product Data (JSON): {{"name": "P{i}"}}' for i in range(16)]
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        outputs = list(pool.map(llm.invoke_text, prompts))
+    llm.batcher.close()
+
+    assert outputs == [f"ok:{p}" for p in prompts]
+    assert len(fake_hf.requests) == 2
+    assert llm.batcher.stats().as_dict()["mean_batch_size"] == 8
+
+
+def test_microbatched_graph_matches_direct_calls() -> None:
+    llm = MicroBatchingLLMProvider(MockLLMProvider(), max_wait_s=0.01)
+    batched = build_graph().invoke({}, config=execution_config(llm=llm))
+    direct = build_graph().invoke({}, config=execution_config(llm=MockLLMProvider()))
+    for key in ("questions", "faq", "product_page", "comparison_page"):
+        assert batched[key] == direct[key]
+    assert llm.batcher.stats().requests == 4
+
+
+def test_stream_text_chunks_join_to_full_text(fake_hf: FakeInference) -> None:
+    mock = MockLLMProvider()
+    chunks = list(mock.stream_text("Product Data (JSON): {\"name\": \"X\"}"))
+    assert len(chunks) > 5
+    assert "".join(chunks) == mock.invoke_text("Product Data (JSON): {\"name\": \"X\"}")
+
+    events = [{"token": {"text": t, "special": False}} for t in ("Hel", "lo", " there")]
+    events.append({"token": {"text": "</s>", "special": True}, "generated_text": "Hello there"})
+    sse = "".join(f"data: {json.dumps(e)}\n\n" for e in events).encode("utf-8")
+    fake_hf.responses.append((200, {"Content-Type": "text/event-stream"}, sse))
+    llm = HuggingFaceProvider()
+    assert list(llm.stream_text("hi")) == ["Hel", "lo", " there"]
+    assert fake_hf.requests[0]["stream"] is True
+
+    # a backend that ignores "stream" still yields the whole text
+    assert list(llm.stream_text("hi")) == ["ok"]
+
+
+def test_stream_text_decodes_utf8_and_frees_the_slot_before_tokens(fake_hf: FakeInference) -> None:
+    events = [{"token": {"text": t, "special": False}} for t in ("Crème", " — ", "✓")]
+    sse = "".join(f"data: {json.dumps(e, ensure_ascii=False)}\n\n" for e in events).encode("utf-8")
+    fake_hf.responses.append((200, {"Content-Type": "text/event-stream"}, sse))
+    llm = HuggingFaceProvider()
+    stream = llm.stream_text("hi")
+    assert next(stream) == "Crème"
+    assert llm.limiter.concurrency.in_flight == 0  # a slow reader does not hold a request slot
+    assert list(stream) == [" — ", "✓"]
+
+
+def test_cached_stream_is_teed_into_cache() -> None:
+    calls: list[str] = []
+
+    class Counting(MockLLMProvider):
+        def invoke_text(self, prompt: str) -> str:
+            calls.append(prompt)
+            return super().invoke_text(prompt)
+
+    llm = CachingLLMProvider(Counting(), ResponseCache())
+    first = "".join(llm.stream_text("p"))
+    assert "".join(llm.stream_text("p")) == first
+    assert llm.invoke_text("p") == first
+    assert calls == ["p"]
+
+
+def test_latency_mock_delays_calls_but_keeps_mock_answers(monkeypatch: pytest.MonkeyPatch) -> None:
+    llm = LatencyMockLLMProvider(latency_ms=30, jitter_ms=10, seed=7)
+    prompt = "- product_name: GlowBoost"
+
+    start = time.perf_counter()
+    out = llm.invoke_structured(prompt, QuestionList)
+    assert time.perf_counter() - start >= 0.019
+    assert out == MockLLMProvider().invoke_structured(prompt, QuestionList)
+
+    async def go() -> list[str]:
+        return await asyncio.gather(*(llm.ainvoke_text(prompt) for _ in range(10)))
+
+    start = time.perf_counter()
+    texts = asyncio.run(go())
+    # awaited, so ten calls overlap instead of taking ~300 ms
+    assert time.perf_counter() - start < 0.2
+    assert len(set(texts)) == 1
+    assert "".join(llm.stream_text(prompt)) == texts[0]
+
+    monkeypatch.setenv("KASPARRO_LLM_MODE", "mock-latency")
+    monkeypatch.setenv("KASPARRO_MOCK_LATENCY_MS", "5")
+    monkeypatch.setenv("KASPARRO_MOCK_JITTER_MS", "0")
+    built = build_llm_provider()
+    assert isinstance(built, LatencyMockLLMProvider)
+    assert built.delay_s() == 0.005
+
+
+def test_mock_hands_out_independent_copies_of_prevalidated_payloads() -> None:
+    from kasparro_agentic.llm.provider import MOCK_FAQ, _mock_question_list
+
+    llm = MockLLMProvider()
+    first = llm.invoke_structured("- product_name: GlowBoost", FAQPage)
+    assert first == FAQPage.model_validate(MOCK_FAQ)
+    first.disclaimer = "changed"
+    first.items.clear()
+    again = llm.invoke_structured("- product_name: GlowBoost", FAQPage)
+    assert again.disclaimer == MOCK_FAQ["disclaimer"] and len(again.items) == 1
+
+    questions = llm.invoke_structured("- product_name: Other Serum", QuestionList)
+    assert questions == QuestionList.model_validate(_mock_question_list("Other Serum"))
+    questions.questions.pop()
+    assert len(llm.invoke_structured("- product_name: Other Serum", QuestionList).questions) == 15
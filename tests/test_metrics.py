@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from kasparro_agentic.core.metrics import MetricsRegistry
+
+
+def test_prometheus_text_format() -> None:
+    registry = MetricsRegistry()
+    latency = registry.histogram("req_seconds", "Request latency.", ("endpoint",), buckets=(0.1, 1.0))
+    hits = registry.counter("hits_total", "Hits.", ("tier",))
+
+    child = latency.labels('/a"b')
+    for value in (0.05, 0.5, 5.0):
+        child.observe(value)
+    hits.labels("memory").inc()
+    hits.labels("memory").inc(2)
+
+    text = registry.render()
+    assert "# TYPE req_seconds histogram" in text
+    assert 'req_seconds_bucket{endpoint="/a\\"b",le="0.1"} 1' in text
+    assert 'req_seconds_bucket{endpoint="/a\\"b",le="1"} 2' in text
+    assert 'req_seconds_bucket{endpoint="/a\\"b",le="+Inf"} 3' in text
+    assert 'req_seconds_count{endpoint="/a\\"b"} 3' in text
+    assert 'req_seconds_sum{endpoint="/a\\"b"} 5.55' in text
+    assert 'hits_total{tier="memory"} 3' in text
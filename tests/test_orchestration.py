@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from kasparro_agentic.llm.cache import CachingLLMProvider, ResponseCache
+from kasparro_agentic.llm.provider import MockLLMProvider
+from kasparro_agentic.orchestration import arun_workflow, run_workflow
+from kasparro_agentic.orchestration.agent_orchestrator import run_agent_workflow
+from kasparro_agentic.orchestration.dag import workflow_dedup_stats
+from kasparro_agentic.orchestration.graph_registry import GraphRegistry, compile_stats, warm_graphs
+from kasparro_agentic.orchestration.langgraph_pipeline import (
+    build_graph,
+    execution_config,
+    get_graph,
+)
+from kasparro_agentic.orchestration.singleflight import SingleFlight
+from kasparro_agentic.pipeline import run_pipeline
+
+LLM_DELAY_S = 0.15
+
+
+@pytest.fixture
+def slow_mock(monkeypatch: pytest.MonkeyPatch) -> None:
+    original = MockLLMProvider.invoke_structured
+
+    def slow(self, prompt, schema):  # type: ignore[no-untyped-def]
+        time.sleep(LLM_DELAY_S)
+        return original(self, prompt, schema)
+
+    monkeypatch.setattr(MockLLMProvider, "invoke_structured", slow)
+
+
+def _timings(state: dict) -> dict[str, dict]:
+    return {t["name"]: t for t in state["dag_metadata"]["timings"]}
+
+
+def test_independent_branches_overlap(slow_mock: None) -> None:
+    state = build_graph().invoke({}, config=execution_config(4))
+    timings = _timings(state)
+
+    # questions, product page and comparison page all start before any of them ends
+    first_end = min(timings[n]["end_ms"] for n in ("question_generator", "product_page_builder"))
+    assert timings["comparison_page_builder"]["start_ms"] < first_end
+    assert state["dag_metadata"]["execution"]["overlap_factor"] > 1.2
+    # slowest branch is questions -> faq (two LLM calls), not the sum of all four
+    assert state["dag_metadata"]["execution"]["wall_ms"] < 4 * LLM_DELAY_S * 1000
+
+
+def test_max_concurrency_one_is_sequential(slow_mock: None) -> None:
+    state = build_graph().invoke({}, config=execution_config(1))
+    rows = sorted(state["dag_metadata"]["timings"], key=lambda t: t["start_ms"])
+
+    for prev, nxt in itertools.pairwise(rows):
+        assert nxt["start_ms"] >= prev["end_ms"]
+
+
+def test_metadata_writer_runs_once() -> None:
+    updates = [list(chunk) for chunk in build_graph().stream({}, stream_mode="updates")]
+    assert updates.count(["dag_metadata_writer"]) == 1
+    assert updates[-1] == ["dag_metadata_writer"]
+
+
+def test_async_graph_keeps_many_products_in_flight() -> None:
+    class SlowAsync(MockLLMProvider):
+        async def ainvoke_structured(self, prompt, schema):  # type: ignore[no-untyped-def]
+            await asyncio.sleep(LLM_DELAY_S)
+            return self.invoke_structured(prompt, schema)
+
+    graph = build_graph()
+    config = execution_config(llm=SlowAsync())
+
+    async def run_many() -> list[dict]:
+        return await asyncio.gather(*(graph.ainvoke({}, config=config) for _ in range(50)))
+
+    start = time.perf_counter()
+    states = asyncio.run(run_many())
+    elapsed = time.perf_counter() - start
+
+    assert all(len(s["faq"]["items"]) == 15 for s in states)
+    # 50 products x 4 sequential-ish LLM calls would be 30 s if each held a thread
+    assert elapsed < 10 * LLM_DELAY_S
+
+
+def test_arun_workflow_matches_sync() -> None:
+    assert asyncio.run(arun_workflow("GlowBoost")) == run_workflow("GlowBoost")
+
+
+def test_concurrent_identical_requests_share_one_execution() -> None:
+    calls: list[str] = []
+
+    class Slow(MockLLMProvider):
+        def invoke_text(self, prompt: str) -> str:
+            calls.append(prompt)
+            time.sleep(LLM_DELAY_S)
+            return super().invoke_text(prompt)
+
+    llm = Slow()
+    names = ["GlowBoost Serum", "glowboost  serum", " GLOWBOOST SERUM "] * 4
+    before = workflow_dedup_stats()
+
+    with ThreadPoolExecutor(max_workers=len(names)) as pool:
+        results = list(pool.map(lambda n: run_workflow(n, llm=llm), names))
+
+    assert len(calls) == 1
+    assert len({r["answer"] for r in results}) == 1
+    assert results[0]["questions"] is not results[1]["questions"]
+    after = workflow_dedup_stats()
+    assert after.deduplicated - before.deduplicated == len(names) - 1
+    assert after.in_flight == 0
+
+
+def test_singleflight_async_fans_out_errors() -> None:
+    flight: SingleFlight[int] = SingleFlight()
+    runs = 0
+
+    async def boom() -> int:
+        nonlocal runs
+        runs += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("backend down")
+
+    async def go() -> list:
+        return await asyncio.gather(*(flight.ado("k", boom) for _ in range(5)), return_exceptions=True)
+
+    results = asyncio.run(go())
+    assert runs == 1
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flight.stats().as_dict() == {"calls": 5, "executions": 1, "deduplicated": 4, "in_flight": 0}
+
+
+def test_graph_registry_compiles_once_per_name_and_config() -> None:
+    registry = GraphRegistry()
+    builds: list[dict] = []
+
+    def builder(**config):  # type: ignore[no-untyped-def]
+        builds.append(config)
+        return object()
+
+    first = registry.get("g", builder)
+    assert registry.get("g", builder) is first
+    assert registry.get("g", builder, variant="b") is not first
+    assert builds == [{}, {"variant": "b"}]
+    assert [r["config"] for r in registry.compile_stats()] == [{}, {"variant": "b"}]
+
+    with pytest.raises(KeyError):
+        registry.get("unknown")
+
+
+def test_entry_points_reuse_warmed_graphs(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    stats = warm_graphs()
+    assert {"content_pipeline", "workflow", "agent_workflow"} <= {r["name"] for r in stats}
+    assert all(r["compile_ms"] > 0 for r in stats)
+
+    assert get_graph() is get_graph()
+    run_pipeline(tmp_path / "a")
+    run_pipeline(tmp_path / "b")
+    out = run_agent_workflow("Glow Serum")
+    assert out["answer"] and out["questions"]
+    assert len(compile_stats()) == len(stats)
+
+
+def test_dag_metadata_carries_node_trace(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    llm = CachingLLMProvider(MockLLMProvider(), ResponseCache())
+    build_graph().invoke({}, config=execution_config(llm=llm))
+    state = build_graph().invoke({}, config=execution_config(llm=llm))
+    rows = {r["name"]: r for r in state["dag_metadata"]["timings"]}
+
+    assert rows["data_parser"]["llm_calls"] == 0
+    for name in ("question_generator", "faq_page_builder", "product_page_builder", "comparison_page_builder"):
+        assert rows[name]["llm_calls"] == rows[name]["cache_hits"] == 1
+        assert rows[name]["prompt_chars"] > 0 and rows[name]["response_chars"] > 0
+        assert rows[name]["cpu_ms"] >= 0 and rows[name]["thread"]
+    assert state["dag_metadata"]["totals"]["llm_calls"] == 4
+
+    trace = tmp_path / "trace.json"
+    run_pipeline(tmp_path / "out", trace_path=trace)
+    events = [e for e in json.loads(trace.read_text())["traceEvents"] if e["ph"] == "X"]
+    assert sorted(e["name"] for e in events) == sorted(rows)
+    assert all(e["dur"] > 0 for e in events)
+
+
+@pytest.mark.parametrize("store", ["checkpoints", "checkpoints.db"])
+def test_failed_run_resumes_from_node_checkpoint(tmp_path, monkeypatch: pytest.MonkeyPatch, store: str) -> None:  # type: ignore[no-untyped-def]
+    from kasparro_agentic.orchestration import langgraph_pipeline
+    from kasparro_agentic.orchestration.checkpoint import build_checkpointer
+
+    checkpointer = build_checkpointer(tmp_path / store)
+    calls: list[str] = []
+    generate = langgraph_pipeline.generate_questions
+    build_faq = langgraph_pipeline.build_faq_page_agent
+
+    def counting_generate(*args, **kwargs):  # type: ignore[no-untyped-def]
+        calls.append("questions")
+        return generate(*args, **kwargs)
+
+    def failing_faq(*args, **kwargs):  # type: ignore[no-untyped-def]
+        raise RuntimeError("provider went away")
+
+    monkeypatch.setattr(langgraph_pipeline, "generate_questions", counting_generate)
+    monkeypatch.setattr(langgraph_pipeline, "build_faq_page_agent", failing_faq)
+    with pytest.raises(RuntimeError):
+        run_pipeline(tmp_path / "out", checkpointer=checkpointer, run_id="run-1")
+    assert calls == ["questions"]
+    assert "question_generator" in checkpointer.load("run-1")
+
+    monkeypatch.setattr(langgraph_pipeline, "build_faq_page_agent", build_faq)
+    paths = run_pipeline(tmp_path / "out", checkpointer=checkpointer, run_id="run-1")
+    assert calls == ["questions"]  # replayed from the checkpoint, not regenerated
+    faq = json.loads(paths["faq"].read_text(encoding="utf-8"))
+    assert len(faq["items"]) >= 5
+    assert checkpointer.load("run-1") == {}  # cleared once outputs are written
+
+
+def test_fallback_outputs_leave_no_node_cache_entry(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:  # type: ignore[no-untyped-def]
+    from kasparro_agentic.llm.provider import mark_fallback
+    from kasparro_agentic.models import QuestionList
+    from kasparro_agentic.orchestration.incremental import NODE_CACHE_FILE
+
+    original = MockLLMProvider.invoke_structured
+
+    def questions_fall_back(self, prompt, schema):  # type: ignore[no-untyped-def]
+        out = original(self, prompt, schema)
+        return mark_fallback(out) if schema is QuestionList else out
+
+    monkeypatch.setattr(MockLLMProvider, "invoke_structured", questions_fall_back)
+    run_pipeline(tmp_path)
+    cached = json.loads((tmp_path / NODE_CACHE_FILE).read_text(encoding="utf-8"))
+    # the questions came from a fallback and the FAQ was built on them
+    assert "question_generator" not in cached
+    assert "faq_page_builder" not in cached
+    assert "product_page_builder" in cached
+
+
+def test_singleflight_cancelled_leader_only_detaches() -> None:
+    flight: SingleFlight[int] = SingleFlight()
+    runs = 0
+
+    async def work() -> int:
+        nonlocal runs
+        runs += 1
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def go() -> int:
+        leader = asyncio.ensure_future(flight.ado("k", work))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(flight.ado("k", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    assert asyncio.run(go()) == 42
+    assert runs == 1
+    assert flight.stats().in_flight == 0
+
+
+def test_checkpoint_is_not_replayed_when_node_inputs_changed(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:  # type: ignore[no-untyped-def]
+    from kasparro_agentic.orchestration import langgraph_pipeline
+    from kasparro_agentic.orchestration.checkpoint import build_checkpointer
+
+    class OtherModel(MockLLMProvider):
+        pass
+
+    checkpointer = build_checkpointer(tmp_path / "checkpoints")
+    calls: list[str] = []
+    generate = langgraph_pipeline.generate_questions
+    build_faq = langgraph_pipeline.build_faq_page_agent
+
+    def counting_generate(*args, **kwargs):  # type: ignore[no-untyped-def]
+        calls.append("questions")
+        return generate(*args, **kwargs)
+
+    def failing_faq(*args, **kwargs):  # type: ignore[no-untyped-def]
+        raise RuntimeError("provider went away")
+
+    monkeypatch.setattr(langgraph_pipeline, "generate_questions", counting_generate)
+    monkeypatch.setattr(langgraph_pipeline, "build_faq_page_agent", failing_faq)
+    with pytest.raises(RuntimeError):
+        run_pipeline(tmp_path / "out", llm=MockLLMProvider(), checkpointer=checkpointer, run_id="run-1")
+
+    # same run id, different provider: the saved questions no longer apply
+    monkeypatch.setattr(langgraph_pipeline, "build_faq_page_agent", build_faq)
+    run_pipeline(tmp_path / "out", llm=OtherModel(), checkpointer=checkpointer, run_id="run-1")
+    assert calls == ["questions", "questions"]
+
+
+def test_file_checkpointer_resumes_twice_after_a_torn_write(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    from kasparro_agentic.orchestration.checkpoint import FileCheckpointer
+
+    store = FileCheckpointer(tmp_path)
+    store.save("run", "a", {"n": 1})
+    store.save("run", "b", {"n": 2})
+    path = next(tmp_path.glob("*.ckpt"))
+    path.write_bytes(path.read_bytes()[:-5])  # killed mid-write
+
+    resumed = FileCheckpointer(tmp_path)
+    assert sorted(resumed.load("run")) == ["a"]
+    resumed.save("run", "b", {"n": 2})
+    resumed.save("run", "c", {"n": 3})
+
+    again = FileCheckpointer(tmp_path)
+    assert again.load("run") == {"a": {"n": 1}, "b": {"n": 2}, "c": {"n": 3}}
+    again.save("run", "d", {"n": 4})
+    assert sorted(FileCheckpointer(tmp_path).load("run")) == ["a", "b", "c", "d"]
+
+
+def test_concurrent_runs_with_different_run_ids_are_not_coalesced(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    from kasparro_agentic.orchestration.checkpoint import build_checkpointer
+
+    calls: list[str] = []
+
+    class Slow(MockLLMProvider):
+        def invoke_text(self, prompt: str) -> str:
+            calls.append(prompt)
+            time.sleep(LLM_DELAY_S)
+            return super().invoke_text(prompt)
+
+    llm = Slow()
+    checkpointer = build_checkpointer(tmp_path / "checkpoints")
+    run_ids = ["run-a", "run-b", "run-a", "run-b"]
+    with ThreadPoolExecutor(max_workers=len(run_ids)) as pool:
+        list(pool.map(lambda r: run_workflow("GlowBoost Serum", llm=llm, run_id=r, checkpointer=checkpointer), run_ids))
+
+    assert len(calls) == 2  # one execution per run id, each checkpointed and cleared
+    assert checkpointer.load("run-a") == {} and checkpointer.load("run-b") == {}
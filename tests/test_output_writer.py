@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from kasparro_agentic.agents.output_agent import OutputWriter, write_outputs
+
+
+def _state(price: int = 699) -> dict:
+    return {
+        "faq": {"product_name": "GlowBoost", "items": []},
+        "product_page": {"product_name": "GlowBoost", "price_inr": price},
+        "comparison_page": {"product_a": {"product_name": "GlowBoost"}},
+        "dag_metadata": {"framework": "langgraph"},
+    }
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_write_outputs_skips_unchanged_files(tmp_path: Path, workers: int) -> None:
+    writer = OutputWriter(workers=workers)
+    paths = write_outputs(tmp_path / "out", _state(), writer=writer)
+    assert json.loads(paths["product_page"].read_text(encoding="utf-8"))["price_inr"] == 699
+    assert writer.stats().written == 4
+
+    write_outputs(tmp_path / "out", _state(price=799), writer=writer)
+    stats = writer.stats()
+    assert (stats.written, stats.unchanged) == (5, 3)  # only the product page changed
+    assert json.loads(paths["product_page"].read_text(encoding="utf-8"))["price_inr"] == 799
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == sorted(p.name for p in paths.values())
+    writer.close()
+
+
+def test_failed_write_keeps_the_previous_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    writer = OutputWriter()
+    target = tmp_path / "page.json"
+    writer.write(target, b'{"v": 1}')
+
+    def crash(src: str, dst: str) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", crash)
+    with pytest.raises(OSError):
+        writer.write(target, b'{"v": 2}')
+    assert target.read_bytes() == b'{"v": 1}'
+    assert [p.name for p in tmp_path.iterdir()] == ["page.json"]  # temp file cleaned up
+
+
+@pytest.mark.parametrize("compression", ["none", "gzip", "zstd"])
+def test_shard_sink_records_read_back_by_offset_and_as_a_stream(tmp_path: Path, compression: str) -> None:
+    import gzip
+
+    from kasparro_agentic.agents.shard_sink import ShardReader, ShardSink
+
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    sink = ShardSink(tmp_path, compression, shard_bytes=1)  # one record per shard
+    for i in range(3):
+        sink.write_outputs(f"p{i}", _state(price=i))
+    sink.append("p1", {"product_page": {"price_inr": 42}})  # a later write wins
+    sink.close()
+
+    reader = ShardReader(tmp_path)
+    assert reader.get("p0")["product_page"]["price_inr"] == 0  # type: ignore[index]
+    assert reader.get("p1") == {"key": "p1", "product_page": {"price_inr": 42}}
+    assert reader.get("missing") is None
+    assert len(list(tmp_path.glob("pages-*"))) == 4
+
+    if compression == "gzip":
+        # per-record gzip members still concatenate into one readable stream
+        shard = tmp_path / reader.locations["p2"].shard
+        with gzip.open(shard, "rt", encoding="utf-8") as f:
+            assert json.loads(f.readline())["key"] == "p2"
+
+
+def test_shard_sink_drops_a_torn_index_entry_before_appending(tmp_path: Path) -> None:
+    from kasparro_agentic.agents.shard_sink import INDEX_FILE, ShardReader, ShardSink
+
+    sink = ShardSink(tmp_path)
+    sink.append("p0", {"n": 0})
+    sink.close()
+    with (tmp_path / INDEX_FILE).open("ab") as f:
+        f.write(b'{"key":"crashed","shard":"pages-0')  # crash mid-entry
+
+    sink = ShardSink(tmp_path)
+    sink.append("p1", {"n": 1})
+    sink.close()
+
+    reader = ShardReader(tmp_path)
+    assert sorted(reader.locations) == ["p0", "p1"]
+    assert reader.get("p1") == {"key": "p1", "n": 1}
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import json
+
+from kasparro_agentic.agents.parser_agent import parse_product
+from kasparro_agentic.data.product_data import RAW_PRODUCT_DATA
+from kasparro_agentic.models import Product
+from kasparro_agentic.templates.parallel import iter_rendered_pages, render_catalog, render_pages
+
+
+def _catalog(n: int) -> list[Product]:
+    base = parse_product(RAW_PRODUCT_DATA)
+    return [
+        base.model_copy(update={"product_name": f"Product {i:03d}", "price_inr": 300 + i}) for i in range(n)
+    ]
+
+
+def test_process_pool_matches_in_process_rendering_in_order() -> None:
+    products = _catalog(23)
+    serial = render_catalog(products, workers=1)
+    parallel = render_catalog(products, workers=2, chunksize=4)
+
+    assert [r.product_name for r in parallel] == [p.product_name for p in products]
+    assert parallel == serial
+    assert parallel[5].product_page["price_inr"] == 305
+
+    as_json = render_catalog(products, workers=2, chunksize=4, as_json=True)
+    assert [json.loads(r.faq) for r in as_json] == [r.faq for r in serial]
+
+
+def test_rendering_streams_from_a_lazy_iterable() -> None:
+    products = iter(_catalog(10))
+    stream = iter_rendered_pages(products, workers=2, chunksize=3)
+
+    first = next(stream)
+    assert first == render_pages(_catalog(1)[0])
+    stream.close()  # early stop cancels the chunks not yet started
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from kasparro_agentic.data.json_stream import iter_json_array
+from kasparro_agentic.data.product_store import ProductStore, iter_products, load_product_by_name
+
+
+def _write(path: Path, names: list[str]) -> None:
+    rows = [{"product_name": n, "brand": "Acme", "price_inr": 100} for n in names]
+    path.write_text(json.dumps({"products": rows}), encoding="utf-8")
+
+
+def test_exact_then_contains_in_dataset_order(tmp_path: Path) -> None:
+    path = tmp_path / "products.json"
+    _write(path, ["Vitamin C Serum Lite", "Vitamin C Serum", "Night Cream"])
+    store = ProductStore([path, tmp_path / "." / "products.json"])
+
+    assert len(store) == 3
+    assert store.find("VITAMIN C SERUM").product_name == "Vitamin C Serum"
+    assert store.find("c serum").product_name == "Vitamin C Serum Lite"
+    assert store.find("Cr").product_name == "Night Cream"
+    assert store.find("Retinol") is None
+
+
+def test_reloads_when_file_changes(tmp_path: Path) -> None:
+    path = tmp_path / "products.json"
+    _write(path, ["Night Cream"])
+    store = ProductStore([path])
+    assert store.find("Day Cream") is None
+
+    _write(path, ["Night Cream", "Day Cream"])
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    assert store.find("Day Cream") is not None
+
+
+def test_load_product_by_name_uses_env_dataset(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "catalog.csv"
+    path.write_text("product_name,brand,price\nGlow Toner,Acme,₹450\n", encoding="utf-8")
+    monkeypatch.setenv("KASPARRO_DATA_PATH", str(path))
+
+    product = load_product_by_name("glow toner")
+    assert (product.brand, product.price_inr) == ("Acme", 450)
+    assert load_product_by_name("Unknown Balm").brand == ""
+
+
+TRICKY_DOC = {
+    "meta": {"note": "brackets ] } and \"quotes\" inside strings", "n": [1, 2, {"x": "]"}]},
+    "products": [
+        {"product_name": "Serum [A]", "price_inr": 123456789, "benefits": ["Glow", "Even tone"]},
+        {"name": "Toner \"B\"", "price": "₹450"},
+        {"product_name": ""},
+        "not a product",
+    ],
+    "trailing": True,
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+def test_streaming_json_handles_chunk_boundaries(chunk_size: int) -> None:
+    items = list(iter_json_array(io.StringIO(json.dumps(TRICKY_DOC)), chunk_size=chunk_size))
+    assert items == TRICKY_DOC["products"]
+
+    top_level = list(iter_json_array(io.StringIO(json.dumps([1, 22, 333])), chunk_size=chunk_size))
+    assert top_level == [1, 22, 333]
+
+
+def test_json_and_jsonl_datasets_yield_same_products(tmp_path: Path) -> None:
+    as_json = tmp_path / "products.json"
+    as_json.write_text(json.dumps(TRICKY_DOC), encoding="utf-8")
+    as_jsonl = tmp_path / "products.jsonl"
+    as_jsonl.write_text("\n".join(json.dumps(p) for p in TRICKY_DOC["products"]) + "\n\n", encoding="utf-8")
+
+    names = [p.product_name for p in iter_products(as_json)]
+    assert names == ["Serum [A]", 'Toner "B"']
+    assert [p.product_name for p in iter_products(as_jsonl)] == names
+
+
+def test_streaming_json_reports_errors_without_reading_the_rest() -> None:
+    good = ",".join(json.dumps({"product_name": f"P{i}", "pad": "x" * 100}) for i in range(2000))
+    doc = io.StringIO('{"products": [{"product_name": "Broken" "price": 1},' + good + "]}")
+    with pytest.raises(ValueError, match=r"Malformed JSON at character 40: Expecting ',' delimiter") as e:
+        list(iter_json_array(doc, chunk_size=1024))
+    assert doc.tell() < 10 * 1024
+    assert len(str(e.value)) < 200
+
+
+def test_file_failing_mid_parse_adds_none_of_its_products(tmp_path: Path) -> None:
+    good = tmp_path / "good.json"
+    _write(good, ["Alpha Serum"])
+    broken = tmp_path / "broken.jsonl"
+    broken.write_text('{"product_name": "Beta Toner"}\n{"product_name": \n', encoding="utf-8")
+
+    store = ProductStore([good, broken])
+    assert len(store) == 1
+    assert store.get("beta toner") is None
+    assert store.get("alpha serum") is not None
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import json
+
+from kasparro_agentic.agents.parser_agent import parse_product
+from kasparro_agentic.agents.question_agent import _questions_prompt
+from kasparro_agentic.data.product_data import RAW_PRODUCT_DATA
+from kasparro_agentic.logic_blocks.faq import _faq_prompt
+from kasparro_agentic.models import Product, ProductPage
+from kasparro_agentic.templates.base import Template
+from kasparro_agentic.templates.pages import QuestionTemplate
+from kasparro_agentic.templates.prompts import FAQ_PROMPT, PROMPTS, PromptTemplate
+
+
+def _legacy_questions_prompt(product: Product) -> str:
+    return f"""
+Generate at least 15 product FAQ questions with categories.
+Return JSON matching this schema:
+
+{{
+  "questions": [
+    {{"category": "Benefits", "question": "..."}},
+    ...
+  ]
+}}
+
+Product context:
+- product_name: {product.product_name}
+- brand: {product.brand}
+- category: {product.category}
+- benefits: {product.benefits}
+- how_to_use: {product.how_to_use}
+""".strip()
+
+
+def test_compiled_prompts_match_the_legacy_f_strings() -> None:
+    seed = parse_product(RAW_PRODUCT_DATA)
+    odd = Product(product_name="X", brand="", category="c", price_inr=0, how_to_use="trailing  \n")
+    for product in (seed, odd, seed):  # the third call is served from the block cache
+        assert _questions_prompt(product) == _legacy_questions_prompt(product)
+
+    questions = QuestionTemplate().render(seed)
+    faq = _faq_prompt(seed, questions)
+    assert faq.startswith(FAQ_PROMPT.prefix)
+    assert f"- key_ingredients: {list(seed.key_ingredients)}\n" in faq
+    assert f"Questions:\n{[q.model_dump() for q in questions]}\n\n" in faq
+
+
+def test_template_version_tracks_static_text() -> None:
+    a = PromptTemplate("t", "Intro\n${x}\nOutro")
+    assert a.render("v") == "Intro\nv\nOutro"
+    assert a.prefix == "Intro\n"
+    assert PromptTemplate("t", "Intro\n${x}\nOutro").version == a.version
+    assert PromptTemplate("t", "Intro!\n${x}\nOutro").version != a.version
+    assert len({t.version for t in PROMPTS.values()}) == len(PROMPTS)
+
+
+def test_base_template_prompt_framing_is_unchanged() -> None:
+    class PageTemplate(Template[ProductPage]):
+        def build_context(self, **kwargs: object) -> dict[str, object]:
+            return dict(kwargs)
+
+    context = {"product": "GlowBoost", "price": 799}
+    expected = "\n".join(
+        [
+            "You are an expert content generator.",
+            "Use ONLY the provided context. Do not add external facts.",
+            "Return ONLY valid JSON that matches the required schema exactly.",
+            "",
+            "<<<CONTEXT_JSON>>>",
+            json.dumps(context, ensure_ascii=False, indent=2),
+            "<<<END_CONTEXT_JSON>>>",
+            "",
+            "JSON ONLY. No markdown. No commentary.",
+        ]
+    )
+    assert PageTemplate().build_prompt(context) == expected